@@ -6,14 +6,18 @@ CREATE PROCEDURE dbo.sp_Add_Question_With_Choices
     @Correct_Answer VARCHAR(200),
     @Course_ID INT,
     @Question_Mark INT,
-    @Choices QuestionChoicesTableType READONLY
+    @Choices QuestionChoicesTableType READONLY,
+    @Question_ID INT = NULL,     -- IDs reserved by the application (id_allocator.py), or NULL
+    @First_Choice_ID INT = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
     BEGIN TRANSACTION;
 
-    DECLARE @New_Question_ID INT;
-    DECLARE @New_Choice_ID INT;
+    DECLARE @New_Question_ID INT = @Question_ID;
+    DECLARE @New_Choice_ID INT = @First_Choice_ID;
+    DECLARE @Choice_Count INT;
+    DECLARE @First_Value SQL_VARIANT;
 
     BEGIN TRY
         -- 1. Check if Course exists
@@ -40,8 +44,20 @@ BEGIN
             RETURN;
         END
 
-        -- 4. Generate new Question_ID manually
-        SELECT @New_Question_ID = ISNULL(MAX(Question_ID), 0) + 1 FROM dbo.Questions;
+        -- 4. Generate new Question_ID (ID Sequences.sql)
+        IF @New_Question_ID IS NULL
+            SET @New_Question_ID = NEXT VALUE FOR dbo.Question_ID_Seq;
+
+        -- Choice IDs are one consecutive block
+        SET @Choice_Count = CASE WHEN @Question_Type = 'T/F' THEN 2 ELSE (SELECT COUNT(*) FROM @Choices) END;
+        IF @New_Choice_ID IS NULL AND @Choice_Count > 0
+        BEGIN
+            EXEC sys.sp_sequence_get_range
+                @sequence_name = N'dbo.Choice_ID_Seq',
+                @range_size = @Choice_Count,
+                @range_first_value = @First_Value OUTPUT;
+            SET @New_Choice_ID = CAST(@First_Value AS INT);
+        END
 
         -- 5. Insert the new question
         INSERT INTO dbo.Questions (Question_ID, Question_Type, Question_Head, Correct_Answer, Course_ID, Question_Mark)
@@ -67,8 +83,6 @@ BEGIN
             END
 
             -- Insert MCQ choices
-            SELECT @New_Choice_ID = ISNULL(MAX(Choice_ID), 0) + 1 FROM dbo.Question_Choices;
-
             INSERT INTO dbo.Question_Choices (Choice_ID, Question_ID, Choice_Text, Is_Correct)
             SELECT ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) + @New_Choice_ID - 1,
                    @New_Question_ID,
@@ -79,8 +93,6 @@ BEGIN
         ELSE IF @Question_Type = 'T/F'
         BEGIN
             -- Insert True/False choices automatically
-            SELECT @New_Choice_ID = ISNULL(MAX(Choice_ID), 0) + 1 FROM dbo.Question_Choices;
-
             INSERT INTO dbo.Question_Choices (Choice_ID, Question_ID, Choice_Text, Is_Correct)
             VALUES
             (@New_Choice_ID, @New_Question_ID, 'The sentence is True', CASE WHEN @Correct_Answer = 'True' THEN 1 ELSE 0 END),
@@ -0,0 +1,113 @@
+-- Exam Submission Counters
+-- Students_Taken per exam, maintained in the same transaction as every
+-- Student_Exam insert/update/delete so the instructor dashboard reads one row
+-- per exam instead of counting Student_Exam.  Autosaved attempts still
+-- 'In Progress' are not counted until they are submitted.
+---------------------------------------------------------------
+CREATE TABLE [Exam_Submission_Counts] (
+	[Exam_ID] BIGINT NOT NULL,
+	[Students_Taken] INT NOT NULL DEFAULT 0,
+	PRIMARY KEY ([Exam_ID])
+);
+
+ALTER TABLE [Exam_Submission_Counts]
+ADD CONSTRAINT [Exam_Submission_Counts_Exam_FK]
+FOREIGN KEY ([Exam_ID])
+REFERENCES [Exams]([Exam_ID])
+ON DELETE CASCADE;
+
+-- Backfill from the existing attempts
+INSERT INTO [Exam_Submission_Counts] (Exam_ID, Students_Taken)
+SELECT Exam_ID, COUNT(*)
+FROM Student_Exam
+WHERE Exam_Status <> 'In Progress'
+GROUP BY Exam_ID;
+---------------------------------------------------------------
+CREATE TRIGGER Maintain_Exam_Submission_Counts
+ON [Student_Exam]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- Net change per exam of the attempts that count (an UPDATE of Exam_ID
+    -- moves the attempt, one out of 'In Progress' adds it)
+    WITH Delta AS (
+        SELECT Exam_ID, SUM(Change) AS Change
+        FROM (
+            SELECT Exam_ID, 1 AS Change FROM inserted WHERE Exam_Status <> 'In Progress'
+            UNION ALL
+            SELECT Exam_ID, -1 AS Change FROM deleted WHERE Exam_Status <> 'In Progress'
+        ) AS d
+        GROUP BY Exam_ID
+        HAVING SUM(Change) <> 0
+    )
+    MERGE [Exam_Submission_Counts] WITH (HOLDLOCK) AS c
+    USING Delta AS d ON c.Exam_ID = d.Exam_ID
+    WHEN MATCHED THEN
+        UPDATE SET Students_Taken = c.Students_Taken + d.Change
+    WHEN NOT MATCHED THEN
+        INSERT (Exam_ID, Students_Taken) VALUES (d.Exam_ID, d.Change);
+END;
+---------------------------------------------------------------
+-- sp_Reconcile_Exam_Counters - recount Student_Exam for every exam and
+--   report each exam whose stored counter drifted; @Fix = 1 rewrites them.
+--   Takes a shared lock on Student_Exam while fixing, so run it off-peak.
+---------------------------------------------------------------
+CREATE PROCEDURE sp_Reconcile_Exam_Counters
+    @Fix BIT = 1
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        SELECT 
+            e.Exam_ID,
+            ISNULL(c.Students_Taken, 0) AS Stored_Count,
+            ISNULL(a.Actual_Count, 0) AS Actual_Count
+        INTO #Drift
+        FROM Exams e
+        LEFT JOIN [Exam_Submission_Counts] c ON c.Exam_ID = e.Exam_ID
+        LEFT JOIN (
+            SELECT Exam_ID, COUNT(*) AS Actual_Count
+            FROM Student_Exam WITH (TABLOCK, HOLDLOCK)
+            WHERE Exam_Status <> 'In Progress'
+            GROUP BY Exam_ID
+        ) AS a ON a.Exam_ID = e.Exam_ID
+        WHERE c.Exam_ID IS NULL
+           OR c.Students_Taken <> ISNULL(a.Actual_Count, 0);
+
+        IF @Fix = 1
+        BEGIN
+            UPDATE c
+            SET c.Students_Taken = d.Actual_Count
+            FROM [Exam_Submission_Counts] c
+            INNER JOIN #Drift d ON c.Exam_ID = d.Exam_ID;
+
+            INSERT INTO [Exam_Submission_Counts] (Exam_ID, Students_Taken)
+            SELECT d.Exam_ID, d.Actual_Count
+            FROM #Drift d
+            WHERE NOT EXISTS (SELECT 1 FROM [Exam_Submission_Counts] c WHERE c.Exam_ID = d.Exam_ID);
+        END
+
+        COMMIT TRANSACTION;
+
+        SELECT 
+            Exam_ID,
+            Stored_Count,
+            Actual_Count,
+            Actual_Count - Stored_Count AS Drift
+        FROM #Drift
+        ORDER BY Exam_ID;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        DECLARE @ErrMsg NVARCHAR(4000) = ERROR_MESSAGE();
+        RAISERROR(@ErrMsg, 16, 1);
+    END CATCH
+END;
+
+-- EXEC sp_Reconcile_Exam_Counters @Fix = 0;
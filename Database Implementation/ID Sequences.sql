@@ -0,0 +1,48 @@
+-- ID Sequences
+-- Replace "SELECT ISNULL(MAX(ID), 0) + 1" with sequences, which hand out
+-- unique IDs without locking the table. The application reserves blocks of
+-- IDs (sp_Reserve_ID_Block) and assigns them from memory (Website/id_allocator.py).
+-- Each sequence starts after the highest ID already in its table.
+---------------------------------------------------------------
+DECLARE @Next_Exam_ID BIGINT = (SELECT ISNULL(MAX(Exam_ID), 0) + 1 FROM Exams);
+DECLARE @Next_Question_ID INT = (SELECT ISNULL(MAX(Question_ID), 0) + 1 FROM Questions);
+DECLARE @Next_Choice_ID INT = (SELECT ISNULL(MAX(Choice_ID), 0) + 1 FROM Question_Choices);
+
+EXEC('CREATE SEQUENCE dbo.Exam_ID_Seq AS BIGINT START WITH ' + @Next_Exam_ID + ' INCREMENT BY 1 CACHE 50;');
+EXEC('CREATE SEQUENCE dbo.Question_ID_Seq AS INT START WITH ' + @Next_Question_ID + ' INCREMENT BY 1 CACHE 50;');
+EXEC('CREATE SEQUENCE dbo.Choice_ID_Seq AS INT START WITH ' + @Next_Choice_ID + ' INCREMENT BY 1 CACHE 200;');
+---------------------------------------------------------------
+-- sp_Reserve_ID_Block - reserve @Block_Size consecutive values of a sequence
+--   and return the first one; the caller owns First_ID .. First_ID + @Block_Size - 1.
+---------------------------------------------------------------
+CREATE PROCEDURE sp_Reserve_ID_Block
+    @Sequence_Name NVARCHAR(128),
+    @Block_Size INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @First SQL_VARIANT;
+
+    IF @Sequence_Name NOT IN ('Exam_ID_Seq', 'Question_ID_Seq', 'Choice_ID_Seq')
+    BEGIN
+        RAISERROR('Unknown ID sequence.', 16, 1);
+        RETURN;
+    END
+
+    IF @Block_Size < 1
+    BEGIN
+        RAISERROR('Block size must be at least 1.', 16, 1);
+        RETURN;
+    END
+
+    SET @Sequence_Name = N'dbo.' + @Sequence_Name;
+    EXEC sys.sp_sequence_get_range
+        @sequence_name = @Sequence_Name,
+        @range_size = @Block_Size,
+        @range_first_value = @First OUTPUT;
+
+    SELECT CAST(@First AS BIGINT) AS First_ID;
+END;
+
+-- EXEC sp_Reserve_ID_Block @Sequence_Name = 'Exam_ID_Seq', @Block_Size = 50;
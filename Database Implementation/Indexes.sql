@@ -23,6 +23,10 @@ CREATE INDEX IX_Instructor_Dept_ID ON Instructor (Dept_ID);
 ----------------------------------------------------------------
 CREATE INDEX IX_Exams_Course_ID ON Exams (Course_ID);
 
+-- Covers "exams open today" (dashboard availability and the exam schedule index)
+CREATE INDEX IX_Exams_Date_Window ON Exams (Exam_Date, Start_Time, End_Time)
+    INCLUDE (Title, Course_ID, Total_Marks);
+
 CREATE INDEX IX_Questions_Course_ID ON Questions (Course_ID);
 CREATE INDEX IX_Questions_Type ON Questions (Question_Type);
 
@@ -225,7 +225,7 @@ ALTER TABLE [Student_Exam_Questions] ADD CONSTRAINT [Student_Exam_Questions_Q_FK
 ALTER TABLE [Student_Exam_Questions] ADD CONSTRAINT [Student_Exam_Questions_Choice_FK] FOREIGN KEY ([Selected_Choice_ID]) REFERENCES [Question_Choices]([Choice_ID]);
 
 
-ALTER TABLE [Student_Exam] ADD CONSTRAINT [Exam_Status_Check] CHECK (Exam_Status IN ('Not Started', 'In Progress', 'Submitted', 'Graded'))
+ALTER TABLE [Student_Exam] ADD CONSTRAINT [Exam_Status_Check] CHECK (Exam_Status IN ('Not Started', 'In Progress', 'Submitted', 'Auto-Submitted', 'Graded'))
 ALTER TABLE [Employment] ADD CONSTRAINT [Employment_Type_Check] CHECK (Type IN ('Internship', 'Part-time', 'Full-time', 'Freelancer'))
 ALTER TABLE [Questions] ADD CONSTRAINT [Question_Type_Check] CHECK (Question_Type IN ('T/F', 'MCQ'))
 
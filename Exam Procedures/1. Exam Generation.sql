@@ -5,14 +5,15 @@ CREATE PROCEDURE sp_Generate_Exam
     @Start_Time TIME(7),
     @End_Time TIME(7),
     @No_TF INT,
-    @No_MCQ INT
+    @No_MCQ INT,
+    @Exam_ID BIGINT = NULL,  -- reserved by the application (id_allocator.py), or NULL
+    @Question_IDs ExamQuestionIDsTableType READONLY  -- drawn by question_pools.py; empty = random here
 AS
 BEGIN
     SET NOCOUNT ON;
 
     DECLARE 
         @Course_ID INT,
-        @Exam_ID BIGINT,
         @Exam_Title VARCHAR(150),
         @Total_Marks INT,
         @No_Questions INT,
@@ -58,8 +59,30 @@ BEGIN
         RETURN;
     END
 
-    -- 6. Generate new Exam_ID
-    SELECT @Exam_ID = ISNULL(MAX(Exam_ID), 0) + 1 FROM Exams;
+    -- 5b. Validate pre-sampled questions: all must still exist in this course, within the counts.
+    --     A mismatch means a question was removed; the caller reloads its pool and retries.
+    IF EXISTS (SELECT 1 FROM @Question_IDs)
+    BEGIN
+        DECLARE @Found_TF INT, @Found_MCQ INT;
+
+        SELECT 
+            @Found_TF = ISNULL(SUM(CASE WHEN q.Question_Type = 'T/F' THEN 1 ELSE 0 END), 0),
+            @Found_MCQ = ISNULL(SUM(CASE WHEN q.Question_Type = 'MCQ' THEN 1 ELSE 0 END), 0)
+        FROM @Question_IDs p
+        INNER JOIN Questions q ON q.Question_ID = p.Question_ID
+        WHERE q.Course_ID = @Course_ID;
+
+        IF @Found_TF + @Found_MCQ <> (SELECT COUNT(*) FROM @Question_IDs)
+           OR @Found_TF > @No_TF OR @Found_MCQ > @No_MCQ
+        BEGIN
+            RAISERROR('Question pool is out of date.', 16, 1);
+            RETURN;
+        END
+    END
+
+    -- 6. Generate new Exam_ID (ID Sequences.sql)
+    IF @Exam_ID IS NULL
+        SET @Exam_ID = NEXT VALUE FOR dbo.Exam_ID_Seq;
 
     -- 7. Build Exam Title
     SET @Exam_Title = @Course_Name + ' Exam';
@@ -71,19 +94,29 @@ BEGIN
     INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
     VALUES (@Exam_ID, @Exam_Title, @Total_Marks, @Exam_Date, @No_Questions, @Start_Time, @End_Time, @Course_ID);
 
-    -- 10. Insert random True/False questions
-    INSERT INTO Exam_Questions (Exam_ID, Question_ID)
-    SELECT TOP (@No_TF) @Exam_ID, Question_ID
-    FROM Questions
-    WHERE Course_ID = @Course_ID AND Question_Type = 'T/F'
-    ORDER BY NEWID();
-
-    -- 11. Insert random MCQ questions
-    INSERT INTO Exam_Questions (Exam_ID, Question_ID)
-    SELECT TOP (@No_MCQ) @Exam_ID, Question_ID
-    FROM Questions
-    WHERE Course_ID = @Course_ID AND Question_Type = 'MCQ'
-    ORDER BY NEWID();
+    IF EXISTS (SELECT 1 FROM @Question_IDs)
+    BEGIN
+        -- 10 / 11. Questions already sampled by the application: one batch insert
+        INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+        SELECT @Exam_ID, Question_ID
+        FROM @Question_IDs;
+    END
+    ELSE
+    BEGIN
+        -- 10. Insert random True/False questions
+        INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+        SELECT TOP (@No_TF) @Exam_ID, Question_ID
+        FROM Questions
+        WHERE Course_ID = @Course_ID AND Question_Type = 'T/F'
+        ORDER BY NEWID();
+
+        -- 11. Insert random MCQ questions
+        INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+        SELECT TOP (@No_MCQ) @Exam_ID, Question_ID
+        FROM Questions
+        WHERE Course_ID = @Course_ID AND Question_Type = 'MCQ'
+        ORDER BY NEWID();
+    END
 
     -- 12. Return summary
     SELECT 
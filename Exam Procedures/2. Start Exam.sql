@@ -69,4 +69,134 @@ BEGIN
 
 END;
 
--- EXEC sp_Start_Exam @Exam_ID = 825, @Student_ID = 13642482516707;
\ No newline at end of file
+-- EXEC sp_Start_Exam @Exam_ID = 825, @Student_ID = 13642482516707;
+
+-----------------------------------------------------------------------
+-- sp_Start_Exam split in two for the web application:
+--   sp_Check_Exam_Eligibility - the cheap per-student checks (no joins)
+--   sp_Get_Exam_Paper         - the exam header + question/choice join, the same for
+--                               every student, so the app runs it once per exam and caches it
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Check_Exam_Eligibility
+    @Exam_ID BIGINT,
+    @Student_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE 
+        @Exam_Date DATE,
+        @Start_Time TIME(7),
+        @End_Time TIME(7);
+
+    -- Check if exam exists
+    IF NOT EXISTS (SELECT 1 FROM Exams WHERE Exam_ID = @Exam_ID)
+    BEGIN
+        RAISERROR('Exam not found. Please check the Exam ID.', 16, 1);
+        RETURN;
+    END
+
+    -- Check if student already submitted the exam (an autosaved attempt can be resumed)
+    IF EXISTS (SELECT 1 FROM Student_Exam
+               WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID AND Exam_Status <> 'In Progress')
+    BEGIN
+        RAISERROR('You have already taken or started this exam.', 16, 1);
+        RETURN;
+    END
+
+    SELECT 
+        @Exam_Date = Exam_Date,
+        @Start_Time = Start_Time,
+        @End_Time = End_Time
+    FROM Exams
+    WHERE Exam_ID = @Exam_ID;
+
+    IF CAST(GETDATE() AS DATE) <> @Exam_Date
+    BEGIN
+        RAISERROR('Exam is not scheduled for today.', 16, 1);
+        RETURN;
+    END
+
+    IF CAST(GETDATE() AS TIME(7)) < @Start_Time
+    BEGIN
+        RAISERROR('Exam has not started yet.', 16, 1);
+        RETURN;
+    END
+
+    IF CAST(GETDATE() AS TIME(7)) > @End_Time
+    BEGIN
+        RAISERROR('Exam time is over. You cannot start now.', 16, 1);
+        RETURN;
+    END
+
+    SELECT 
+        @Exam_ID AS Exam_ID,
+        @Exam_Date AS Exam_Date,
+        @Start_Time AS Start_Time,
+        @End_Time AS End_Time;
+END;
+
+-- EXEC sp_Check_Exam_Eligibility @Exam_ID = 825, @Student_ID = 13642482516707;
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Get_Exam_Paper
+    @Exam_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 1. Exam header
+    SELECT 
+        e.Exam_ID,
+        e.Title,
+        c.Course_Name,
+        e.Total_Marks,
+        e.No_Questions,
+        e.Exam_Date,
+        e.Start_Time,
+        e.End_Time
+    FROM Exams e
+    INNER JOIN Course c ON e.Course_ID = c.Course_ID
+    WHERE e.Exam_ID = @Exam_ID;
+
+    -- 2. Questions and choices (one row per choice)
+    SELECT 
+        q.Question_ID,
+        q.Question_Type,
+        q.Question_Head,
+        qc.Choice_ID,
+        qc.Choice_Text
+    FROM Exam_Questions eq
+    INNER JOIN Questions q ON eq.Question_ID = q.Question_ID
+    INNER JOIN Question_Choices qc ON q.Question_ID = qc.Question_ID
+    WHERE eq.Exam_ID = @Exam_ID
+    ORDER BY q.Question_ID, qc.Choice_ID;
+END;
+
+-- EXEC sp_Get_Exam_Paper @Exam_ID = 825;
+-----------------------------------------------------------------------
+-- sp_Get_Student_Dashboard - every exam the student has submitted.  The
+--   exams open right now come from the app's in-memory index of today's
+--   exams (exam_schedule.py), so they are not queried here.
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Get_Student_Dashboard
+    @Student_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- Completed exams
+    SELECT 
+        se.Exam_ID,
+        e.Title AS Exam_Title,
+        se.Student_Score,
+        e.Total_Marks,
+        c.Course_Name,
+        se.Exam_Status
+    FROM Student_Exam se
+    INNER JOIN Exams e ON se.Exam_ID = e.Exam_ID
+    INNER JOIN Course c ON e.Course_ID = c.Course_ID
+    WHERE se.Student_ID = @Student_ID
+      AND se.Exam_Status <> 'In Progress';
+END;
+
+-- EXEC sp_Get_Student_Dashboard @Student_ID = 13642482516707;
@@ -7,16 +7,28 @@ AS
 BEGIN
     SET NOCOUNT ON;
 
-    -- 1. Check if student already submitted
-    IF EXISTS (SELECT 1 FROM Student_Exam WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID)
+    -- 1. Check if student already submitted (an autosaved attempt is still open)
+    IF EXISTS (SELECT 1 FROM Student_Exam WITH (UPDLOCK, HOLDLOCK)
+               WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID AND Exam_Status <> 'In Progress')
     BEGIN
         RAISERROR('You have already submitted this exam.', 16, 1);
         RETURN;
     END
 
-    -- 2. Insert new record into Student_Exam
-    INSERT INTO Student_Exam (Exam_ID, Student_ID, Student_Score, Submission_Time, Exam_Status)
-    VALUES (@Exam_ID, @Student_ID, 0, CAST(GETDATE() AS TIME(7)), 'Submitted');
+    -- 2. Insert new record into Student_Exam, or close the autosaved attempt;
+    --    the submitted form replaces the autosaved answers
+    IF EXISTS (SELECT 1 FROM Student_Exam WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID)
+    BEGIN
+        DELETE FROM Student_Exam_Questions
+        WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID;
+
+        UPDATE Student_Exam
+        SET Submission_Time = CAST(GETDATE() AS TIME(7)), Exam_Status = 'Submitted'
+        WHERE Exam_ID = @Exam_ID AND Student_ID = @Student_ID;
+    END
+    ELSE
+        INSERT INTO Student_Exam (Exam_ID, Student_ID, Student_Score, Submission_Time, Exam_Status)
+        VALUES (@Exam_ID, @Student_ID, 0, CAST(GETDATE() AS TIME(7)), 'Submitted');
 
     -- 3. Insert student answers into Student_Exam_Questions
     INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
@@ -31,3 +43,122 @@ BEGIN
     SELECT 'Exam Submitted Successfully'
 
 END;
+
+-- EXEC sp_Submit_Exam @Exam_ID = 825, @Student_ID = 13642482516707, @Answers = ...;
+-----------------------------------------------------------------------
+-- sp_Save_Exam_Progress - autosaved answers of many open attempts in one
+--   call (autosave.py flushes its buffer every few seconds).  An attempt's
+--   first save creates its Student_Exam row as 'In Progress'; saves for
+--   attempts that were submitted in the meantime are ignored.
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Save_Exam_Progress
+    @Answers AutosaveAnswersTableType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @Started TABLE (Student_ID BIGINT, Exam_ID BIGINT);
+
+    BEGIN TRANSACTION;
+
+    -- 1. Start the attempts saved for the first time
+    INSERT INTO Student_Exam (Student_ID, Exam_ID, Student_Score, Submission_Time, Exam_Status)
+    OUTPUT inserted.Student_ID, inserted.Exam_ID INTO @Started
+    SELECT DISTINCT 
+        a.Student_ID,
+        a.Exam_ID,
+        0,
+        CAST(GETDATE() AS TIME(7)),
+        'In Progress'
+    FROM @Answers a
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Student_Exam se WITH (UPDLOCK, HOLDLOCK)
+        WHERE se.Student_ID = a.Student_ID AND se.Exam_ID = a.Exam_ID
+    );
+
+    -- 2. Changed answers
+    UPDATE seq
+    SET seq.Selected_Choice_ID = a.Selected_Choice_ID
+    FROM Student_Exam_Questions seq
+    INNER JOIN @Answers a 
+        ON seq.Student_ID = a.Student_ID AND seq.Exam_ID = a.Exam_ID AND seq.Question_ID = a.Question_ID
+    INNER JOIN Student_Exam se 
+        ON se.Student_ID = a.Student_ID AND se.Exam_ID = a.Exam_ID
+    WHERE se.Exam_Status = 'In Progress';
+
+    -- 3. First answers to a question
+    INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
+    SELECT 
+        a.Student_ID,
+        a.Exam_ID,
+        a.Question_ID,
+        a.Selected_Choice_ID,
+        0
+    FROM @Answers a
+    INNER JOIN Student_Exam se 
+        ON se.Student_ID = a.Student_ID AND se.Exam_ID = a.Exam_ID
+    WHERE se.Exam_Status = 'In Progress'
+      AND NOT EXISTS (
+          SELECT 1 FROM Student_Exam_Questions seq
+          WHERE seq.Student_ID = a.Student_ID AND seq.Exam_ID = a.Exam_ID AND seq.Question_ID = a.Question_ID
+      );
+
+    COMMIT TRANSACTION;
+
+    -- 4. Attempts started by this call
+    SELECT Student_ID, Exam_ID FROM @Started;
+END;
+
+-- EXEC sp_Save_Exam_Progress @Answers = ...;
+-----------------------------------------------------------------------
+-- sp_Auto_Submit_Exam - once the exam window has closed, every attempt
+--   still 'In Progress' is submitted with its autosaved answers as
+--   'Auto-Submitted'.  The deadline sweeper (deadlines.py) calls it once
+--   per exam and grades the returned students in one batch.
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Auto_Submit_Exam
+    @Exam_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE 
+        @Exam_Date DATE,
+        @End_Time TIME(7);
+
+    DECLARE @Submitted TABLE (Student_ID BIGINT);
+
+    SELECT 
+        @Exam_Date = Exam_Date,
+        @End_Time = End_Time
+    FROM Exams
+    WHERE Exam_ID = @Exam_ID;
+
+    -- 1. Check if exam exists
+    IF @Exam_Date IS NULL
+    BEGIN
+        RAISERROR('Exam not found.', 16, 1);
+        RETURN;
+    END
+
+    -- 2. Check if exam time is over
+    IF CAST(GETDATE() AS DATE) < @Exam_Date
+       OR (CAST(GETDATE() AS DATE) = @Exam_Date AND CAST(GETDATE() AS TIME(7)) <= @End_Time)
+    BEGIN
+        RAISERROR('Exam time is not over yet.', 16, 1);
+        RETURN;
+    END
+
+    -- 3. Submit the open attempts as they were last saved
+    UPDATE Student_Exam
+    SET 
+        Submission_Time = @End_Time,
+        Exam_Status = 'Auto-Submitted'
+    OUTPUT inserted.Student_ID INTO @Submitted
+    WHERE Exam_ID = @Exam_ID AND Exam_Status = 'In Progress';
+
+    SELECT Student_ID FROM @Submitted;
+END;
+
+-- EXEC sp_Auto_Submit_Exam @Exam_ID = 825;
\ No newline at end of file
@@ -76,3 +76,120 @@ BEGIN
     SELECT @TotalScore AS Final_Score;
 END;
 
+
+-----------------------------------------------------------------------
+-- In-process grading support for the web application:
+--   sp_Get_Exam_Answer_Key - every choice of the exam's questions with its Is_Correct flag,
+--                            cached by the app while the exam window is open
+--   sp_Apply_Exam_Grades   - writes marks computed by the app in one set-based update
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Get_Exam_Answer_Key
+    @Exam_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 1. Exam window (the app evicts the key when the exam ends)
+    SELECT Exam_ID, Exam_Date, End_Time
+    FROM Exams
+    WHERE Exam_ID = @Exam_ID;
+
+    -- 2. Answer key
+    SELECT 
+        eq.Question_ID,
+        qc.Choice_ID,
+        qc.Is_Correct
+    FROM Exam_Questions eq
+    INNER JOIN Question_Choices qc ON eq.Question_ID = qc.Question_ID
+    WHERE eq.Exam_ID = @Exam_ID;
+END;
+
+-- EXEC sp_Get_Exam_Answer_Key @Exam_ID = 825;
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Apply_Exam_Grades
+    @Exam_ID BIGINT,
+    @Student_ID BIGINT,
+    @Grades GradedAnswersTableType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @TotalScore INT = (SELECT ISNULL(SUM(Ques_Mark), 0) FROM @Grades);
+
+    -- 1. Marks per question
+    UPDATE seq
+    SET 
+        seq.Is_Correct = g.Is_Correct,
+        seq.Ques_Mark = g.Ques_Mark
+    FROM Student_Exam_Questions seq
+    INNER JOIN @Grades g 
+        ON seq.Question_ID = g.Question_ID
+    WHERE seq.Exam_ID = @Exam_ID
+      AND seq.Student_ID = @Student_ID;
+
+    -- 2. Total score
+    UPDATE Student_Exam
+    SET 
+        Student_Score = @TotalScore,
+        Exam_Status = 'Graded'
+    WHERE Exam_ID = @Exam_ID
+      AND Student_ID = @Student_ID;
+
+    SELECT @TotalScore AS Final_Score;
+END;
+-----------------------------------------------------------------------
+-- sp_Get_Exam_Results - the student's results page in one round trip:
+--   the exam with the student's attempt (Exam_Status, Student_Score) and
+--   the answers as Get_Exam_Questions_With_Student_Answers returns them.
+--   The app caches the page once Exam_Status is 'Graded'.
+-----------------------------------------------------------------------
+CREATE PROCEDURE sp_Get_Exam_Results
+    @Exam_ID BIGINT,
+    @Student_ID BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 1. Exam and attempt (no row: exam not found)
+    SELECT 
+        e.Exam_ID,
+        e.Course_ID,
+        c.Course_Name,
+        e.Title,
+        e.Total_Marks,
+        e.No_Questions,
+        CONVERT(VARCHAR(10), e.Exam_Date, 101) AS Exam_Date,
+        LEFT(CONVERT(VARCHAR(8), e.Start_Time, 108), 5) AS Start_Time,
+        LEFT(CONVERT(VARCHAR(8), e.End_Time, 108), 5) AS End_Time,
+        se.Exam_Status,
+        se.Student_Score
+    FROM Exams e
+    INNER JOIN Course c ON e.Course_ID = c.Course_ID
+    LEFT JOIN Student_Exam se 
+        ON se.Exam_ID = e.Exam_ID 
+       AND se.Student_ID = @Student_ID
+    WHERE e.Exam_ID = @Exam_ID;
+
+    -- 2. Answers
+    SELECT 
+        s.Student_Name,
+        e.Title AS Exam_Title,
+        q.Question_Head,
+        q.Correct_Answer,
+        qc.Choice_Text AS Student_Choice,
+        seq.Ques_Mark,
+        seq.Is_Correct
+    FROM Student_Exam_Questions AS seq
+    JOIN Questions AS q
+        ON seq.Question_ID = q.Question_ID
+    JOIN Question_Choices AS qc
+        ON seq.Selected_Choice_ID = qc.Choice_ID
+    JOIN Student AS s
+        ON seq.Student_ID = s.Student_ID
+    JOIN Exams AS e
+        ON seq.Exam_ID = e.Exam_ID
+    WHERE seq.Exam_ID = @Exam_ID
+      AND seq.Student_ID = @Student_ID;
+END;
+
+-- EXEC sp_Get_Exam_Results @Exam_ID = 825, @Student_ID = 13642482519366;
\ No newline at end of file
@@ -0,0 +1,50 @@
+-- Exam Regrade (bulk)
+-- Used by Website/regrade.py after a question's correct choice is fixed:
+-- the app recomputes every student's marks in one pass and sends back only the
+-- rows that changed. Unlike sp_Correct_Exam this also works for 'Graded' exams.
+CREATE PROCEDURE sp_Apply_Exam_Regrade
+    @Exam_ID BIGINT,
+    @Answers RegradedAnswersTableType READONLY,
+    @Scores StudentScoresTableType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 1. Check if exam exists
+    IF NOT EXISTS (SELECT 1 FROM Exams WHERE Exam_ID = @Exam_ID)
+    BEGIN
+        RAISERROR('Exam not found.', 16, 1);
+        RETURN;
+    END
+
+    BEGIN TRANSACTION;
+
+    -- 2. Changed answers
+    UPDATE seq
+    SET 
+        seq.Is_Correct = a.Is_Correct,
+        seq.Ques_Mark = a.Ques_Mark
+    FROM Student_Exam_Questions seq
+    INNER JOIN @Answers a 
+        ON seq.Student_ID = a.Student_ID
+       AND seq.Question_ID = a.Question_ID
+    WHERE seq.Exam_ID = @Exam_ID;
+
+    -- 3. Changed scores
+    UPDATE se
+    SET 
+        se.Student_Score = s.Student_Score,
+        se.Exam_Status = 'Graded'
+    FROM Student_Exam se
+    INNER JOIN @Scores s 
+        ON se.Student_ID = s.Student_ID
+    WHERE se.Exam_ID = @Exam_ID;
+
+    COMMIT TRANSACTION;
+
+    SELECT 
+        (SELECT COUNT(*) FROM @Answers) AS Answers_Updated,
+        (SELECT COUNT(*) FROM @Scores) AS Scores_Updated;
+END;
+
+-- EXEC sp_Apply_Exam_Regrade @Exam_ID = 825, @Answers = ..., @Scores = ...;
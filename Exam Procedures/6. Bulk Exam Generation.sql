@@ -0,0 +1,121 @@
+-- Bulk Exam Generation
+-- Used by Website/bulk_schedule.py to create a whole intake's exams at once.
+-- The application validates the schedule with sp_Generate_Exam's rules, reserves
+-- the Exam_IDs and draws the questions (question_pools.py); this procedure
+-- re-checks the same rules for the whole batch and inserts it in one transaction.
+CREATE PROCEDURE sp_Bulk_Generate_Exams
+    @Exams BulkExamsTableType READONLY,
+    @Exam_Questions ExamQuestionsTableType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE 
+        @Now DATETIME = GETDATE(),
+        @Bad_Exam_ID BIGINT = NULL;
+
+    -- 1. Validate Course IDs
+    SELECT TOP (1) @Bad_Exam_ID = e.Exam_ID
+    FROM @Exams e
+    LEFT JOIN Course c ON c.Course_ID = e.Course_ID
+    WHERE c.Course_ID IS NULL;
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Course name is invalid or does not exist. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    -- 2. Validate Exam Date (cannot be in the past)
+    SELECT TOP (1) @Bad_Exam_ID = Exam_ID FROM @Exams WHERE Exam_Date < CAST(@Now AS DATE);
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Exam date cannot be in the past. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    -- 3. Validate Exam Time (if same day, start time must be after current time)
+    SELECT TOP (1) @Bad_Exam_ID = Exam_ID 
+    FROM @Exams 
+    WHERE Exam_Date = CAST(@Now AS DATE) AND Start_Time < CAST(@Now AS TIME);
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Exam start time cannot be in the past. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    -- 4. Validate Exam Duration (cannot exceed 2 hours)
+    SELECT TOP (1) @Bad_Exam_ID = Exam_ID FROM @Exams WHERE DATEDIFF(MINUTE, Start_Time, End_Time) > 120;
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Exam duration cannot exceed 2 hours. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    -- 5. Validate Questions Count (max 25)
+    SELECT TOP (1) @Bad_Exam_ID = Exam_ID FROM @Exams WHERE No_TF + No_MCQ > 25;
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Total number of questions cannot exceed 25. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    -- 5b. Validate the drawn questions: each must belong to its exam's course
+    SELECT TOP (1) @Bad_Exam_ID = eq.Exam_ID
+    FROM @Exam_Questions eq
+    INNER JOIN @Exams e ON e.Exam_ID = eq.Exam_ID
+    LEFT JOIN Questions q ON q.Question_ID = eq.Question_ID AND q.Course_ID = e.Course_ID
+    WHERE q.Question_ID IS NULL;
+
+    IF @Bad_Exam_ID IS NOT NULL
+    BEGIN
+        RAISERROR('Question pool is out of date. (Exam_ID %I64d)', 16, 1, @Bad_Exam_ID);
+        RETURN;
+    END
+
+    BEGIN TRANSACTION;
+
+    -- 6. Insert all exams (Title and Total_Marks as in sp_Generate_Exam)
+    INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
+    SELECT 
+        e.Exam_ID, 
+        c.Course_Name + ' Exam', 
+        (e.No_TF + e.No_MCQ) * 2, 
+        e.Exam_Date, 
+        e.No_TF + e.No_MCQ, 
+        e.Start_Time, 
+        e.End_Time, 
+        e.Course_ID
+    FROM @Exams e
+    INNER JOIN Course c ON c.Course_ID = e.Course_ID;
+
+    -- 7. Insert all exam questions
+    INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+    SELECT eq.Exam_ID, eq.Question_ID
+    FROM @Exam_Questions eq
+    INNER JOIN @Exams e ON e.Exam_ID = eq.Exam_ID;
+
+    COMMIT TRANSACTION;
+
+    -- 8. Return one summary row per exam
+    SELECT 
+        e.Exam_ID,
+        c.Course_Name + ' Exam' AS Exam_Title,
+        c.Course_Name,
+        e.No_TF AS No_TF_Questions,
+        e.No_MCQ AS No_MCQ_Questions,
+        e.No_TF + e.No_MCQ AS Total_Questions,
+        e.Exam_Date,
+        e.Start_Time,
+        e.End_Time
+    FROM @Exams e
+    INNER JOIN Course c ON c.Course_ID = e.Course_ID
+    ORDER BY e.Exam_ID;
+END;
+
+-- EXEC sp_Bulk_Generate_Exams @Exams = ..., @Exam_Questions = ...;
\ No newline at end of file
@@ -0,0 +1,8 @@
+CREATE TYPE AutosaveAnswersTableType AS TABLE
+(
+    Student_ID BIGINT NOT NULL,
+    Exam_ID BIGINT NOT NULL,
+    Question_ID INT NOT NULL,
+    Selected_Choice_ID INT NOT NULL,
+    PRIMARY KEY (Student_ID, Exam_ID, Question_ID)
+);
\ No newline at end of file
@@ -0,0 +1,10 @@
+CREATE TYPE BulkExamsTableType AS TABLE
+(
+    Exam_ID BIGINT PRIMARY KEY,
+    Course_ID INT NOT NULL,
+    Exam_Date DATE NOT NULL,
+    Start_Time TIME(7) NOT NULL,
+    End_Time TIME(7) NOT NULL,
+    No_TF INT NOT NULL,
+    No_MCQ INT NOT NULL
+);
\ No newline at end of file
@@ -0,0 +1,4 @@
+CREATE TYPE ExamQuestionIDsTableType AS TABLE
+(
+    Question_ID INT PRIMARY KEY
+);
\ No newline at end of file
@@ -0,0 +1,6 @@
+CREATE TYPE ExamQuestionsTableType AS TABLE
+(
+    Exam_ID BIGINT NOT NULL,
+    Question_ID INT NOT NULL,
+    PRIMARY KEY (Exam_ID, Question_ID)
+);
\ No newline at end of file
@@ -0,0 +1,6 @@
+CREATE TYPE GradedAnswersTableType AS TABLE
+(
+    Question_ID INT,
+    Is_Correct BIT,
+    Ques_Mark INT
+);
\ No newline at end of file
@@ -0,0 +1,7 @@
+CREATE TYPE RegradedAnswersTableType AS TABLE
+(
+    Student_ID BIGINT,
+    Question_ID INT,
+    Is_Correct BIT,
+    Ques_Mark INT
+);
\ No newline at end of file
@@ -0,0 +1,5 @@
+CREATE TYPE StudentScoresTableType AS TABLE
+(
+    Student_ID BIGINT,
+    Student_Score INT
+);
\ No newline at end of file
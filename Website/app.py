@@ -1,707 +1,899 @@
-# app.py - COMPLETE WITH ALL FUNCTIONS
-from flask import Flask, render_template, request, redirect, url_for, session
-from database import get_db_connection
-from datetime import datetime
-
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'iti-exam-system-secret-key-2024'
-
-def execute_stored_procedure(procedure_name, params=None, fetch=False):
-    """Execute stored procedures instead of direct queries"""
-    conn = get_db_connection()
-    if not conn:
-        print(" No database connection in execute_stored_procedure")
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        
-        # Build the stored procedure call
-        param_placeholders = ', '.join(['?'] * len(params)) if params else ''
-        sql = f"EXEC {procedure_name} {param_placeholders}"
-        
-        print(f" Executing stored procedure: {sql}")
-        print(f" With params: {params}")
-        
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
-        
-        # **DEBUG: Check if we have results**
-        if cursor.description:
-            print(f" Stored procedure returned columns: {[column[0] for column in cursor.description]}")
-        else:
-            print(" Stored procedure returned no columns (no result set)")
-        
-        if fetch:
-            # For stored procedures that return data
-            if cursor.description:  # Check if there are results
-                columns = [column[0] for column in cursor.description]
-                results = []
-                rows = cursor.fetchall()
-                
-                
-                for row in rows:
-                    row_dict = dict(zip(columns, row))
-                    results.append(row_dict)
-                    
-                
-                return results
-            else:
-                
-                return None
-        else:
-            # For procedures that don't return data (INSERT/UPDATE)
-            conn.commit()
-            return True
-            
-    except Exception as e:
-        print(f" Stored procedure error: {e}")
-        import traceback
-        print(f" Full error details: {traceback.format_exc()}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
-
-def execute_query(query, params=None, fetch=False):
-    """Execute direct database queries safely"""
-    conn = get_db_connection()
-    if not conn:
-        print(" No database connection")
-        return None
-    
-    try:
-        cursor = conn.cursor()
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        if fetch:
-            if 'SELECT' in query.upper():
-                columns = [column[0] for column in cursor.description]
-                results = []
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
-                return results
-            return cursor.fetchall()
-        else:
-            conn.commit()
-            return True
-            
-    except Exception as e:
-        print(f" Query error: {e}")
-        return None
-    finally:
-        conn.close()
-
-
-@app.route('/')
-def home():
-    return render_template('index.html')
-
-@app.route('/student/login', methods=['GET', 'POST'])
-def student_login():
-    if request.method == 'POST':
-        student_id = request.form.get('student_id', '').strip()
-        password = request.form.get('password', '').strip()
-        
-        if not student_id or not password:
-            return render_template('student/login.html', error='Please fill in all fields')
-        
-        # Using direct query for login (simple check)
-        query = "SELECT Student_ID, Student_Name FROM Student WHERE Student_ID = ? AND Password = ?"
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, (student_id, password))
-                columns = [column[0] for column in cursor.description]
-                student = cursor.fetchone()
-                if student:
-                    student_dict = dict(zip(columns, student))
-                    session['student_id'] = student_dict['Student_ID']
-                    session['user_type'] = 'student'
-                    session['student_name'] = student_dict['Student_Name']
-                    return redirect(url_for('student_dashboard'))
-                else:
-                    return render_template('student/login.html', error='Invalid Student ID or password')
-            except Exception as e:
-                return render_template('student/login.html', error='Login error')
-            finally:
-                conn.close()
-        else:
-            return render_template('student/login.html', error='Database connection failed')
-    
-    return render_template('student/login.html')
-
-@app.route('/instructor/login', methods=['GET', 'POST'])
-def instructor_login():
-    if request.method == 'POST':
-        instructor_id = request.form.get('instructor_id', '').strip()
-        password = request.form.get('password', '').strip()
-        
-        if not instructor_id or not password:
-            return render_template('instructor/login.html', error='Please fill in all fields')
-        
-        # Using direct query for login (simple check)
-        query = "SELECT Instructor_ID, Instructor_Name FROM Instructor WHERE Instructor_ID = ? AND Password = ?"
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute(query, (instructor_id, password))
-                columns = [column[0] for column in cursor.description]
-                instructor = cursor.fetchone()
-                if instructor:
-                    instructor_dict = dict(zip(columns, instructor))
-                    session['instructor_id'] = instructor_dict['Instructor_ID']
-                    session['user_type'] = 'instructor'
-                    session['instructor_name'] = instructor_dict['Instructor_Name']
-                    return redirect(url_for('instructor_dashboard'))
-                else:
-                    return render_template('instructor/login.html', error='Invalid Instructor ID or password')
-            except Exception as e:
-                return render_template('instructor/login.html', error='Login error')
-            finally:
-                conn.close()
-        else:
-            return render_template('instructor/login.html', error='Database connection failed')
-    
-    return render_template('instructor/login.html')
-
-@app.route('/logout')
-def logout():
-    session.clear()
-    return redirect(url_for('home'))
-
-
-@app.route('/student/dashboard')
-def student_dashboard():
-    if 'student_id' not in session or session['user_type'] != 'student':
-        return redirect(url_for('student_login'))
-    
-    # Get current date and time
-    current_datetime = datetime.now()
-    current_date = current_datetime.strftime('%Y-%m-%d')
-    current_time = current_datetime.strftime('%H:%M:%S')
-    
-    print(f"🔍 Current date: {current_date}, Current time: {current_time}")
-    
-    # Get available exams - ONLY exams that are scheduled for NOW
-    available_exams_query = """
-    SELECT e.Exam_ID, e.Title, e.Exam_Date, e.Start_Time, e.End_Time, c.Course_Name, e.Total_Marks
-    FROM Exams e
-    JOIN Course c ON e.Course_ID = c.Course_ID
-    WHERE e.Exam_Date = ? 
-      AND e.Start_Time <= ? 
-      AND e.End_Time >= ?
-      AND NOT EXISTS (
-        SELECT 1 FROM Student_Exam se 
-        WHERE se.Student_ID = ? AND se.Exam_ID = e.Exam_ID
-      )
-    ORDER BY e.Start_Time
-    """
-    
-    
-    available_exams = []
-    conn1 = get_db_connection()
-    if conn1:
-        try:
-            cursor = conn1.cursor()
-            cursor.execute(available_exams_query, (current_date, current_time, current_time, session['student_id']))
-            columns = [column[0] for column in cursor.description]
-            for row in cursor.fetchall():
-                available_exams.append(dict(zip(columns, row)))
-            print(f"🔍 Found {len(available_exams)} available exams for current time")
-        except Exception as e:
-            print(f"Error getting available exams: {e}")
-        finally:
-            conn1.close()
-    
-    # Get completed exams
-    completed_exams_query = """
-    SELECT se.Exam_ID, e.Title as Exam_Title, se.Student_Score, e.Total_Marks,
-           c.Course_Name, se.Exam_Status
-    FROM Student_Exam se
-    JOIN Exams e ON se.Exam_ID = e.Exam_ID
-    JOIN Course c ON e.Course_ID = c.Course_ID
-    WHERE se.Student_ID = ?
-    """
-    completed_exams = []
-    conn2 = get_db_connection()
-    if conn2:
-        try:
-            cursor = conn2.cursor()
-            cursor.execute(completed_exams_query, (session['student_id'],))
-            columns = [column[0] for column in cursor.description]
-            for row in cursor.fetchall():
-                completed_exams.append(dict(zip(columns, row)))
-        except Exception as e:
-            print(f"Error getting completed exams: {e}")
-        finally:
-            conn2.close()
-    
-    return render_template('student/dashboard.html',
-                         student_name=session['student_name'],
-                         grades=completed_exams,
-                         available_exams=available_exams,
-                         current_time=current_datetime.strftime('%Y-%m-%d %H:%M'))
-@app.route('/exam/<int:exam_id>')
-def take_exam(exam_id):
-    if 'student_id' not in session:
-        return redirect(url_for('student_login'))
-    
-    # Use stored procedure to start exam and get questions
-    exam_data = execute_stored_procedure('sp_Start_Exam', [exam_id, session['student_id']], fetch=True)
-    
-    if not exam_data:
-        return "Cannot start exam. It may not be available or you've already taken it."
-    
-    # Get exam details using stored procedure
-    exam_details = execute_stored_procedure('Get_Exam_By_ID', [exam_id], fetch=True)
-    
-    # Organize questions by question ID
-    organized_questions = {}
-    for question in exam_data:
-        qid = question['Question_ID']
-        if qid not in organized_questions:
-            organized_questions[qid] = {
-                'text': question['Question_Head'],
-                'type': question['Question_Type'],
-                'choices': []
-            }
-        organized_questions[qid]['choices'].append({
-            'choice_id': question['Choice_ID'],
-            'text': question['Choice_Text']
-        })
-    
-    return render_template('student/exam.html', 
-                         exam=exam_details[0] if exam_details else {'Title': 'Exam', 'Exam_ID': exam_id},
-                         questions=organized_questions,
-                         exam_id=exam_id)
-
-@app.route('/submit_exam/<int:exam_id>', methods=['POST'])
-def submit_exam(exam_id):
-    if 'student_id' not in session:
-        return redirect(url_for('student_login'))
-    
-    student_id = session['student_id']
-    answers = request.form
-    
-    # Workaround: Insert answers directly
-    conn = get_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            
-            # First, create student exam record
-            cursor.execute("""
-                INSERT INTO Student_Exam (Exam_ID, Student_ID, Student_Score, Submission_Time, Exam_Status)
-                VALUES (?, ?, 0, GETDATE(), 'Submitted')
-            """, (exam_id, student_id))
-            
-            # Then insert each answer
-            for question_id, choice_id in answers.items():
-                if question_id.startswith('question_'):
-                    qid = question_id.replace('question_', '')
-                    cursor.execute("""
-                        INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
-                        VALUES (?, ?, ?, ?, 0)
-                    """, (student_id, exam_id, qid, choice_id))
-            
-            conn.commit()
-            
-            # Auto-correct the exam using stored procedure
-            execute_stored_procedure('sp_Correct_Exam', [exam_id, student_id])
-            
-        except Exception as e:
-            print(f"Error submitting exam: {e}")
-            return "Error submitting exam"
-        finally:
-            conn.close()
-    
-    return redirect(url_for('exam_results', exam_id=exam_id))
-
-@app.route('/results/<int:exam_id>')
-def exam_results(exam_id):
-    if 'student_id' not in session:
-        return redirect(url_for('student_login'))
-    
-    # Get exam results with student answers using stored procedure
-    results = execute_stored_procedure('Get_Exam_Questions_With_Student_Answers', 
-                                     [exam_id, session['student_id']], fetch=True) or []
-    
-    # Get exam details
-    exam_details = execute_stored_procedure('Get_Exam_By_ID', [exam_id], fetch=True)
-    
-    # Calculate total score
-    total_score = sum(result['Ques_Mark'] for result in results) if results else 0
-    
-    return render_template('student/results.html', 
-                         results=results,
-                         exam=exam_details[0] if exam_details else None,
-                         total_score=total_score,
-                         exam_id=exam_id)
-
-
-@app.route('/instructor/dashboard')
-def instructor_dashboard():
-    if 'instructor_id' not in session or session['user_type'] != 'instructor':
-        return redirect(url_for('instructor_login'))
-    
-    # Get instructor courses using stored procedure
-    courses = execute_stored_procedure('GetInstructorCoursesWithStudentCount', 
-                                     [session['instructor_id']], fetch=True) or []
-    
-    # Get course IDs for this instructor
-    course_names = [course['Course_Name'] for course in courses]
-    
-    # Get exams only for instructor's courses - SIMPLIFIED
-    exams_query = """
-    SELECT e.Exam_ID, e.Title, e.Exam_Date, c.Course_Name,
-       (SELECT COUNT(*) FROM Student_Exam se WHERE se.Exam_ID = e.Exam_ID) as students_taken, 
-       e.Total_Marks
-    FROM Exams e
-    JOIN Course c ON e.Course_ID = c.Course_ID
-    WHERE c.Course_Name IN ({})
-    ORDER BY e.Exam_Date DESC
-    """.format(','.join(['?'] * len(course_names)))
-    
-    conn = get_db_connection()
-    exams = []
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute(exams_query, course_names)
-            columns = [column[0] for column in cursor.description]
-            for row in cursor.fetchall():
-                exams.append(dict(zip(columns, row)))
-        except Exception as e:
-            print(f"Error getting exams: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('instructor/dashboard.html',
-                         instructor_name=session['instructor_name'],
-                         courses=courses,
-                         exams=exams)
-
-@app.route('/instructor/create_exam', methods=['GET', 'POST'])
-def create_exam():
-    if 'instructor_id' not in session:
-        return redirect(url_for('instructor_login'))
-    
-    if request.method == 'POST':
-        # Get form data
-        course_name = request.form.get('course_name')
-        exam_date = request.form.get('exam_date')
-        start_time = request.form.get('start_time')
-        end_time = request.form.get('end_time')
-        no_tf = int(request.form.get('no_tf', 0))
-        no_mcq = int(request.form.get('no_mcq', 0))
-        
-        print(f" Creating exam with: {course_name}, {exam_date}, {start_time}, {end_time}, TF: {no_tf}, MCQ: {no_mcq}")
-        
-        # **ALTERNATIVE APPROACH: Use direct connection**
-        conn = get_db_connection()
-        if not conn:
-            return render_template('instructor/exam_error.html',
-                                 error_message="Database connection failed.")
-        
-        try:
-            cursor = conn.cursor()
-            
-            # Call stored procedure directly
-            sql = "EXEC sp_Generate_Exam ?, ?, ?, ?, ?, ?"
-            params = [course_name, exam_date, start_time, end_time, no_tf, no_mcq]
-            
-            print(f" Direct SQL: {sql}")
-            print(f" Direct params: {params}")
-            
-            cursor.execute(sql, params)
-            
-            # Check if we got results
-            if cursor.description:
-                columns = [column[0] for column in cursor.description]
-                row = cursor.fetchone()
-                
-                if row:
-                    exam_data = dict(zip(columns, row))
-                    print(f"✅ Exam created successfully: {exam_data}")
-                    
-                    conn.commit()
-                    
-                    return render_template('instructor/exam_created.html',
-                                         exam_id=exam_data['Exam_ID'],
-                                         exam_title=exam_data['Exam_Title'],
-                                         course_name=exam_data['Course_Name'],
-                                         exam_date=exam_data['Exam_Date'],
-                                         start_time=exam_data['Start_Time'],
-                                         end_time=exam_data['End_Time'],
-                                         no_tf=exam_data['No_TF_Questions'],
-                                         no_mcq=exam_data['No_MCQ_Questions'],
-                                         total_questions=exam_data['Total_Questions'])
-                else:
-                    conn.rollback()
-                    return render_template('instructor/exam_error.html',
-                                         error_message="Stored procedure executed but returned no data.")
-            else:
-                conn.rollback()
-                return render_template('instructor/exam_error.html',
-                                     error_message="Stored procedure executed but returned no result set.")
-            
-        except Exception as e:
-            conn.rollback()
-            print(f" Error in create_exam: {str(e)}")
-            
-            error_msg = str(e)
-            if "Exam date cannot be in the past" in error_msg:
-                error_msg = "Exam date cannot be in the past."
-            elif "Exam start time cannot be in the past" in error_msg:
-                error_msg = "Exam start time cannot be in the past for today's date."
-            elif "Exam duration cannot exceed 2 hours" in error_msg:
-                error_msg = "Exam duration cannot exceed 2 hours."
-            elif "Total number of questions cannot exceed 25" in error_msg:
-                error_msg = "Total number of questions cannot exceed 25."
-            elif "Course name is invalid" in error_msg:
-                error_msg = "Course name is invalid or does not exist."
-            else:
-                error_msg = f"Database error: {error_msg}"
-            
-            return render_template('instructor/exam_error.html',
-                                 error_message=error_msg)
-        finally:
-            conn.close()
-    
-    # GET request - keep your existing code
-    courses_query = """
-    SELECT DISTINCT c.Course_Name 
-    FROM Course c
-    INNER JOIN Questions q ON c.Course_ID = q.Course_ID
-    WHERE EXISTS (
-        SELECT 1 FROM Questions q2 
-        WHERE q2.Course_ID = c.Course_ID
-    )
-    ORDER BY c.Course_Name
-    """
-    
-    conn = get_db_connection()
-    courses = []
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute(courses_query)
-            courses = [row[0] for row in cursor.fetchall()]
-            print(f" Available courses with questions: {len(courses)} courses")
-        except Exception as e:
-            print(f"Error getting courses: {e}")
-        finally:
-            conn.close()
-    
-    today = datetime.now().strftime('%Y-%m-%d')
-    return render_template('instructor/create_exam.html', courses=courses, today=today)
-@app.route('/debug/check-exams')
-def debug_check_exams():
-    """Check all exams in the database"""
-    conn = get_db_connection()
-    if not conn:
-        return "No database connection"
-    
-    try:
-        cursor = conn.cursor()
-        
-        # Check Exams table
-        cursor.execute("SELECT * FROM Exams ORDER BY Exam_ID DESC")
-        exams = cursor.fetchall()
-        
-        # Check Exam_Questions table
-        cursor.execute("""
-            SELECT eq.Exam_ID, COUNT(eq.Question_ID) as question_count 
-            FROM Exam_Questions eq 
-            GROUP BY eq.Exam_ID
-        """)
-        exam_questions = cursor.fetchall()
-        
-        result = "<h1>Database Exams Debug</h1>"
-        
-        result += "<h2>Exams Table:</h2>"
-        if exams:
-            result += f"<p>Found {len(exams)} exams</p>"
-            result += "<table border='1'><tr><th>Exam_ID</th><th>Title</th><th>Exam_Date</th><th>Start_Time</th><th>End_Time</th><th>Course_ID</th></tr>"
-            for exam in exams:
-                result += f"<tr><td>{exam[0]}</td><td>{exam[1]}</td><td>{exam[4]}</td><td>{exam[5]}</td><td>{exam[6]}</td><td>{exam[7]}</td></tr>"
-            result += "</table>"
-        else:
-            result += "<p>No exams found in database</p>"
-        
-        result += "<h2>Exam Questions:</h2>"
-        if exam_questions:
-            result += "<table border='1'><tr><th>Exam_ID</th><th>Question Count</th></tr>"
-            for eq in exam_questions:
-                result += f"<tr><td>{eq[0]}</td><td>{eq[1]}</td></tr>"
-            result += "</table>"
-        else:
-            result += "<p>No exam questions found</p>"
-            
-        return result
-        
-    except Exception as e:
-        return f"Error: {e}"
-    finally:
-        conn.close()
-@app.route('/debug-db-state')
-def debug_db_state():
-    """Check current database state"""
-    conn = get_db_connection()
-    if not conn:
-        return "No database connection"
-    
-    try:
-        cursor = conn.cursor()
-        
-        result = "<h1>Database State Debug</h1>"
-        
-        # Check max exam ID
-        cursor.execute("SELECT ISNULL(MAX(Exam_ID), 0) as max_exam_id FROM Exams")
-        max_id = cursor.fetchone()[0]
-        result += f"<h2>Current Max Exam ID: {max_id}</h2>"
-        
-        # Check courses
-        cursor.execute("SELECT Course_ID, Course_Name FROM Course")
-        courses = cursor.fetchall()
-        result += f"<h2>Available Courses ({len(courses)}):</h2>"
-        for course in courses:
-            result += f"<p>ID: {course[0]}, Name: {course[1]}</p>"
-        
-        # Check questions count by course and type
-        cursor.execute("""
-        SELECT c.Course_Name, q.Question_Type, COUNT(*) as question_count
-        FROM Questions q
-        JOIN Course c ON q.Course_ID = c.Course_ID
-        GROUP BY c.Course_Name, q.Question_Type
-        ORDER BY c.Course_Name, q.Question_Type
-        """)
-        questions = cursor.fetchall()
-        result += "<h2>Questions by Course and Type:</h2>"
-        for question in questions:
-            result += f"<p>{question[0]} - {question[1]}: {question[2]} questions</p>"
-        
-        return result
-        
-    except Exception as e:
-        return f"Error: {e}"
-    finally:
-        conn.close()
-@app.route('/instructor/add_questions/<int:exam_id>', methods=['GET', 'POST'])
-def add_questions(exam_id):
-    if 'instructor_id' not in session:
-        return redirect(url_for('instructor_login'))
-    
-    if request.method == 'POST':
-        question_text = request.form.get('question_text')
-        question_type = request.form.get('question_type', 'multiple_choice')
-        correct_answer = request.form.get('correct_answer')
-        choices = request.form.getlist('choices')
-        
-        # Insert question using execute_query (now defined)
-        question_query = "INSERT INTO Questions (Question_Type, Question_Text, Correct_Answer) VALUES (?, ?, ?)"
-        question_result = execute_query(question_query, (question_type, question_text, correct_answer))
-        
-        if question_result:
-            # Get the last inserted question ID
-            get_last_id = "SELECT MAX(Question_ID) as last_id FROM Questions"
-            last_id_result = execute_query(get_last_id, fetch=True)
-            
-            if last_id_result and last_id_result[0]['last_id']:
-                question_id = last_id_result[0]['last_id']
-                
-                # Link question to exam
-                link_query = "INSERT INTO Exam_Questions (Exam_ID, Question_ID) VALUES (?, ?)"
-                execute_query(link_query, (exam_id, question_id))
-                
-                # Add choices if multiple choice
-                if question_type == 'multiple_choice' and choices:
-                    for choice in choices:
-                        if choice.strip():  # Only add non-empty choices
-                            choice_query = "INSERT INTO Question_Choices (Question_ID, Choices) VALUES (?, ?)"
-                            execute_query(choice_query, (question_id, choice.strip()))
-                
-                return redirect(url_for('instructor_dashboard'))
-    
-    return render_template('instructor/add_questions.html', exam_id=exam_id)
-
-@app.route('/instructor/exam/<int:exam_id>')
-def view_exam_results(exam_id):
-    if 'instructor_id' not in session:
-        return redirect(url_for('instructor_login'))
-    
-    # Get exam details
-    exam_details = execute_stored_procedure('Get_Exam_By_ID', [exam_id], fetch=True)
-    
-    # Get student results for this exam
-    results_query = """
-    SELECT se.Student_ID, s.Student_Name, se.Student_Score, e.Total_Marks,
-           se.Submission_Time, se.Exam_Status
-    FROM Student_Exam se
-    JOIN Student s ON se.Student_ID = s.Student_ID
-    JOIN Exams e ON se.Exam_ID = e.Exam_ID
-    WHERE se.Exam_ID = ?
-    ORDER BY se.Student_Score DESC
-    """
-    conn = get_db_connection()
-    results = []
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute(results_query, (exam_id,))
-            columns = [column[0] for column in cursor.description]
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-        except Exception as e:
-            print(f"Error getting results: {e}")
-        finally:
-            conn.close()
-    
-    return render_template('instructor/exam_results.html',
-                         exam=exam_details[0] if exam_details else None,
-                         results=results)
-
-@app.route('/branches')
-def branches():
-    """Branches information page"""
-    branches_data = [
-        {"name": "Smart Village", "location": "30°04'16.2\"N 31°01'15.7\"E", "year": 2009, "city": "Giza"},
-        {"name": "New Capital", "location": "30°01'21.2\"N 31°42'20.7\"E", "year": 2022, "city": "New Administrative Capital"},
-        {"name": "Cairo University", "location": "30°01'45.8\"N 31°12'07.1\"E", "year": 2022, "city": "Giza"},
-        {"name": "Alexandria", "location": "31°11'34.7\"N 29°54'21.9\"E", "year": 1996, "city": "Alexandria"},
-        {"name": "Assiut", "location": "27°11'16.1\"N 31°10'09.7\"E", "year": 2007, "city": "Assiut"},
-        {"name": "Aswan", "location": "23°59'56.6\"N 32°51'18.9\"E", "year": 2021, "city": "Aswan"},
-        {"name": "Beni Suef", "location": "29°00'33.9\"N 31°09'08.6\"E", "year": 2023, "city": "Beni Suef"},
-        {"name": "Fayoum", "location": "29°19'24.1\"N 30°50'17.8\"E", "year": 2024, "city": "Fayoum"},
-        {"name": "Ismailia", "location": "30°37'16.2\"N 32°16'07.9\"E", "year": 2013, "city": "Ismailia"},
-        {"name": "Mansoura", "location": "31°02'27.9\"N 31°21'16.2\"E", "year": 2007, "city": "Mansoura"},
-        {"name": "Menofia", "location": "30°33'29.4\"N 31°01'08.2\"E", "year": 2020, "city": "Menofia"},
-        {"name": "Minya", "location": "28°07'40.4\"N 30°43'55.5\"E", "year": 2020, "city": "Minya"},
-        {"name": "Qena", "location": "26°11'22.5\"N 32°44'49.3\"E", "year": 2020, "city": "Qena"},
-        {"name": "Sohag", "location": "26°27'31.2\"N 31°40'21.2\"E", "year": 2020, "city": "Sohag"},
-        {"name": "Tanta", "location": "30°49'34.8\"N 31°00'07.2\"E", "year": 2024, "city": "Tanta"},
-        {"name": "Zagazig", "location": "30°35'15.6\"N 31°28'47.1\"E", "year": 2024, "city": "Zagazig"},
-        {"name": "New Valley", "location": "25°27'23.2\"N 30°32'55.0\"E", "year": 2023, "city": "New Valley"},
-        {"name": "Damanhour", "location": "31°02'15.0\"N 30°25'59.3\"E", "year": 2024, "city": "Damanhour"},
-        {"name": "Al Arish", "location": "31°07'57.8\"N 33°49'38.5\"E", "year": 2024, "city": "Al Arish"},
-        {"name": "Banha", "location": "30°28'31.6\"N 31°11'55.5\"E", "year": 2024, "city": "Banha"},
-        {"name": "Port Said", "location": "31°14'46.7\"N 32°18'50.4\"E", "year": 2024, "city": "Port Said"},
-        {"name": "Damietta", "location": "31°30'01.0\"N 31°49'34.2\"E", "year": 2024, "city": "Damietta"}
-    ]
-    
-    return render_template('branches.html', branches=branches_data)
-
-
-if __name__ == '__main__':
-    print("🚀 ITI Exam System Starting...")
-    print("📍 Local: http://localhost:5000")
+# app.py - COMPLETE WITH ALL FUNCTIONS
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify
+from database import get_db_connection, begin_request_scope, end_request_scope, request_db_stats
+from caches import exam_papers, student_dashboards, graded_results, load_exam_results
+from exam_schedule import todays_exams
+from exam_variants import questions_for
+from exam_pages import exam_pages
+from prewarm import prewarm_scheduler
+from autosave import autosaves, valid_changes
+from deadlines import deadline_sweeper
+from config import Config
+from submissions import parse_answers, insert_submission, is_duplicate_submission, submission_ledger
+from grading_queue import grading_queue
+from grading import grade_submission, apply_grades
+from id_allocator import exam_ids, question_ids, choice_ids
+from question_pools import question_pools
+from bulk_schedule import parse_schedule, json_entries, schedule_exams
+from instrumentation import SCOPE_ENVIRON_KEY, MetricsMiddleware, configure_logging, request_metrics
+from slow_queries import slow_statements
+from datetime import datetime
+import hmac
+import logging
+
+configure_logging(Config.LOG_LEVEL, Config.LOG_SAMPLE_RATE)
+log = logging.getLogger(__name__)
+
+app = Flask(__name__)
+app.config['SECRET_KEY'] = 'iti-exam-system-secret-key-2024'
+
+# Wall time, DB time, rows and statements per endpoint, exported at /metrics
+app.wsgi_app = MetricsMiddleware(app.wsgi_app, request_metrics)
+
+@app.before_request
+def open_request_scope():
+    # Every get_db_connection() of the handler returns one pooled connection,
+    # so a request costs at most one checkout and runs in one transaction
+    begin_request_scope(request.endpoint)
+    # Started by the first request, so it runs under any WSGI server too
+    prewarm_scheduler.start()
+
+@app.before_request
+def require_metrics_access():
+    # Metrics expose SQL text, query plans and timings: instructors, or a
+    # scraper sending the configured token
+    if request.path != '/metrics' and not request.path.startswith('/metrics/'):
+        return None
+    if 'instructor_id' in session:
+        return None
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if Config.METRICS_TOKEN and scheme.lower() == 'bearer' and hmac.compare_digest(token.encode(), Config.METRICS_TOKEN.encode()):
+        return None
+    return jsonify({'error': 'Not authorized'}), 401
+
+@app.teardown_request
+def close_request_scope(error=None):
+    # Back to the pool; anything the handler did not commit is rolled back
+    scope = end_request_scope(error)
+    if scope is not None:
+        request_db_stats.record(scope)
+        request.environ[SCOPE_ENVIRON_KEY] = scope
+
+def execute_stored_procedure(procedure_name, params=None, fetch=False):
+    """Execute stored procedures instead of direct queries"""
+    conn = get_db_connection()
+    if not conn:
+        log.error("No database connection in execute_stored_procedure")
+        return None
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Build the stored procedure call
+        param_placeholders = ', '.join(['?'] * len(params)) if params else ''
+        sql = f"EXEC {procedure_name} {param_placeholders}"
+        
+        log.debug("Executing stored procedure: %s with params: %s", sql, params)
+        
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql)
+        
+        if fetch:
+            # For stored procedures that return data
+            if cursor.description:  # Check if there are results
+                columns = [column[0] for column in cursor.description]
+                results = []
+                rows = cursor.fetchall()
+                
+                
+                for row in rows:
+                    row_dict = dict(zip(columns, row))
+                    results.append(row_dict)
+                    
+                
+                return results
+            else:
+                
+                return None
+        else:
+            # For procedures that don't return data (INSERT/UPDATE)
+            conn.commit()
+            return True
+            
+    except Exception:
+        log.exception("Stored procedure error in %s", procedure_name)
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+def execute_query(query, params=None, fetch=False):
+    """Execute direct database queries safely"""
+    conn = get_db_connection()
+    if not conn:
+        log.error("No database connection")
+        return None
+    
+    try:
+        cursor = conn.cursor()
+        
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        
+        if fetch:
+            if 'SELECT' in query.upper():
+                columns = [column[0] for column in cursor.description]
+                results = []
+                for row in cursor.fetchall():
+                    results.append(dict(zip(columns, row)))
+                return results
+            return cursor.fetchall()
+        else:
+            conn.commit()
+            return True
+            
+    except Exception as e:
+        log.error("Query error: %s", e)
+        return None
+    finally:
+        conn.close()
+
+
+@app.route('/')
+def home():
+    return render_template('index.html')
+
+@app.route('/student/login', methods=['GET', 'POST'])
+def student_login():
+    if request.method == 'POST':
+        student_id = request.form.get('student_id', '').strip()
+        password = request.form.get('password', '').strip()
+        
+        if not student_id or not password:
+            return render_template('student/login.html', error='Please fill in all fields')
+        
+        # Using direct query for login (simple check)
+        query = "SELECT Student_ID, Student_Name FROM Student WHERE Student_ID = ? AND Password = ?"
+        conn = get_db_connection()
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query, (student_id, password))
+                columns = [column[0] for column in cursor.description]
+                student = cursor.fetchone()
+                if student:
+                    student_dict = dict(zip(columns, student))
+                    session['student_id'] = student_dict['Student_ID']
+                    session['user_type'] = 'student'
+                    session['student_name'] = student_dict['Student_Name']
+                    return redirect(url_for('student_dashboard'))
+                else:
+                    return render_template('student/login.html', error='Invalid Student ID or password')
+            except Exception as e:
+                return render_template('student/login.html', error='Login error')
+            finally:
+                conn.close()
+        else:
+            return render_template('student/login.html', error='Database connection failed')
+    
+    return render_template('student/login.html')
+
+@app.route('/instructor/login', methods=['GET', 'POST'])
+def instructor_login():
+    if request.method == 'POST':
+        instructor_id = request.form.get('instructor_id', '').strip()
+        password = request.form.get('password', '').strip()
+        
+        if not instructor_id or not password:
+            return render_template('instructor/login.html', error='Please fill in all fields')
+        
+        # Using direct query for login (simple check)
+        query = "SELECT Instructor_ID, Instructor_Name FROM Instructor WHERE Instructor_ID = ? AND Password = ?"
+        conn = get_db_connection()
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(query, (instructor_id, password))
+                columns = [column[0] for column in cursor.description]
+                instructor = cursor.fetchone()
+                if instructor:
+                    instructor_dict = dict(zip(columns, instructor))
+                    session['instructor_id'] = instructor_dict['Instructor_ID']
+                    session['user_type'] = 'instructor'
+                    session['instructor_name'] = instructor_dict['Instructor_Name']
+                    return redirect(url_for('instructor_dashboard'))
+                else:
+                    return render_template('instructor/login.html', error='Invalid Instructor ID or password')
+            except Exception as e:
+                return render_template('instructor/login.html', error='Login error')
+            finally:
+                conn.close()
+        else:
+            return render_template('instructor/login.html', error='Database connection failed')
+    
+    return render_template('instructor/login.html')
+
+@app.route('/logout')
+def logout():
+    session.clear()
+    return redirect(url_for('home'))
+
+
+@app.route('/student/dashboard')
+def student_dashboard():
+    if 'student_id' not in session or session['user_type'] != 'student':
+        return redirect(url_for('student_login'))
+    
+    # Get current date and time
+    current_datetime = datetime.now()
+    
+    # Completed exams (sp_Get_Student_Dashboard), served from a few-second
+    # per-student cache while students keep refreshing
+    dashboard = student_dashboards.get(session['student_id'])
+    completed_exams = dashboard['completed_exams'] if dashboard else []
+    
+    # Exams open right now come from the in-memory index of today's exams; a
+    # failed reload keeps serving it, and it is missing only if today's never loaded
+    available_exams = todays_exams.open_for(session['student_id']) or []
+    
+    return render_template('student/dashboard.html',
+                         student_name=session['student_name'],
+                         grades=completed_exams,
+                         available_exams=available_exams,
+                         current_time=current_datetime.strftime('%Y-%m-%d %H:%M'))
+@app.route('/exam/<int:exam_id>')
+def take_exam(exam_id):
+    if 'student_id' not in session:
+        return redirect(url_for('student_login'))
+    
+    # Cheap per-student checks (exists, not taken, date and time window)
+    eligibility = execute_stored_procedure('sp_Check_Exam_Eligibility', [exam_id, session['student_id']], fetch=True)
+    
+    if not eligibility:
+        return "Cannot start exam. It may not be available or you've already taken it."
+    
+    # Questions and choices are the same for every student - loaded once per exam,
+    # normally before Start_Time by the pre-warm scheduler (prewarm.py)
+    was_cached = exam_id in exam_papers
+    paper = exam_papers.get(exam_id)
+    
+    if not paper or not paper['questions']:
+        return "Cannot start exam. It may not be available or you've already taken it."
+    
+    prewarm_scheduler.record_open(paper['exam'], was_cached)
+    
+    # Auto-submitted from its last autosave if still open when the window closes
+    deadline_sweeper.track(exam_id, session['student_id'], paper['closes_at'])
+    
+    # Each student gets their own question/choice order, computed in memory;
+    # the page is joined from fragments rendered once per exam (exam_pages.py)
+    if Config.EXAM_PAGE_FRAGMENTS:
+        return exam_pages.render(paper, exam_id, session['student_id'])
+    
+    return render_template('student/exam.html', 
+                         exam=paper['exam'],
+                         questions=questions_for(paper['questions'], exam_id, session['student_id']),
+                         exam_id=exam_id)
+
+@app.route('/submit_exam/<int:exam_id>', methods=['POST'])
+def submit_exam(exam_id):
+    if 'student_id' not in session:
+        return redirect(url_for('student_login'))
+    
+    student_id = session['student_id']
+    
+    # No submissions once the window (plus a short grace period) has closed;
+    # a closed exam's window stays known without reloading its paper, and
+    # without a window there is nothing to check against, so refuse
+    paper = exam_papers.get(exam_id)
+    closes_at = paper['closes_at'] if paper else exam_papers.closed_at(exam_id)
+    if closes_at is None:
+        return "Cannot submit exam. It may not be available."
+    if not deadline_sweeper.begin_submission(exam_id, closes_at):
+        return "Exam time is over. Your answers were not accepted."
+    
+    # A double click or a retry carries the same token: only the first request
+    # reaches the database, the others wait for it and get the same outcome
+    try:
+        error = submission_ledger.run_once(exam_id, student_id, request.form.get('submission_token'),
+                                           lambda: save_submission(exam_id, student_id, request.form))
+    finally:
+        # The deadline sweep of the exam waits for this
+        deadline_sweeper.end_submission(exam_id)
+    if error:
+        return error
+    
+    return redirect(url_for('exam_results', exam_id=exam_id))
+
+def save_submission(exam_id, student_id, form):
+    """Write, grade and commit one submission; returns an error message or None"""
+    answers = parse_answers(form)
+    
+    # Answers still in the autosave buffer go in with the submission; the form wins.
+    # The buffer is only dropped once the submission is committed
+    buffered = autosaves.buffered(exam_id, student_id)
+    if buffered:
+        answers = list({**buffered, **dict(answers)}.items())
+    
+    conn = get_db_connection()
+    if not conn:
+        return "Error submitting exam"
+    try:
+        cursor = conn.cursor()
+        
+        # Student_Exam row + every answer in one set-based call (sp_Submit_Exam)
+        insert_submission(cursor, exam_id, student_id, answers)
+        
+        # Score in memory against the cached answer key and write the marks
+        # in the same transaction; otherwise sp_Correct_Exam grades it in the background
+        graded = grade_submission(exam_id, answers)
+        if graded is not None:
+            apply_grades(cursor, exam_id, student_id, graded)
+        
+        conn.commit()
+        autosaves.discard(exam_id, student_id)
+        student_dashboards.invalidate(student_id)
+        todays_exams.mark_taken(exam_id, student_id)
+        deadline_sweeper.finish(exam_id, student_id)
+        
+        if graded is None:
+            grading_queue.start()
+            grading_queue.enqueue(exam_id, student_id)
+        
+    except Exception as e:
+        conn.rollback()
+        # Another request already submitted this attempt: nothing was written, show its results
+        if is_duplicate_submission(e):
+            return None
+        log.error("Error submitting exam: %s", e)
+        return "Error submitting exam"
+    finally:
+        conn.close()
+    return None
+
+@app.route('/autosave/<int:exam_id>', methods=['GET', 'POST'])
+def autosave(exam_id):
+    if 'student_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    student_id = session['student_id']
+    
+    # Restoring after a reload: flushed answers overlaid with the buffer
+    if request.method == 'GET':
+        answers = autosaves.saved_answers(exam_id, student_id)
+        return jsonify({'answers': {str(question_id): choice_id for question_id, choice_id in answers.items()}})
+    
+    # Changed answers (question_<Question_ID>=<Choice_ID>) are only buffered here;
+    # autosave.py writes them in coalesced batches every few seconds.  Only
+    # within the exam window: the first flush creates the attempt's Student_Exam row
+    paper = exam_papers.get(exam_id)
+    if not paper or datetime.now() < paper['opens_at'] or not deadline_sweeper.accepting(paper['closes_at']):
+        return jsonify({'error': 'Exam is not open'}), 409
+    
+    answers = parse_answers(request.form)
+    changes = valid_changes(paper, answers)
+    saved = autosaves.record(exam_id, student_id, changes)
+    deadline_sweeper.track(exam_id, student_id, paper['closes_at'])
+    return jsonify({'saved': saved, 'ignored': len(answers) - saved}), 202
+
+@app.route('/results/<int:exam_id>')
+def exam_results(exam_id):
+    if 'student_id' not in session:
+        return redirect(url_for('student_login'))
+    
+    student_id = session['student_id']
+    
+    # A graded attempt's page only changes on a regrade: served without touching the database
+    page = graded_results.get(exam_id, student_id)
+    if page is not None:
+        return page
+    
+    if grading_queue.is_pending(exam_id, student_id):
+        return render_template('student/results.html',
+                             grading=True,
+                             results=[],
+                             exam=None,
+                             total_score=0,
+                             exam_id=exam_id)
+    
+    # Exam, attempt and answers in one round trip (sp_Get_Exam_Results)
+    loaded = load_exam_results(exam_id, student_id)
+    exam = loaded['exam'] if loaded else None
+    results = loaded['results'] if loaded else []
+    
+    # Calculate total score
+    total_score = sum(result['Ques_Mark'] for result in results) if results else 0
+    
+    page = render_template('student/results.html', 
+                         results=results,
+                         exam=exam,
+                         total_score=total_score,
+                         exam_id=exam_id)
+    if exam and exam['Exam_Status'] == 'Graded':
+        graded_results.put(exam_id, student_id, page)
+    return page
+
+
+@app.route('/instructor/dashboard')
+def instructor_dashboard():
+    if 'instructor_id' not in session or session['user_type'] != 'instructor':
+        return redirect(url_for('instructor_login'))
+    
+    # Get instructor courses using stored procedure
+    courses = execute_stored_procedure('GetInstructorCoursesWithStudentCount', 
+                                     [session['instructor_id']], fetch=True) or []
+    
+    # Get course IDs for this instructor
+    course_names = [course['Course_Name'] for course in courses]
+    
+    # Get exams only for instructor's courses - students_taken is the
+    # trigger-maintained counter (Exam Counters.sql), not a COUNT per exam
+    exams_query = """
+    SELECT e.Exam_ID, e.Title, e.Exam_Date, c.Course_Name,
+       COALESCE(esc.Students_Taken, 0) as students_taken, 
+       e.Total_Marks
+    FROM Exams e
+    JOIN Course c ON e.Course_ID = c.Course_ID
+    LEFT JOIN Exam_Submission_Counts esc ON esc.Exam_ID = e.Exam_ID
+    WHERE c.Course_Name IN ({})
+    ORDER BY e.Exam_Date DESC
+    """.format(','.join(['?'] * len(course_names)))
+    
+    conn = get_db_connection()
+    exams = []
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(exams_query, course_names)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                exams.append(dict(zip(columns, row)))
+        except Exception as e:
+            log.error("Error getting exams: %s", e)
+        finally:
+            conn.close()
+    
+    return render_template('instructor/dashboard.html',
+                         instructor_name=session['instructor_name'],
+                         courses=courses,
+                         exams=exams)
+
+@app.route('/instructor/create_exam', methods=['GET', 'POST'])
+def create_exam():
+    if 'instructor_id' not in session:
+        return redirect(url_for('instructor_login'))
+    
+    if request.method == 'POST':
+        # Get form data
+        course_name = request.form.get('course_name')
+        exam_date = request.form.get('exam_date')
+        start_time = request.form.get('start_time')
+        end_time = request.form.get('end_time')
+        no_tf = int(request.form.get('no_tf', 0))
+        no_mcq = int(request.form.get('no_mcq', 0))
+        
+        log.info("Creating exam with: %s, %s, %s, %s, TF: %s, MCQ: %s",
+                 course_name, exam_date, start_time, end_time, no_tf, no_mcq)
+        
+        # Exam_ID comes from the hi/lo allocator (ID Sequences.sql). A new block is
+        # reserved on a connection of its own, so take it before the request's one
+        try:
+            exam_id = exam_ids.next_id()
+        except Exception as e:
+            log.error("Error reserving an Exam_ID: %s", e)
+            return render_template('instructor/exam_error.html',
+                                 error_message="Database connection failed.")
+        
+        # **ALTERNATIVE APPROACH: Use direct connection**
+        conn = get_db_connection()
+        if not conn:
+            return render_template('instructor/exam_error.html',
+                                 error_message="Database connection failed.")
+        
+        try:
+            cursor = conn.cursor()
+            
+            # Questions are drawn from the in-memory pools (question_pools.py)
+            seed = request.form.get('seed')
+            
+            log.debug("Generating exam %s from question pools (seed: %s)", exam_id, seed)
+            
+            question_pools.generate_exam(cursor, course_name, exam_date, start_time, end_time,
+                                         no_tf, no_mcq, exam_id, seed=int(seed) if seed else None)
+            
+            # Check if we got results
+            if cursor.description:
+                columns = [column[0] for column in cursor.description]
+                row = cursor.fetchone()
+                
+                if row:
+                    exam_data = dict(zip(columns, row))
+                    log.info("Exam created successfully: %s", exam_data)
+                    
+                    conn.commit()
+                    todays_exams.refresh()
+                    
+                    return render_template('instructor/exam_created.html',
+                                         exam_id=exam_data['Exam_ID'],
+                                         exam_title=exam_data['Exam_Title'],
+                                         course_name=exam_data['Course_Name'],
+                                         exam_date=exam_data['Exam_Date'],
+                                         start_time=exam_data['Start_Time'],
+                                         end_time=exam_data['End_Time'],
+                                         no_tf=exam_data['No_TF_Questions'],
+                                         no_mcq=exam_data['No_MCQ_Questions'],
+                                         total_questions=exam_data['Total_Questions'])
+                else:
+                    conn.rollback()
+                    return render_template('instructor/exam_error.html',
+                                         error_message="Stored procedure executed but returned no data.")
+            else:
+                conn.rollback()
+                return render_template('instructor/exam_error.html',
+                                     error_message="Stored procedure executed but returned no result set.")
+            
+        except Exception as e:
+            conn.rollback()
+            log.error("Error in create_exam: %s", e)
+            
+            error_msg = str(e)
+            if "Exam date cannot be in the past" in error_msg:
+                error_msg = "Exam date cannot be in the past."
+            elif "Exam start time cannot be in the past" in error_msg:
+                error_msg = "Exam start time cannot be in the past for today's date."
+            elif "Exam duration cannot exceed 2 hours" in error_msg:
+                error_msg = "Exam duration cannot exceed 2 hours."
+            elif "Total number of questions cannot exceed 25" in error_msg:
+                error_msg = "Total number of questions cannot exceed 25."
+            elif "Course name is invalid" in error_msg:
+                error_msg = "Course name is invalid or does not exist."
+            else:
+                error_msg = f"Database error: {error_msg}"
+            
+            return render_template('instructor/exam_error.html',
+                                 error_message=error_msg)
+        finally:
+            conn.close()
+    
+    # GET request - keep your existing code
+    courses_query = """
+    SELECT DISTINCT c.Course_Name 
+    FROM Course c
+    INNER JOIN Questions q ON c.Course_ID = q.Course_ID
+    WHERE EXISTS (
+        SELECT 1 FROM Questions q2 
+        WHERE q2.Course_ID = c.Course_ID
+    )
+    ORDER BY c.Course_Name
+    """
+    
+    conn = get_db_connection()
+    courses = []
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(courses_query)
+            courses = [row[0] for row in cursor.fetchall()]
+            log.debug("Available courses with questions: %d courses", len(courses))
+        except Exception as e:
+            log.error("Error getting courses: %s", e)
+        finally:
+            conn.close()
+    
+    today = datetime.now().strftime('%Y-%m-%d')
+    return render_template('instructor/create_exam.html', courses=courses, today=today)
+@app.route('/debug/check-exams')
+def debug_check_exams():
+    """Check all exams in the database"""
+    conn = get_db_connection()
+    if not conn:
+        return "No database connection"
+    
+    try:
+        cursor = conn.cursor()
+        
+        # Check Exams table
+        cursor.execute("SELECT * FROM Exams ORDER BY Exam_ID DESC")
+        exams = cursor.fetchall()
+        
+        # Check Exam_Questions table
+        cursor.execute("""
+            SELECT eq.Exam_ID, COUNT(eq.Question_ID) as question_count 
+            FROM Exam_Questions eq 
+            GROUP BY eq.Exam_ID
+        """)
+        exam_questions = cursor.fetchall()
+        
+        result = "<h1>Database Exams Debug</h1>"
+        
+        result += "<h2>Exams Table:</h2>"
+        if exams:
+            result += f"<p>Found {len(exams)} exams</p>"
+            result += "<table border='1'><tr><th>Exam_ID</th><th>Title</th><th>Exam_Date</th><th>Start_Time</th><th>End_Time</th><th>Course_ID</th></tr>"
+            for exam in exams:
+                result += f"<tr><td>{exam[0]}</td><td>{exam[1]}</td><td>{exam[4]}</td><td>{exam[5]}</td><td>{exam[6]}</td><td>{exam[7]}</td></tr>"
+            result += "</table>"
+        else:
+            result += "<p>No exams found in database</p>"
+        
+        result += "<h2>Exam Questions:</h2>"
+        if exam_questions:
+            result += "<table border='1'><tr><th>Exam_ID</th><th>Question Count</th></tr>"
+            for eq in exam_questions:
+                result += f"<tr><td>{eq[0]}</td><td>{eq[1]}</td></tr>"
+            result += "</table>"
+        else:
+            result += "<p>No exam questions found</p>"
+            
+        return result
+        
+    except Exception as e:
+        return f"Error: {e}"
+    finally:
+        conn.close()
+@app.route('/debug-db-state')
+def debug_db_state():
+    """Check current database state"""
+    conn = get_db_connection()
+    if not conn:
+        return "No database connection"
+    
+    try:
+        cursor = conn.cursor()
+        
+        result = "<h1>Database State Debug</h1>"
+        
+        # Check max exam ID
+        cursor.execute("SELECT ISNULL(MAX(Exam_ID), 0) as max_exam_id FROM Exams")
+        max_id = cursor.fetchone()[0]
+        result += f"<h2>Current Max Exam ID: {max_id}</h2>"
+        
+        # Check courses
+        cursor.execute("SELECT Course_ID, Course_Name FROM Course")
+        courses = cursor.fetchall()
+        result += f"<h2>Available Courses ({len(courses)}):</h2>"
+        for course in courses:
+            result += f"<p>ID: {course[0]}, Name: {course[1]}</p>"
+        
+        # Check questions count by course and type
+        cursor.execute("""
+        SELECT c.Course_Name, q.Question_Type, COUNT(*) as question_count
+        FROM Questions q
+        JOIN Course c ON q.Course_ID = c.Course_ID
+        GROUP BY c.Course_Name, q.Question_Type
+        ORDER BY c.Course_Name, q.Question_Type
+        """)
+        questions = cursor.fetchall()
+        result += "<h2>Questions by Course and Type:</h2>"
+        for question in questions:
+            result += f"<p>{question[0]} - {question[1]}: {question[2]} questions</p>"
+        
+        return result
+        
+    except Exception as e:
+        return f"Error: {e}"
+    finally:
+        conn.close()
+@app.route('/instructor/add_questions/<int:exam_id>', methods=['GET', 'POST'])
+def add_questions(exam_id):
+    if 'instructor_id' not in session:
+        return redirect(url_for('instructor_login'))
+    
+    if request.method == 'POST':
+        question_text = request.form.get('question_text')
+        question_type = request.form.get('question_type', 'multiple_choice')
+        correct_answer = request.form.get('correct_answer')
+        choices = [choice.strip() for choice in request.form.getlist('choices') if choice.strip()]
+        
+        if question_type == 'multiple_choice':
+            question_type = 'MCQ'
+            choice_rows = [(choice, 1 if choice == correct_answer else 0) for choice in choices]
+            choice_count = len(choice_rows)
+        else:
+            question_type = 'T/F'
+            choice_rows = []
+            choice_count = 2
+        
+        # IDs come from the hi/lo allocator, so there is no MAX(Question_ID) read-back.
+        # New blocks are reserved on a connection of their own: keep this before
+        # the request takes its connection, or a full pool waits on itself
+        try:
+            question_id = question_ids.next_id()
+            first_choice_id = choice_ids.next_ids(choice_count) if choice_count else None
+        except Exception as e:
+            log.error("Error reserving question IDs: %s", e)
+            return render_template('instructor/add_questions.html', exam_id=exam_id)
+        
+        conn = get_db_connection()
+        if conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT Course_ID FROM Exams WHERE Exam_ID = ?", (exam_id,))
+                exam = cursor.fetchone()
+                if exam:
+                    cursor.execute("EXEC sp_Add_Question_With_Choices ?, ?, ?, ?, ?, ?, ?, ?",
+                                   (question_type, question_text, correct_answer, exam[0], 2,
+                                    choice_rows, question_id, first_choice_id))
+                    message = cursor.fetchone()
+                    if message and not str(message[0]).startswith('Error'):
+                        # Link question to exam
+                        cursor.execute("INSERT INTO Exam_Questions (Exam_ID, Question_ID) VALUES (?, ?)",
+                                       (exam_id, question_id))
+                        conn.commit()
+                        question_pools.add_question(exam[0], question_type, question_id)
+                        return redirect(url_for('instructor_dashboard'))
+                    log.warning("Error adding question: %s", message[0] if message else 'no result')
+                conn.rollback()
+            except Exception as e:
+                log.error("Error adding question: %s", e)
+                conn.rollback()
+            finally:
+                conn.close()
+    
+    return render_template('instructor/add_questions.html', exam_id=exam_id)
+
+@app.route('/instructor/bulk_schedule', methods=['POST'])
+def bulk_schedule():
+    """Create many exams from a CSV/JSON schedule (see bulk_schedule.py); returns the report as JSON.
+
+    Send a JSON body, or a form upload named ``schedule``.  ``?dry_run=1``
+    only validates; ``?all_or_nothing=1`` creates nothing if any entry is rejected.
+    """
+    if 'instructor_id' not in session:
+        return redirect(url_for('instructor_login'))
+    
+    try:
+        if request.is_json:
+            entries = json_entries(request.get_json())
+        elif 'schedule' in request.files:
+            upload = request.files['schedule']
+            fmt = 'json' if upload.filename.lower().endswith('.json') else None
+            entries = parse_schedule(upload.read().decode('utf-8-sig'), fmt)
+        else:
+            entries = parse_schedule(request.form.get('schedule', ''))
+    except ValueError as e:
+        return jsonify({'error': f'Could not read the schedule: {e}'}), 400
+    
+    seed = request.args.get('seed')
+    try:
+        report = schedule_exams(entries,
+                                dry_run=request.args.get('dry_run') == '1',
+                                all_or_nothing=request.args.get('all_or_nothing') == '1',
+                                seed=int(seed) if seed else None)
+    except Exception as e:
+        log.error("Error in bulk_schedule: %s", e)
+        return jsonify({'error': str(e)}), 500
+    
+    if report['created']:
+        todays_exams.refresh()
+    log.info("Bulk schedule: %d created, %d rejected in %ss",
+             len(report['created']), len(report['rejected']), report['seconds'])
+    return jsonify(report)
+
+@app.route('/instructor/exam/<int:exam_id>')
+def view_exam_results(exam_id):
+    if 'instructor_id' not in session:
+        return redirect(url_for('instructor_login'))
+    
+    # Get exam details
+    exam_details = execute_stored_procedure('Get_Exam_By_ID', [exam_id], fetch=True)
+    
+    # Get student results for this exam
+    results_query = """
+    SELECT se.Student_ID, s.Student_Name, se.Student_Score, e.Total_Marks,
+           se.Submission_Time, se.Exam_Status
+    FROM Student_Exam se
+    JOIN Student s ON se.Student_ID = s.Student_ID
+    JOIN Exams e ON se.Exam_ID = e.Exam_ID
+    WHERE se.Exam_ID = ? AND se.Exam_Status <> 'In Progress'
+    ORDER BY se.Student_Score DESC
+    """
+    conn = get_db_connection()
+    results = []
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(results_query, (exam_id,))
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                results.append(dict(zip(columns, row)))
+        except Exception as e:
+            log.error("Error getting results: %s", e)
+        finally:
+            conn.close()
+    
+    return render_template('instructor/exam_results.html',
+                         exam=exam_details[0] if exam_details else None,
+                         results=results)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-endpoint wall time, DB time, rows and statements in the Prometheus text format"""
+    return Response(request_metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/grading')
+def grading_metrics():
+    """Queue depth, grading throughput and lag"""
+    return jsonify(grading_queue.metrics())
+
+@app.route('/metrics/dashboard')
+def dashboard_metrics():
+    """Student dashboard cache hit rate and DB time saved"""
+    return jsonify(student_dashboards.metrics())
+
+@app.route('/metrics/results')
+def results_metrics():
+    """Graded results page cache hit rate"""
+    return jsonify(graded_results.metrics())
+
+@app.route('/metrics/requests')
+def db_request_metrics():
+    """Connections, statements and commits per request, by endpoint"""
+    return jsonify(request_db_stats.metrics())
+
+@app.route('/metrics/slow_statements')
+def slow_statement_metrics():
+    """Slow-statement log threshold and statements written (summarize with slow_queries.py)"""
+    return jsonify(slow_statements.metrics())
+
+@app.route('/metrics/autosave')
+def autosave_metrics():
+    """Saves received vs rows written, flushes, and what is still buffered"""
+    return jsonify(autosaves.metrics())
+
+@app.route('/metrics/submissions')
+def submission_metrics():
+    """Submissions run vs duplicates answered from the token ledger"""
+    return jsonify(submission_ledger.metrics())
+
+@app.route('/metrics/deadlines')
+def deadline_metrics():
+    """Exams waiting for their deadline, open attempts, auto-submissions and late requests refused"""
+    return jsonify(deadline_sweeper.metrics())
+
+@app.route('/metrics/prewarm')
+def prewarm_metrics():
+    """Exams warmed ahead of Start_Time, lead time, and cache hits at exam open"""
+    return jsonify(prewarm_scheduler.metrics())
+
+@app.route('/branches')
+def branches():
+    """Branches information page"""
+    branches_data = [
+        {"name": "Smart Village", "location": "30°04'16.2\"N 31°01'15.7\"E", "year": 2009, "city": "Giza"},
+        {"name": "New Capital", "location": "30°01'21.2\"N 31°42'20.7\"E", "year": 2022, "city": "New Administrative Capital"},
+        {"name": "Cairo University", "location": "30°01'45.8\"N 31°12'07.1\"E", "year": 2022, "city": "Giza"},
+        {"name": "Alexandria", "location": "31°11'34.7\"N 29°54'21.9\"E", "year": 1996, "city": "Alexandria"},
+        {"name": "Assiut", "location": "27°11'16.1\"N 31°10'09.7\"E", "year": 2007, "city": "Assiut"},
+        {"name": "Aswan", "location": "23°59'56.6\"N 32°51'18.9\"E", "year": 2021, "city": "Aswan"},
+        {"name": "Beni Suef", "location": "29°00'33.9\"N 31°09'08.6\"E", "year": 2023, "city": "Beni Suef"},
+        {"name": "Fayoum", "location": "29°19'24.1\"N 30°50'17.8\"E", "year": 2024, "city": "Fayoum"},
+        {"name": "Ismailia", "location": "30°37'16.2\"N 32°16'07.9\"E", "year": 2013, "city": "Ismailia"},
+        {"name": "Mansoura", "location": "31°02'27.9\"N 31°21'16.2\"E", "year": 2007, "city": "Mansoura"},
+        {"name": "Menofia", "location": "30°33'29.4\"N 31°01'08.2\"E", "year": 2020, "city": "Menofia"},
+        {"name": "Minya", "location": "28°07'40.4\"N 30°43'55.5\"E", "year": 2020, "city": "Minya"},
+        {"name": "Qena", "location": "26°11'22.5\"N 32°44'49.3\"E", "year": 2020, "city": "Qena"},
+        {"name": "Sohag", "location": "26°27'31.2\"N 31°40'21.2\"E", "year": 2020, "city": "Sohag"},
+        {"name": "Tanta", "location": "30°49'34.8\"N 31°00'07.2\"E", "year": 2024, "city": "Tanta"},
+        {"name": "Zagazig", "location": "30°35'15.6\"N 31°28'47.1\"E", "year": 2024, "city": "Zagazig"},
+        {"name": "New Valley", "location": "25°27'23.2\"N 30°32'55.0\"E", "year": 2023, "city": "New Valley"},
+        {"name": "Damanhour", "location": "31°02'15.0\"N 30°25'59.3\"E", "year": 2024, "city": "Damanhour"},
+        {"name": "Al Arish", "location": "31°07'57.8\"N 33°49'38.5\"E", "year": 2024, "city": "Al Arish"},
+        {"name": "Banha", "location": "30°28'31.6\"N 31°11'55.5\"E", "year": 2024, "city": "Banha"},
+        {"name": "Port Said", "location": "31°14'46.7\"N 32°18'50.4\"E", "year": 2024, "city": "Port Said"},
+        {"name": "Damietta", "location": "31°30'01.0\"N 31°49'34.2\"E", "year": 2024, "city": "Damietta"}
+    ]
+    
+    return render_template('branches.html', branches=branches_data)
+
+
+if __name__ == '__main__':
+    print("🚀 ITI Exam System Starting...")
+    print("📍 Local: http://localhost:5000")
+    grading_queue.start()
+    prewarm_scheduler.start()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# autosave.py
+"""Autosave of in-progress answers with write-coalescing.
+
+Browsers post each changed answer to /autosave/<exam_id>.  The changes are
+only buffered here, per (Student_ID, Exam_ID), a later choice for a question
+replacing the earlier one.  A background thread flushes the whole buffer
+every AUTOSAVE_FLUSH_SECONDS with sp_Save_Exam_Progress: one transaction of
+at most ceil(rows / AUTOSAVE_BATCH_ROWS) calls, holding one row per answered
+question whatever the number of saves behind it.  So the database write rate
+depends on the number of open attempts, not on how often browsers save.
+
+An attempt's first flush creates its Student_Exam row as 'In Progress'.  At
+submit, submit_exam writes what is still buffered with the form
+(sp_Submit_Exam closes the attempt) and drops the buffer only once that is
+committed, so a failed submission loses nothing.  After a reload the page
+asks for the saved answers - the flushed ones overlaid with the buffer - and
+checks them.
+"""
+import logging
+import threading
+import time
+
+from config import Config
+from database import get_db_connection
+
+log = logging.getLogger(__name__)
+
+SAVE_PROGRESS_SQL = "EXEC sp_Save_Exam_Progress ?"
+
+SAVED_ANSWERS_SQL = """
+    SELECT seq.Question_ID, seq.Selected_Choice_ID
+    FROM Student_Exam_Questions seq
+    JOIN Student_Exam se ON se.Student_ID = seq.Student_ID AND se.Exam_ID = seq.Exam_ID
+    WHERE se.Exam_ID = ? AND se.Student_ID = ? AND se.Exam_Status = 'In Progress'
+"""
+
+
+def valid_changes(paper, answers):
+    """[(Question_ID, Choice_ID), ...] -> {Question_ID: Choice_ID} for choices on the exam paper"""
+    questions = paper['questions']
+    changes = {}
+    for question_id, choice_id in answers:
+        question = questions.get(question_id)
+        if question and any(choice['choice_id'] == choice_id for choice in question['choices']):
+            changes[question_id] = choice_id
+    return changes
+
+
+def load_saved_answers(exam_id, student_id):
+    """{Question_ID: Choice_ID} flushed for an attempt still in progress"""
+    conn = get_db_connection()
+    if not conn:
+        return {}
+    try:
+        cursor = conn.cursor()
+        cursor.execute(SAVED_ANSWERS_SQL, (exam_id, student_id))
+        return {question_id: choice_id for question_id, choice_id in cursor.fetchall()}
+    except Exception as e:
+        log.error("Error loading saved answers: %s", e)
+        return {}
+    finally:
+        conn.close()
+
+
+class AutosaveBuffer:
+    """(Student_ID, Exam_ID) -> answers changed since the last flush"""
+
+    def __init__(self, flush_interval=5, batch_rows=5000, max_failures=3):
+        self.flush_interval = flush_interval
+        self.batch_rows = batch_rows
+        self.max_failures = max_failures
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pending = {}   # (Student_ID, Exam_ID) -> {Question_ID: Choice_ID}
+        self._failures = {}  # (Student_ID, Exam_ID) -> flushes failed in a row
+        self.saves = 0
+        self.changes = 0
+        self.flushes = 0
+        self.flush_calls = 0
+        self.rows_written = 0
+        self.attempts_started = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    def record(self, exam_id, student_id, changes):
+        """Buffer {Question_ID: Choice_ID} changes; returns how many were taken"""
+        if not changes:
+            return 0
+        with self._lock:
+            self._pending.setdefault((student_id, exam_id), {}).update(changes)
+            self.saves += 1
+            self.changes += len(changes)
+        self.start()
+        return len(changes)
+
+    def buffered(self, exam_id, student_id):
+        """Copy of the attempt's buffered answers (the submission writes them)"""
+        with self._lock:
+            return dict(self._pending.get((student_id, exam_id), {}))
+
+    def discard(self, exam_id, student_id):
+        """Drop the attempt's buffer once its submission is committed"""
+        with self._lock:
+            self._failures.pop((student_id, exam_id), None)
+            self._pending.pop((student_id, exam_id), None)
+
+    def saved_answers(self, exam_id, student_id):
+        """Answers to restore after a reload: the flushed ones overlaid with the buffer"""
+        answers = load_saved_answers(exam_id, student_id)
+        with self._lock:
+            answers.update(self._pending.get((student_id, exam_id), {}))
+        return answers
+
+    def flush(self):
+        """Write everything buffered in one transaction; returns the answer rows written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            rows = [(student_id, exam_id, question_id, choice_id)
+                    for (student_id, exam_id), answers in batch.items()
+                    for question_id, choice_id in answers.items()]
+            started = time.perf_counter()
+            try:
+                calls, attempts_started = self._write(rows)
+            except Exception as e:
+                log.error("Autosave flush failed: %s", e)
+                self._requeue(batch)
+                return 0
+
+            with self._lock:
+                for key in batch:
+                    self._failures.pop(key, None)
+                self.flushes += 1
+                self.flush_calls += calls
+                self.rows_written += len(rows)
+                self.attempts_started += attempts_started
+                self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return len(rows)
+
+    def _write(self, rows):
+        conn = get_db_connection()
+        if not conn:
+            raise RuntimeError('no database connection')
+        try:
+            cursor = conn.cursor()
+            calls = attempts_started = 0
+            for offset in range(0, len(rows), self.batch_rows):
+                cursor.execute(SAVE_PROGRESS_SQL, (rows[offset:offset + self.batch_rows],))
+                attempts_started += len(cursor.fetchall())
+                calls += 1
+            conn.commit()
+            return calls, attempts_started
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _requeue(self, batch):
+        """Put a failed batch back under any newer changes; give up on an attempt after max_failures"""
+        with self._lock:
+            self.failed_flushes += 1
+            for key, answers in batch.items():
+                failures = self._failures.get(key, 0) + 1
+                if failures >= self.max_failures:
+                    self._failures.pop(key, None)
+                    self.dropped += 1
+                    continue
+                self._failures[key] = failures
+                newer = self._pending.get(key)
+                self._pending[key] = {**answers, **newer} if newer else answers
+
+    # ---- background thread ----------------------------------------------------
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='exam-autosave', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the flusher after a last flush"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'flush_interval_seconds': self.flush_interval,
+                'pending_attempts': len(self._pending),
+                'pending_answers': sum(len(answers) for answers in self._pending.values()),
+                'saves': self.saves,
+                'changes': self.changes,
+                'flushes': self.flushes,
+                'flush_calls': self.flush_calls,
+                'rows_written': self.rows_written,
+                'attempts_started': self.attempts_started,
+                'failed_flushes': self.failed_flushes,
+                'dropped_attempts': self.dropped,
+                'last_flush_ms': round(self.last_flush_ms, 2),
+                'running': self._thread is not None,
+            }
+
+
+autosaves = AutosaveBuffer(flush_interval=Config.AUTOSAVE_FLUSH_SECONDS, batch_rows=Config.AUTOSAVE_BATCH_ROWS)
@@ -0,0 +1,126 @@
+# benchmarks/bench_autosave.py
+"""Autosave write rate: every save written through vs buffered and coalesced.
+
+--students browsers each change an answer every --save-interval seconds for
+--seconds.  Write-through runs sp_Save_Exam_Progress and commits for every
+save; buffered records into autosave.AutosaveBuffer, which flushes every
+--flush-seconds.  The table shows the database transactions and round trips
+per second against the save rate, for several save rates.
+
+    python benchmarks/bench_autosave.py --students 200 --save-interval 1 0.25 0.05 --seconds 5 --rtt-ms 1
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from common import RoundTripCounter, open_exam_now, percentile, setup_database
+
+import database
+from autosave import SAVE_PROGRESS_SQL, AutosaveBuffer
+from stress_id_allocation import run_threads
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.commits = 0
+        self.round_trips = 0
+
+    def connection(self, rtt):
+        counters = self
+
+        class Counting(RoundTripCounter):
+            def commit(self):
+                super().commit()
+                with counters.lock:
+                    counters.commits += 1
+
+            def close(self):
+                with counters.lock:
+                    counters.round_trips += self.round_trips
+                super().close()
+
+        return Counting(database.get_pool().acquire(), rtt=rtt)
+
+
+def browse(students, choices, save_interval, seconds, save):
+    """Each student thread changes a random answer every save_interval; returns save latencies"""
+    questions = list(choices)
+
+    def work(number):
+        rng = random.Random(number)
+        student_id = 1001 + number
+        timings = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            question_id = rng.choice(questions)
+            started = time.perf_counter()
+            save(student_id, {question_id: rng.choice(choices[question_id])})
+            timings.append((time.perf_counter() - started) * 1e6)
+            time.sleep(save_interval)
+        return timings
+
+    results, elapsed = run_threads(students, work)
+    return [value for chunk in results for value in chunk], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--save-interval', type=float, nargs='+', default=[1.0, 0.25, 0.05],
+                        help='seconds between saves of one browser')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--flush-seconds', type=float, default=1.0)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    rtt = args.rtt_ms / 1000.0
+
+    print(f" {args.students} browsers for {args.seconds:.0f} s, flush every {args.flush_seconds} s, "
+          f"simulated RTT {args.rtt_ms} ms")
+    print(f" {'strategy':>13} {'saves/s':>9} {'commits/s':>10} {'trips/s':>8} {'rows written':>13} "
+          f"{'save p50 us':>12} {'save p95 us':>12}")
+    for save_interval in args.save_interval:
+        for label in ('write-through', 'buffered'):
+            exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=20)
+            counters = Counters()
+            database.get_db_connection = lambda: counters.connection(rtt)
+            rows = [0]
+
+            if label == 'write-through':
+                def save(student_id, changes):
+                    conn = database.get_db_connection()
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute(SAVE_PROGRESS_SQL, ([(student_id, exam_id, question_id, choice_id)
+                                                            for question_id, choice_id in changes.items()],))
+                        cursor.fetchall()
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    with counters.lock:
+                        rows[0] += len(changes)
+                buffer = None
+            else:
+                import autosave
+                autosave.get_db_connection = database.get_db_connection
+                buffer = AutosaveBuffer(flush_interval=args.flush_seconds)
+
+                def save(student_id, changes):
+                    buffer.record(exam_id, student_id, changes)
+
+            timings, elapsed = browse(args.students, choices, save_interval, args.seconds, save)
+            if buffer is not None:
+                buffer.stop()
+                rows[0] = buffer.rows_written
+            print(f" {label:>13} {len(timings) / elapsed:>9.0f} {counters.commits / elapsed:>10.1f} "
+                  f"{counters.round_trips / elapsed:>8.1f} {rows[0]:>13} "
+                  f"{percentile(timings, 50):>12.0f} {percentile(timings, 95):>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
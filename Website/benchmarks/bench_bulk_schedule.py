@@ -0,0 +1,95 @@
+# benchmarks/bench_bulk_schedule.py
+"""A whole intake's schedule: bulk_schedule.py vs one sp_Generate_Exam per exam.
+
+Builds a schedule of --exams entries spread over every seeded course and the
+coming weeks, then creates it with one sp_Bulk_Generate_Exams transaction and,
+for comparison, with the create_exam form's pattern (one call and commit per
+exam).  --rtt-ms adds a simulated round trip per statement for both.
+
+    python benchmarks/bench_bulk_schedule.py --exams 600 --rtt-ms 1
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from common import RoundTripCounter, setup_database
+
+import bulk_schedule
+import database
+from id_allocator import exam_ids
+from sqlite_backend import COURSE_NAMES
+
+
+def build_schedule(count, invalid_every=0):
+    """Entries across all courses, three windows a day; every n-th entry breaks a rule"""
+    windows = (('09:00', '10:30'), ('11:00', '12:30'), ('13:00', '14:30'))
+    first_day = date.today() + timedelta(days=1)
+    entries = []
+    for number in range(count):
+        start, end = windows[number % len(windows)]
+        entry = {'course': COURSE_NAMES[number % len(COURSE_NAMES)],
+                 'date': (first_day + timedelta(days=number // 30)).isoformat(),
+                 'start_time': start, 'end_time': end, 'no_tf': 10, 'no_mcq': 15}
+        if invalid_every and number % invalid_every == invalid_every - 1:
+            entry['end_time'] = '17:00'  # longer than 2 hours
+        entries.append(entry)
+    return entries
+
+
+def per_exam_baseline(entries, rtt):
+    started = time.perf_counter()
+    for entry in entries:
+        conn = RoundTripCounter(database.get_db_connection(), rtt=rtt)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("EXEC sp_Generate_Exam ?, ?, ?, ?, ?, ?, ?",
+                           [entry['course'], entry['date'], entry['start_time'], entry['end_time'],
+                            entry['no_tf'], entry['no_mcq'], exam_ids.next_id()])
+            cursor.fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+        finally:
+            conn.close()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--exams', type=int, default=600)
+    parser.add_argument('--invalid-every', type=int, default=50, help='make every n-th entry invalid (0: none)')
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    parser.add_argument('--bank', type=int, default=2000, help='questions per course')
+    args = parser.parse_args()
+
+    setup_database(students=10, tf_per_course=args.bank // 2, mcq_per_course=args.bank - args.bank // 2)
+    entries = build_schedule(args.exams, args.invalid_every)
+    rtt = args.rtt_ms / 1000.0
+    print(f" {len(entries)} scheduled exams over {len(COURSE_NAMES)} courses, simulated RTT {args.rtt_ms} ms")
+
+    # Every statement of the bulk path goes through one counted connection
+    real_connect = database.get_db_connection
+    counters = []
+
+    def counted_connection():
+        counters.append(RoundTripCounter(real_connect(), rtt=rtt))
+        return counters[-1]
+
+    bulk_schedule.get_db_connection = counted_connection
+    try:
+        report = bulk_schedule.schedule_exams(entries, seed=1)
+    finally:
+        bulk_schedule.get_db_connection = real_connect
+    round_trips = sum(counter.round_trips for counter in counters)
+    print(f" bulk_schedule.py  : {report['seconds']:.3f}s, {len(report['created'])} created, "
+          f"{len(report['rejected'])} rejected, {round_trips} round trips")
+
+    baseline = per_exam_baseline(entries, rtt)
+    print(f" sp_Generate_Exam  : {baseline:.3f}s one exam at a time (x{baseline / max(report['seconds'], 1e-9):.1f})")
+    expected_rejections = args.exams // args.invalid_every if args.invalid_every else 0
+    return 0 if len(report['rejected']) == expected_rejections else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/bench_deadlines.py
+"""Auto-submit at End_Time: thousands of open attempts, one sweeper thread.
+
+--students attempts spread over --exams exams all closing --close-seconds
+from now.  Every attempt is registered with deadlines.DeadlineSweeper and
+has its answers autosaved; nobody submits.  The table shows the cost of
+registering an attempt, the threads the process runs, how long after the
+deadline each exam was auto-submitted and graded, and checks the scores
+against an independent count of correct answers.
+
+    python benchmarks/bench_deadlines.py --students 3000 --exams 6
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from common import open_exam_now, percentile, setup_database
+
+import sqlite_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=3000)
+    parser.add_argument('--exams', type=int, default=6)
+    parser.add_argument('--close-seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    exams = {}
+    for number in range(args.exams):
+        exam_id, choices = open_exam_now(path, course_id=number % 5 + 1, no_tf=5, no_mcq=20)
+        exams[exam_id] = choices
+
+    # Every exam closes at the same moment
+    closes_at = (datetime.now() + timedelta(seconds=args.close_seconds)).replace(microsecond=0)
+    raw = sqlite_backend.open_sqlite(path)
+    raw.execute("UPDATE Exams SET End_Time = ?", (closes_at.strftime('%H:%M:%S'),))
+    raw.commit()
+
+    from autosave import autosaves
+    from deadlines import DeadlineSweeper
+
+    sweeper = DeadlineSweeper(grace_seconds=0)
+    sweep_times = {}
+    real_sweep = sweeper.sweep
+
+    def timed_sweep(exam_id):
+        submitted = real_sweep(exam_id)
+        sweep_times[exam_id] = (datetime.now() - closes_at).total_seconds(), sweeper.last_sweep_ms, len(submitted)
+        return submitted
+
+    sweeper.sweep = timed_sweep
+    threads_before = threading.active_count()
+
+    rng = random.Random(7)
+    exam_ids = list(exams)
+    track_us = []
+    for number in range(args.students):
+        student_id = 1001 + number
+        exam_id = exam_ids[number % len(exam_ids)]
+        started = time.perf_counter()
+        sweeper.track(exam_id, student_id, closes_at)
+        track_us.append((time.perf_counter() - started) * 1e6)
+        choices = exams[exam_id]
+        autosaves.record(exam_id, student_id, {question_id: rng.choice(options)
+                                               for question_id, options in choices.items() if rng.random() < 0.8})
+    threads_open = threading.active_count()
+    if datetime.now() >= closes_at:
+        print(" Registering took longer than --close-seconds; raise it", file=sys.stderr)
+        return 1
+
+    print(f" {args.students} open attempts over {args.exams} exams; threads: {threads_before} before, "
+          f"{threads_open} with every attempt registered")
+    print(f" track(): p50 {percentile(track_us, 50):.1f} us, p95 {percentile(track_us, 95):.1f} us")
+
+    deadline = time.monotonic() + args.close_seconds + 60
+    while len(sweep_times) < len(exams) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    sweeper.stop()
+    autosaves.stop()
+
+    print(f" {'exam':>5} {'attempts':>9} {'done after deadline s':>22} {'sweep ms':>9}")
+    for exam_id in exam_ids:
+        lag, sweep_ms, submitted = sweep_times.get(exam_id, (float('nan'), float('nan'), 0))
+        print(f" {exam_id:>5} {submitted:>9} {lag:>22.2f} {sweep_ms:>9.1f}")
+
+    # Independent check: Student_Score = 2 x correct answers, everyone graded
+    statuses = dict(raw.execute("SELECT Exam_Status, COUNT(*) FROM Student_Exam GROUP BY Exam_Status").fetchall())
+    mismatched = raw.execute("""
+        SELECT COUNT(*) FROM Student_Exam se
+        WHERE se.Student_Score <> 2 * (
+            SELECT COUNT(*) FROM Student_Exam_Questions seq
+            JOIN Question_Choices qc ON qc.Choice_ID = seq.Selected_Choice_ID
+            WHERE seq.Exam_ID = se.Exam_ID AND seq.Student_ID = se.Student_ID AND qc.Is_Correct = 1)
+    """).fetchone()[0]
+    raw.close()
+    print(f" Student_Exam: {statuses}; scores not matching the answers: {mismatched}")
+    print(f" sweeper: {sweeper.metrics()['auto_submitted']} auto-submitted, "
+          f"{sweeper.metrics()['graded']} graded, {sweeper.metrics()['failed_sweeps']} failed sweeps")
+    return 0 if mismatched == 0 and statuses.get('Graded') == args.students else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
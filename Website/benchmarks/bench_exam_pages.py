@@ -0,0 +1,74 @@
+# benchmarks/bench_exam_pages.py
+"""Exam page render: Jinja per student vs fragments rendered once per exam.
+
+Uses a 25-question x 4-choice paper and renders it for a different student
+on every call, from several threads at once, both ways: render_template of
+student/exam.html with the student's variant, and exam_pages.py joining the
+pre-rendered fragments.  Both must produce identical HTML.
+
+    python benchmarks/bench_exam_pages.py --threads 1 4 8 16 --pages 500
+"""
+import argparse
+import sys
+import time
+
+from common import open_exam_now, percentile, setup_database
+from stress_id_allocation import run_threads
+
+from caches import load_exam_paper
+from exam_variants import questions_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--pages', type=int, default=500, help='pages rendered per thread')
+    args = parser.parse_args()
+
+    path = setup_database(students=10)
+    exam_id, _ = open_exam_now(path, no_tf=0, no_mcq=25)
+    paper = load_exam_paper(exam_id)
+
+    from flask import render_template
+    from app import app
+    from exam_pages import ExamPageRenderer
+
+    pages = ExamPageRenderer()
+
+    def jinja(student_id):
+        return render_template('student/exam.html', exam=paper['exam'], exam_id=exam_id,
+                               questions=questions_for(paper['questions'], exam_id, student_id))
+
+    def fragments(student_id):
+        return pages.render(paper, exam_id, student_id)
+
+    with app.test_request_context():
+        started = time.perf_counter()
+        fragments(0)
+        build_ms = (time.perf_counter() - started) * 1000
+        for student_id in range(1001, 1051):
+            assert jinja(student_id) == fragments(student_id), f'HTML differs for student {student_id}'
+    print(f" {len(paper['questions'])} questions x 4 choices; fragments built once in {build_ms:.1f} ms, "
+          f"HTML identical to render_template")
+
+    print(f" {'threads':>7} {'renderer':>10} {'pages/s':>9} {'p50 us':>8} {'p95 us':>8}")
+    for threads in args.threads:
+        for label, render in (('jinja', jinja), ('fragments', fragments)):
+            def work(number):
+                timings = []
+                with app.test_request_context():
+                    for page in range(args.pages):
+                        started = time.perf_counter()
+                        render(number * args.pages + page)
+                        timings.append((time.perf_counter() - started) * 1e6)
+                return timings
+
+            results, seconds = run_threads(threads, work)
+            timings = [value for chunk in results for value in chunk]
+            print(f" {threads:>7} {label:>10} {len(timings) / seconds:>9.0f} "
+                  f"{percentile(timings, 50):>8.0f} {percentile(timings, 95):>8.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
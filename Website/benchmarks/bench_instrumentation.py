@@ -0,0 +1,109 @@
+# benchmarks/bench_instrumentation.py
+"""Cost of request instrumentation and logging on a hot route.
+
+--requests warm GETs of /exam/<id> (one sp_Check_Exam_Eligibility call, the
+paper from the cache) per mode, from --threads threads:
+
+1. bare        - no metrics middleware, logging off
+2. metrics     - MetricsMiddleware + DB-call wrapper, logging off
+3. print       - metrics, and the stored procedure trace written with print()
+                 as execute_stored_procedure used to do (stdout to /dev/null)
+4. debug log   - metrics, the same trace through the queued logger at DEBUG
+5. sampled 1%  - as 4 with LOG_SAMPLE_RATE 0.01
+6. info log    - metrics, LOG_LEVEL INFO (the trace is filtered out)
+
+Then prints the per-endpoint summary the histograms give.
+
+    python benchmarks/bench_instrumentation.py --requests 2000 --threads 4
+"""
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import time
+
+from common import open_exam_now, percentile, setup_database
+from stress_id_allocation import run_threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='requests per thread')
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.threads)
+    exam_id, _ = open_exam_now(path)
+
+    import app as appmod
+    import instrumentation
+
+    app = appmod.app
+    instrumented = app.wsgi_app
+    devnull = open(os.devnull, 'w')
+    instrumentation.configure_logging('DEBUG')
+    instrumentation._listener.handlers[0].setStream(devnull)
+    sampler = next(log_filter for handler in logging.getLogger().handlers
+                   for log_filter in handler.filters if isinstance(log_filter, instrumentation.SampleFilter))
+    real_debug = appmod.log.debug
+
+    def print_debug(message, *values):
+        print(message % values)
+
+    modes = [
+        ('bare', instrumented.app, 'OFF', 1.0, real_debug),
+        ('metrics', instrumented, 'OFF', 1.0, real_debug),
+        ('print', instrumented, 'OFF', 1.0, print_debug),
+        ('debug log', instrumented, 'DEBUG', 1.0, real_debug),
+        ('sampled 1%', instrumented, 'DEBUG', 0.01, real_debug),
+        ('info log', instrumented, 'INFO', 1.0, real_debug),
+    ]
+
+    clients = []
+    for number in range(args.threads):
+        client = app.test_client()
+        student_id = 1001 + number
+        client.post('/student/login', data={'student_id': str(student_id), 'password': f'pass{student_id}'}).close()
+        client.get(f'/exam/{exam_id}').close()
+        clients.append(client)
+
+    print(f" {args.threads} threads x {args.requests} GET /exam/{exam_id}")
+    print(f" {'mode':>11} {'req/s':>8} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}")
+    for label, wsgi_app, level, rate, debug in modes:
+        app.wsgi_app = wsgi_app
+        if level == 'OFF':
+            logging.disable(logging.CRITICAL)
+        else:
+            logging.disable(logging.NOTSET)
+            logging.getLogger().setLevel(level)
+        sampler.rate = rate
+        appmod.log.debug = debug
+        instrumentation.request_metrics.clear()
+
+        def work(number):
+            timings = []
+            client = clients[number]
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                client.get(f'/exam/{exam_id}').close()
+                timings.append((time.perf_counter() - started) * 1e6)
+            return timings
+
+        with contextlib.redirect_stdout(devnull):
+            results, seconds = run_threads(args.threads, work)
+        timings = [value for chunk in results for value in chunk]
+        print(f" {label:>11} {len(timings) / seconds:>8.0f} {percentile(timings, 50):>8.0f} "
+              f"{percentile(timings, 95):>8.0f} {percentile(timings, 99):>8.0f}")
+
+    appmod.log.debug = real_debug
+    app.wsgi_app = instrumented
+    print(" take_exam histograms (last mode):")
+    for series, values in instrumentation.request_metrics.summary()['take_exam'].items():
+        print(f"   {series:>25}: count {values['count']}, p50 {values['p50']:.6g}, p95 {values['p95']:.6g}, "
+              f"p99 {values['p99']:.6g}, max {values['max']:.6g}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# benchmarks/bench_prewarm.py
+"""Exam-open burst with cold caches vs after the pre-warm scheduler ran.
+
+--students logged-in clients all request /exam/<id> at the same instant,
+right after Start_Time.  Cold: caches empty and a fresh connection pool.
+Warm: prewarm.py's warm() ran first.  --connect-ms simulates the SQL Server
+login for each new pool connection and --rtt-ms the round trip of each
+statement, since the SQLite stand-in has neither.
+
+    python benchmarks/bench_prewarm.py --students 50 --connect-ms 30 --rtt-ms 2 > /dev/null
+
+(the app's own debug prints go to stdout; the results table goes to stderr)
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from common import RoundTripCounter, open_exam_now, percentile, setup_database
+from stress_id_allocation import run_threads
+
+import database
+import sqlite_backend
+
+
+def report(line):
+    print(line, file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=50)
+    parser.add_argument('--connect-ms', type=float, default=30.0)
+    parser.add_argument('--rtt-ms', type=float, default=2.0)
+    parser.add_argument('--pool-connections', type=int, default=16, help='connections the scheduler pre-opens')
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    exam_id, _ = open_exam_now(path, no_tf=5, no_mcq=20)
+
+    # Simulated network: login per new connection, round trip per statement
+    real_open = database.open_raw_connection
+
+    def slow_open():
+        time.sleep(args.connect_ms / 1000.0)
+        return real_open()
+
+    database.open_raw_connection = slow_open
+    real_acquire = database.ConnectionPool.acquire
+    database.ConnectionPool.acquire = lambda pool: RoundTripCounter(real_acquire(pool), rtt=args.rtt_ms / 1000.0)
+
+    import app as appmod
+    import caches
+    from prewarm import PrewarmScheduler
+
+    app = appmod.app
+
+    clients = []
+    for student_id in range(1001, 1001 + args.students):
+        client = app.test_client()
+        client.post('/student/login', data={'student_id': str(student_id), 'password': f'pass{student_id}'})
+        clients.append(client)
+
+    report(f" {args.students} students open exam {exam_id} at Start_Time; "
+          f"simulated login {args.connect_ms} ms, RTT {args.rtt_ms} ms")
+    report(f" {'mode':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'warm-up ms':>11} {'opened at open':>15} {'open hits':>10}")
+    for mode in ('cold', 'warm'):
+        for cache in (caches.exam_papers, caches.answer_keys, caches.enrolled_students):
+            cache.clear()
+        with database._pool_lock:
+            if database._pool is not None:
+                database._pool.close()
+            database._pool = None
+
+        # The exam starts now
+        raw = sqlite_backend.open_sqlite(path)
+        starts_at = datetime.now()
+        raw.execute("UPDATE Exams SET Exam_Date = ?, Start_Time = ? WHERE Exam_ID = ?",
+                    (starts_at.strftime('%Y-%m-%d'), (starts_at - timedelta(seconds=1)).strftime('%H:%M:%S'), exam_id))
+        raw.commit()
+        raw.close()
+
+        scheduler = PrewarmScheduler(pool_connections=args.pool_connections, students_per_connection=3)
+        appmod.prewarm_scheduler = scheduler
+        warm_ms = 0.0
+        if mode == 'warm':
+            started = time.perf_counter()
+            scheduler.warm(exam_id, starts_at)
+            warm_ms = (time.perf_counter() - started) * 1000
+        created_before = database.get_pool().status()['created']
+
+        def work(number):
+            started = time.perf_counter()
+            response = clients[number].get(f'/exam/{exam_id}')
+            assert response.status_code == 200 and b'question-card' in response.data, response.data[:200]
+            return (time.perf_counter() - started) * 1000
+
+        timings, _ = run_threads(args.students, work)
+        metrics = scheduler.metrics()
+        opened = database.get_pool().status()['created'] - created_before
+        report(f" {mode:>5} {percentile(timings, 50):>8.1f} {percentile(timings, 95):>8.1f} {max(timings):>8.1f} "
+              f"{warm_ms:>11.1f} {opened:>15} {metrics['open_hits']:>4}/{metrics['open_hits'] + metrics['open_misses']:<5}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# benchmarks/bench_question_pools.py
+"""Exam generation: ORDER BY RANDOM() over the bank vs in-memory question pools.
+
+Seeds a large question bank, then creates exams both ways: sp_Generate_Exam
+sorting the whole bank per exam, and question_pools.py drawing the questions
+with a partial Fisher-Yates and inserting them in one batch.  Also checks
+that a seed reproduces the same exam and that a question deleted behind the
+pool's back is caught and retried.
+
+    python benchmarks/bench_question_pools.py --bank 50000 --exams 200
+"""
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from common import setup_database
+
+import database
+import sqlite_backend
+from id_allocator import exam_ids
+from question_pools import QuestionPools
+
+COURSE = 'SQL Server Fundamentals'
+
+
+def create_exams(count, no_tf, no_mcq, pools=None, seed=None):
+    """Create ``count`` exams; returns (seconds, [question ids of each exam])"""
+    exam_date = (date.today() + timedelta(days=1)).strftime('%Y-%m-%d')
+    picked = []
+    conn = database.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        for _ in range(count):
+            exam_id = exam_ids.next_id()
+            if pools is None:
+                cursor.execute("EXEC sp_Generate_Exam ?, ?, ?, ?, ?, ?, ?",
+                               [COURSE, exam_date, '09:00', '10:00', no_tf, no_mcq, exam_id])
+            else:
+                pools.generate_exam(cursor, COURSE, exam_date, '09:00', '10:00', no_tf, no_mcq, exam_id, seed=seed)
+            cursor.fetchall()
+            conn.commit()
+            picked.append(exam_id)
+        seconds = time.perf_counter() - started
+
+        questions = []
+        for exam_id in picked:
+            cursor.execute("SELECT Question_ID FROM Exam_Questions WHERE Exam_ID = ? ORDER BY Question_ID", (exam_id,))
+            questions.append([row[0] for row in cursor.fetchall()])
+        return seconds, questions
+    finally:
+        conn.close()
+
+
+def delete_question_directly(path, question_id):
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        raw.execute("DELETE FROM Question_Choices WHERE Question_ID = ?", (question_id,))
+        raw.execute("DELETE FROM Questions WHERE Question_ID = ?", (question_id,))
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bank', type=int, default=50000, help='questions per course (40%% T/F)')
+    parser.add_argument('--exams', type=int, default=200)
+    parser.add_argument('--no-tf', type=int, default=10)
+    parser.add_argument('--no-mcq', type=int, default=15)
+    args = parser.parse_args()
+
+    path = setup_database(students=10, tf_per_course=args.bank * 2 // 5, mcq_per_course=args.bank - args.bank * 2 // 5)
+    print(f" {args.bank} questions per course, {args.exams} exams of {args.no_tf} T/F + {args.no_mcq} MCQ")
+
+    baseline, _ = create_exams(args.exams, args.no_tf, args.no_mcq)
+    print(f" ORDER BY RANDOM() : {baseline:.3f}s ({baseline / args.exams * 1000:.2f} ms/exam)")
+
+    pools = QuestionPools(ttl=3600)
+    started = time.perf_counter()
+    pools.pick(COURSE, 0, 0)
+    load = time.perf_counter() - started
+    pooled, questions = create_exams(args.exams, args.no_tf, args.no_mcq, pools=pools)
+    print(f" question pools    : {pooled:.3f}s ({pooled / args.exams * 1000:.2f} ms/exam, "
+          f"one-off pool load {load * 1000:.1f} ms) x{baseline / max(pooled, 1e-9):.1f}")
+    ok = all(len(set(exam)) == args.no_tf + args.no_mcq for exam in questions)
+
+    _, seeded = create_exams(2, args.no_tf, args.no_mcq, pools=pools, seed=42)
+    ok &= seeded[0] == seeded[1]
+    print(f" seed 42 twice     : {'same questions' if seeded[0] == seeded[1] else 'DIFFERENT questions'}")
+
+    # Remove a question seed 43 would pick (and no exam uses) without telling the pool
+    used = {question_id for exam in questions + seeded for question_id in exam}
+    removed = next(question_id for question_id, in pools.pick(COURSE, args.no_tf, args.no_mcq, seed=43)
+                   if question_id not in used)
+    delete_question_directly(path, removed)
+    _, retried = create_exams(1, args.no_tf, args.no_mcq, pools=pools, seed=43)
+    stale_ok = removed not in retried[0] and len(retried[0]) == args.no_tf + args.no_mcq
+    ok &= stale_ok
+    print(f" stale pool        : {'reloaded and retried' if stale_ok else 'FAILED'} ({pools.loads} loads)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/bench_regrade.py
+"""Bulk regrade after an answer-key fix: regrade.py vs sp_Correct_Exam per student.
+
+Seeds a large cohort, grades every submission, flips the correct choice of one
+question, then regrades the whole exam with the vectorized engine.  The
+per-student baseline is timed on a sample and extrapolated to the cohort;
+--rtt-ms simulates the network round trip to SQL Server for each of its
+statements (the bulk regrade makes only a handful).
+
+    python benchmarks/bench_regrade.py --students 20000 --rtt-ms 1
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import RoundTripCounter, open_exam_now, setup_database
+
+import database
+import sqlite_backend
+from regrade import regrade_exam
+
+
+def seed_submissions(path, exam_id, choices, students, seed):
+    """Graded submissions for every student, written straight to the file"""
+    rng = random.Random(seed)
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        cursor = raw.cursor()
+        correct = dict(cursor.execute("""
+            SELECT qc.Choice_ID, qc.Is_Correct FROM Exam_Questions eq
+            JOIN Question_Choices qc ON qc.Question_ID = eq.Question_ID WHERE eq.Exam_ID = ?
+        """, (exam_id,)).fetchall())
+        exam_rows, answer_rows = [], []
+        for student_id in range(1001, 1001 + students):
+            score = 0
+            for question_id, options in choices.items():
+                choice_id = rng.choice(options)
+                is_correct = correct[choice_id]
+                score += 2 * is_correct
+                answer_rows.append((student_id, exam_id, question_id, choice_id, is_correct, 2 * is_correct))
+            exam_rows.append((student_id, exam_id, score))
+        cursor.executemany("""
+            INSERT INTO Student_Exam (Student_ID, Exam_ID, Student_Score, Submission_Time, Exam_Status)
+            VALUES (?, ?, ?, time('now'), 'Graded')
+        """, exam_rows)
+        cursor.executemany("""
+            INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Is_Correct, Ques_Mark)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, answer_rows)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def fix_answer_key(path, question_id, choice_ids):
+    """Move the correct flag of one question to another choice"""
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        cursor = raw.cursor()
+        current = cursor.execute("SELECT Choice_ID FROM Question_Choices WHERE Question_ID = ? AND Is_Correct = 1",
+                                 (question_id,)).fetchone()[0]
+        replacement = next(choice_id for choice_id in choice_ids if choice_id != current)
+        cursor.execute("UPDATE Question_Choices SET Is_Correct = CASE WHEN Choice_ID = ? THEN 1 ELSE 0 END "
+                       "WHERE Question_ID = ?", (replacement, question_id))
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def time_per_student_baseline(exam_id, sample, rtt):
+    """sp_Correct_Exam for each student (status reset first, as it only grades 'Submitted')"""
+    conn = RoundTripCounter(database.get_db_connection(), rtt=rtt)
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        for student_id in sample:
+            cursor._cursor.execute("UPDATE Student_Exam SET Exam_Status = 'Submitted' "
+                                   "WHERE Exam_ID = ? AND Student_ID = ?", (exam_id, student_id))
+            cursor.execute("EXEC sp_Correct_Exam ?, ?", [exam_id, student_id])
+            conn.commit()
+        return time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--baseline-sample', type=int, default=500)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=20)
+    seed_submissions(path, exam_id, choices, args.students, args.seed)
+
+    fixed_question = sorted(choices)[-1]
+    fix_answer_key(path, fixed_question, choices[fixed_question])
+    print(f" {args.students} submissions x {len(choices)} answers, correct choice of question {fixed_question} changed,"
+          f" simulated RTT {args.rtt_ms} ms")
+
+    dry = regrade_exam(exam_id, dry_run=True)
+    summary = regrade_exam(exam_id)
+    print(f" regrade.py        : {summary['total_seconds']:.3f}s "
+          f"(load {summary['load_seconds']}s, compute {summary['compute_seconds']}s, write {summary['write_seconds']}s), "
+          f"{summary['answers_changed']} answers and {summary['scores_changed']} scores changed")
+
+    # A second pass must find nothing left to change
+    again = regrade_exam(exam_id, dry_run=True)
+    assert again['answers_changed'] == 0 and again['scores_changed'] == 0, again
+    assert dry['answers_changed'] == summary['answers_changed']
+
+    sample = list(range(1001, 1001 + min(args.baseline_sample, args.students)))
+    elapsed = time_per_student_baseline(exam_id, sample, args.rtt_ms / 1000.0)
+    projected = elapsed / len(sample) * args.students
+    print(f" sp_Correct_Exam   : {elapsed:.3f}s for {len(sample)} students, "
+          f"~{projected:.1f}s projected for {args.students} (x{projected / max(summary['total_seconds'], 1e-9):.0f})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
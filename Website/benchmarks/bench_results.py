@@ -0,0 +1,120 @@
+# benchmarks/bench_results.py
+"""Results page: two procedure calls per view vs one vs the graded-results cache.
+
+--students submit the same exam (graded in-process on submit), then every
+student opens the results page --views times:
+
+1. two calls - the previous handler: Get_Exam_Questions_With_Student_Answers
+               and Get_Exam_By_ID, a connection each, render every time
+2. one call  - sp_Get_Exam_Results, cache disabled
+3. cached    - the current handler: one call on the first view, then the
+               page from caches.graded_results
+
+--rtt-ms simulates the network round trip of each statement.  Both loaders
+must return the same answer rows, and a regrade must empty the cache.
+
+    python benchmarks/bench_results.py --students 200 --views 5 --rtt-ms 1
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+import threading
+import time
+
+from common import RoundTripCounter, open_exam_now, percentile, setup_database
+
+import database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--views', type=int, default=5, help='results page views per student')
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=20)
+
+    import app as appmod
+    import caches
+    from flask import render_template, session
+
+    app = appmod.app
+    rng = random.Random(7)
+    for number in range(args.students):
+        student_id = 1001 + number
+        client = app.test_client()
+        client.post('/student/login', data={'student_id': str(student_id), 'password': f'pass{student_id}'})
+        client.post(f'/submit_exam/{exam_id}', data={f'question_{question_id}': str(rng.choice(options))
+                                                     for question_id, options in choices.items()})
+
+    lock = threading.Lock()
+    round_trips = [0]
+
+    class Counting(RoundTripCounter):
+        def close(self):
+            with lock:
+                round_trips[0] += self.round_trips
+            super().close()
+
+    rtt = args.rtt_ms / 1000.0
+    counted = lambda: Counting(database.get_pool().acquire(), rtt=rtt)
+    appmod.get_db_connection = caches.get_db_connection = counted
+
+    def two_calls(exam_id, student_id):
+        results = appmod.execute_stored_procedure('Get_Exam_Questions_With_Student_Answers',
+                                                  [exam_id, student_id], fetch=True) or []
+        exam_details = appmod.execute_stored_procedure('Get_Exam_By_ID', [exam_id], fetch=True)
+        total_score = sum(result['Ques_Mark'] for result in results) if results else 0
+        return render_template('student/results.html', results=results,
+                               exam=exam_details[0] if exam_details else None,
+                               total_score=total_score, exam_id=exam_id)
+
+    def handler(exam_id, student_id):
+        session['student_id'] = student_id
+        return appmod.exam_results(exam_id)
+
+    # Same answer rows from both loaders
+    with contextlib.redirect_stdout(io.StringIO()):
+        for student_id in range(1001, 1001 + min(args.students, 20)):
+            old = appmod.execute_stored_procedure('Get_Exam_Questions_With_Student_Answers',
+                                                  [exam_id, student_id], fetch=True)
+            new = caches.load_exam_results(exam_id, student_id)
+            assert new['exam']['Exam_Status'] == 'Graded', new['exam']
+            assert old == new['results'], f'answer rows differ for student {student_id}'
+    print(f" {args.students} graded attempts x {len(choices)} answers, {args.views} views each, "
+          f"simulated RTT {args.rtt_ms} ms; answer rows identical")
+
+    print(f" {'handler':>9} {'views':>6} {'trips/view':>11} {'p50 us':>8} {'p95 us':>8} {'views/s':>8}")
+    strategies = [('two calls', two_calls, 0), ('one call', handler, 0),
+                  ('cached', handler, caches.graded_results.ttl or 3600)]
+    for label, view, ttl in strategies:
+        caches.graded_results.clear()
+        caches.graded_results.ttl = ttl
+        round_trips[0] = 0
+        timings = []
+        with app.test_request_context(), contextlib.redirect_stdout(io.StringIO()):
+            started_all = time.perf_counter()
+            for _ in range(args.views):
+                for student_id in range(1001, 1001 + args.students):
+                    started = time.perf_counter()
+                    view(exam_id, student_id)
+                    timings.append((time.perf_counter() - started) * 1e6)
+            seconds = time.perf_counter() - started_all
+        print(f" {label:>9} {len(timings):>6} {round_trips[0] / len(timings):>11.2f} "
+              f"{percentile(timings, 50):>8.0f} {percentile(timings, 95):>8.0f} {len(timings) / seconds:>8.0f}")
+
+    # A regrade is the one thing that drops graded pages
+    from regrade import regrade_exam
+    cached = len(caches.graded_results)
+    with contextlib.redirect_stdout(io.StringIO()):
+        regrade_exam(exam_id)
+    print(f" regrade of exam {exam_id}: {cached} cached pages -> {len(caches.graded_results)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# benchmarks/bench_rows.py
+"""Microbenchmark: regrouping the exam paper rows in caches.group_exam_questions.
+
+The sp_Get_Exam_Paper result set from the SQLite stand-in at each --questions
+size, replayed from memory so only the Python side is timed.  The previous
+code turned every row into a dict and regrouped by key; group_exam_questions
+reads the raw rows with the column positions resolved once.  timeit-style:
+autorange picks the loop count, the best of --repeat runs is reported.
+
+Both must produce the same questions.
+
+    python benchmarks/bench_rows.py --questions 10 25 100
+"""
+import argparse
+import sys
+import timeit
+
+from common import open_exam_now, setup_database
+
+import sqlite_backend
+
+
+class ReplayCursor:
+    """Just description and fetchall over a result set captured earlier"""
+
+    def __init__(self, result_set):
+        self.description, self._rows = result_set
+
+    def fetchall(self):
+        return list(self._rows)
+
+
+def capture(conn, sql, params):
+    """(description, rows) of every result set of one statement"""
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    result_sets = [(cursor.description, cursor.fetchall())]
+    while cursor.nextset():
+        result_sets.append((cursor.description, cursor.fetchall()))
+    cursor.close()
+    return result_sets
+
+
+def dicts_loop(cursor):
+    # The cache loader's row conversion
+    columns = [column[0] for column in cursor.description]
+    results = []
+    for row in cursor.fetchall():
+        results.append(dict(zip(columns, row)))
+    return results
+
+
+def group_dict_rows(rows):
+    # caches.group_exam_questions before it read the raw rows
+    organized_questions = {}
+    for question in rows:
+        qid = question['Question_ID']
+        if qid not in organized_questions:
+            organized_questions[qid] = {
+                'text': question['Question_Head'],
+                'type': question['Question_Type'],
+                'choices': []
+            }
+        organized_questions[qid]['choices'].append({
+            'choice_id': question['Choice_ID'],
+            'text': question['Choice_Text']
+        })
+    return organized_questions
+
+
+def best_us(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, nargs='+', default=[10, 25, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = setup_database(students=10, tf_per_course=max(args.questions), mcq_per_course=max(args.questions))
+
+    from caches import group_exam_questions
+
+    backend = sqlite_backend.SQLiteBackend(path)
+    print(f" {'questions':>9} {'rows':>5} {'before us':>10} {'after us':>9} {'speedup':>8}")
+    for size in args.questions:
+        exam_id, _ = open_exam_now(path, no_tf=size // 5, no_mcq=size - size // 5)
+        conn = backend.connect()
+        _, paper_set = capture(conn, "EXEC sp_Get_Exam_Paper ?", [exam_id])
+        conn.close()
+
+        def before():
+            return group_dict_rows(dicts_loop(ReplayCursor(paper_set)))
+
+        def after():
+            cursor = ReplayCursor(paper_set)
+            return group_exam_questions([column[0] for column in cursor.description], cursor.fetchall())
+
+        assert before() == after(), 'regrouped questions differ'
+        before_us = best_us(before, args.repeat)
+        after_us = best_us(after, args.repeat)
+        print(f" {size:>9} {len(paper_set[1]):>5} {before_us:>10.1f} {after_us:>9.1f} {before_us / after_us:>7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
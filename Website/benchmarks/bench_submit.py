@@ -0,0 +1,82 @@
+# benchmarks/bench_submit.py
+"""Round trips and latency per exam submission: row-by-row vs executemany vs TVP.
+
+    python benchmarks/bench_submit.py --students 300 --questions 25 --rtt-ms 1
+
+--rtt-ms simulates the network round trip to SQL Server for every statement
+(the SQLite stand-in runs in-process, so without it only CPU cost shows up).
+"""
+import argparse
+import random
+import time
+
+from common import RoundTripCounter, open_exam_now, percentile, setup_database
+
+import database
+from submissions import INSERT_ANSWER_SQL, INSERT_STUDENT_EXAM_SQL, insert_submission
+
+
+def submit_row_by_row(cursor, exam_id, student_id, answers):
+    """The previous submit_exam: one INSERT per answer"""
+    cursor.execute(INSERT_STUDENT_EXAM_SQL, (exam_id, student_id))
+    for question_id, choice_id in answers:
+        cursor.execute(INSERT_ANSWER_SQL, (student_id, exam_id, question_id, choice_id))
+
+
+def submit_executemany(cursor, exam_id, student_id, answers):
+    insert_submission(cursor, exam_id, student_id, answers, use_tvp=False)
+
+
+def submit_tvp(cursor, exam_id, student_id, answers):
+    insert_submission(cursor, exam_id, student_id, answers, use_tvp=True)
+
+
+STRATEGIES = [
+    ('row-by-row (before)', submit_row_by_row),
+    ('executemany', submit_executemany),
+    ('sp_Submit_Exam TVP', submit_tvp),
+]
+
+
+def run(students, questions, rtt):
+    path = setup_database(students=students * len(STRATEGIES))
+    rng = random.Random(7)
+    no_tf = min(5, questions)
+    results = []
+    student_id = 1001
+    for label, strategy in STRATEGIES:
+        exam_id, choices = open_exam_now(path, no_tf=no_tf, no_mcq=questions - no_tf)
+        latencies = []
+        trips = 0
+        for _ in range(students):
+            answers = [(qid, rng.choice(options)) for qid, options in choices.items()]
+            conn = RoundTripCounter(database.get_db_connection(), rtt=rtt)
+            started = time.perf_counter()
+            strategy(conn.cursor(), exam_id, student_id, answers)
+            conn.commit()
+            latencies.append(time.perf_counter() - started)
+            trips += conn.round_trips
+            conn.close()
+            student_id += 1
+        results.append((label, trips / students, latencies))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--questions', type=int, default=25)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = run(args.students, args.questions, args.rtt_ms / 1000.0)
+    print(f"{args.students} submissions x {args.questions} answers, simulated RTT {args.rtt_ms} ms")
+    print(f"{'strategy':<22}{'round trips':>12}{'mean ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for label, trips, latencies in results:
+        mean = sum(latencies) / len(latencies)
+        print(f"{label:<22}{trips:>12.1f}{mean * 1000:>10.2f}"
+              f"{percentile(latencies, 95) * 1000:>10.2f}{sum(latencies):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
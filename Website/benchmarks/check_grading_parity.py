@@ -0,0 +1,110 @@
+# benchmarks/check_grading_parity.py
+"""Differential check: grading engine (grading.py) vs sp_Correct_Exam semantics.
+
+Every random submission is written twice, to two exams with the same
+questions.  One copy is graded by sp_Correct_Exam, the other by the in-memory
+engine plus sp_Apply_Exam_Grades.  The Student_Exam_Questions and
+Student_Exam rows must come out identical.
+
+    python benchmarks/check_grading_parity.py --students 500
+"""
+import argparse
+import random
+import sys
+
+from common import open_exam_now, setup_database
+
+import database
+import sqlite_backend
+from caches import load_answer_key
+from grading import apply_grades, grade_answers
+from submissions import insert_submission
+
+
+def clone_exam(path, exam_id):
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        cursor = raw.cursor()
+        clone_id = cursor.execute("SELECT MAX(Exam_ID) + 1 FROM Exams").fetchone()[0]
+        cursor.execute("""
+            INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
+            SELECT ?, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID
+            FROM Exams WHERE Exam_ID = ?
+        """, (clone_id, exam_id))
+        cursor.execute("INSERT INTO Exam_Questions SELECT ?, Question_ID FROM Exam_Questions WHERE Exam_ID = ?",
+                       (clone_id, exam_id))
+        raw.commit()
+    finally:
+        raw.close()
+    return clone_id
+
+
+def random_answers(rng, choices):
+    """Mostly valid picks, some skipped questions"""
+    answers = []
+    for question_id, options in choices.items():
+        if rng.random() < 0.1:
+            continue
+        answers.append((question_id, rng.choice(options)))
+    return answers
+
+
+def snapshot(cursor, exam_id, student_id):
+    cursor.execute("""
+        SELECT Question_ID, Selected_Choice_ID, Is_Correct, Ques_Mark FROM Student_Exam_Questions
+        WHERE Exam_ID = ? AND Student_ID = ? ORDER BY Question_ID
+    """, (exam_id, student_id))
+    answers = [tuple(int(value) for value in row) for row in cursor.fetchall()]
+    cursor.execute("SELECT Student_Score, Exam_Status FROM Student_Exam WHERE Exam_ID = ? AND Student_ID = ?",
+                   (exam_id, student_id))
+    return answers, tuple(cursor.fetchone())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    path = setup_database(students=args.students)
+    reference_exam, choices = open_exam_now(path, no_tf=10, no_mcq=15)
+    engine_exam = clone_exam(path, reference_exam)
+    answer_key = load_answer_key(engine_exam)
+    rng = random.Random(args.seed)
+
+    mismatches = 0
+    conn = database.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        for student_id in range(1001, 1001 + args.students):
+            answers = random_answers(rng, choices)
+
+            insert_submission(cursor, reference_exam, student_id, answers)
+            cursor.execute("EXEC sp_Correct_Exam ?, ?", [reference_exam, student_id])
+
+            insert_submission(cursor, engine_exam, student_id, answers)
+            graded = grade_answers(answer_key, answers)
+            if graded is None:
+                cursor.execute("EXEC sp_Correct_Exam ?, ?", [engine_exam, student_id])
+            else:
+                apply_grades(cursor, engine_exam, student_id, graded)
+            conn.commit()
+
+            expected = snapshot(cursor, reference_exam, student_id)
+            actual = snapshot(cursor, engine_exam, student_id)
+            if expected != actual:
+                mismatches += 1
+                print(f" Student {student_id}: sp_Correct_Exam={expected} engine={actual}")
+
+        # A choice that is not on the exam must not be graded by the engine
+        foreign_choice = max(option for options in choices.values() for option in options) + 1000
+        assert grade_answers(answer_key, [(next(iter(choices)), foreign_choice)]) is None
+    finally:
+        conn.close()
+
+    print(f" {args.students} submissions compared, {mismatches} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
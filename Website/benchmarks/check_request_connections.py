@@ -0,0 +1,116 @@
+# benchmarks/check_request_connections.py
+"""Check: database connections, statements and commits per request.
+
+Walks the student and instructor routes with the Flask test client - cold
+caches first, then warm - and asserts each endpoint against ROUTE_LIMITS:
+at most one request connection and one commit, and a bounded number of
+statements.  ID block reservations (id_allocator.py) commit on their own
+connection and are listed separately.  Also checks that a failing
+add_questions leaves no half-added question behind.
+
+    python benchmarks/check_request_connections.py
+"""
+import sys
+from datetime import datetime, timedelta
+
+from common import open_exam_now, setup_database
+
+import sqlite_backend
+
+# endpoint -> (request connections, statements, commits); statements include
+# those of ID block reservations and of cache loads on a cold first request
+ROUTE_LIMITS = {
+    'student_login': (1, 1, 0),
+    'student_dashboard': (1, 3, 0),
+    'take_exam': (1, 3, 0),
+    'autosave': (1, 1, 0),
+    'submit_exam': (1, 4, 1),
+    'exam_results': (1, 1, 0),
+    'instructor_login': (1, 1, 0),
+    'instructor_dashboard': (1, 2, 0),
+    'create_exam': (1, 5, 1),
+    'add_questions': (1, 5, 1),
+    'bulk_schedule': (1, 4, 1),
+    'view_exam_results': (1, 2, 0),
+}
+
+
+def main():
+    path = setup_database(students=20)
+    exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=10)
+
+    import app as appmod
+    from database import request_db_stats
+
+    app = appmod.app
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+    student = app.test_client()
+    instructor = app.test_client()
+    answers = {f'question_{question_id}': str(options[0]) for question_id, options in choices.items()}
+
+    steps = [
+        ('student login', lambda: student.post('/student/login', data={'student_id': '1001', 'password': 'pass1001'})),
+        ('dashboard', lambda: student.get('/student/dashboard')),
+        ('dashboard again', lambda: student.get('/student/dashboard')),
+        ('take exam', lambda: student.get(f'/exam/{exam_id}')),
+        ('take exam again', lambda: student.get(f'/exam/{exam_id}')),
+        ('autosave', lambda: student.post(f'/autosave/{exam_id}', data=answers)),
+        ('restore', lambda: student.get(f'/autosave/{exam_id}')),
+        ('submit', lambda: student.post(f'/submit_exam/{exam_id}', data=answers)),
+        ('results', lambda: student.get(f'/results/{exam_id}')),
+        ('results again', lambda: student.get(f'/results/{exam_id}')),
+        ('instructor login', lambda: instructor.post('/instructor/login',
+                                                      data={'instructor_id': '1', 'password': 'instructor'})),
+        ('instructor dashboard', lambda: instructor.get('/instructor/dashboard')),
+        ('create exam form', lambda: instructor.get('/instructor/create_exam')),
+        ('create exam', lambda: instructor.post('/instructor/create_exam', data={
+            'course_name': 'SQL Server Fundamentals', 'exam_date': tomorrow, 'start_time': '09:00',
+            'end_time': '10:30', 'no_tf': '5', 'no_mcq': '10'})),
+        ('add question', lambda: instructor.post(f'/instructor/add_questions/{exam_id}', data={
+            'question_text': 'Which keyword removes duplicate rows?', 'question_type': 'multiple_choice',
+            'correct_answer': 'DISTINCT', 'choices': ['DISTINCT', 'UNIQUE', 'GROUP', 'TOP']})),
+        ('bulk schedule', lambda: instructor.post('/instructor/bulk_schedule', json=[
+            {'course': 'SQL Server Fundamentals', 'date': tomorrow, 'start': '11:00', 'end': '12:00',
+             'tf': 5, 'mcq': 10}])),
+        ('exam results', lambda: instructor.get(f'/instructor/exam/{exam_id}')),
+    ]
+
+    failed = False
+    print(f" {'step':>20} {'endpoint':>21} {'status':>6} {'conns':>6} {'independent':>12} "
+          f"{'statements':>11} {'commits':>8}")
+    for label, step in steps:
+        request_db_stats.clear()
+        response = step()
+        (endpoint, stats), = request_db_stats.metrics().items()
+        limits = ROUTE_LIMITS.get(endpoint)
+        over = limits is not None and (stats['max_connections'] > limits[0] or stats['max_statements'] > limits[1]
+                                       or stats['max_commits'] > limits[2])
+        failed = failed or over
+        print(f" {label:>20} {endpoint:>21} {response.status_code:>6} {stats['max_connections']:>6} "
+              f"{stats['independent_connections']:>12} {stats['max_statements']:>11} {stats['max_commits']:>8}"
+              f"{'  OVER ' + str(limits) if over else ''}")
+
+    # add_questions is one transaction: a failure after sp_Add_Question_With_Choices leaves nothing
+    raw = sqlite_backend.open_sqlite(path)
+    count_sql = "SELECT (SELECT COUNT(*) FROM Questions), (SELECT COUNT(*) FROM Question_Choices)"
+    before = raw.execute(count_sql).fetchone()
+    raw.execute("CREATE TRIGGER Fail_Exam_Questions BEFORE INSERT ON Exam_Questions "
+                "BEGIN SELECT RAISE(ABORT, 'injected failure'); END")
+    raw.commit()
+    instructor.post(f'/instructor/add_questions/{exam_id}', data={
+        'question_text': 'Which clause filters groups?', 'question_type': 'multiple_choice',
+        'correct_answer': 'HAVING', 'choices': ['HAVING', 'WHERE', 'ORDER BY', 'TOP']})
+    after = raw.execute(count_sql).fetchone()
+    raw.execute("DROP TRIGGER Fail_Exam_Questions")
+    raw.commit()
+    raw.close()
+    atomic = before == after
+    print(f" add_questions with a failing Exam_Questions insert: (questions, choices) {before} -> {after}"
+          f"{'' if atomic else '  NOT ATOMIC'}")
+
+    print(" OK" if not failed and atomic else " FAILED")
+    return 1 if failed or not atomic else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
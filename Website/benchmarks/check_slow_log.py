@@ -0,0 +1,85 @@
+# benchmarks/check_slow_log.py
+"""Check: the slow-statement log and its summary.
+
+Runs the student and instructor routes against the SQLite stand-in with the
+threshold at 0 ms (every statement is "slow") and plan capture on, then
+checks the log file: every procedure called is there with its route, rows
+and an EXPLAIN QUERY PLAN, no password reaches the file, and the
+slow_queries.py summary ranks the statements by total time.
+
+    python benchmarks/check_slow_log.py
+"""
+import json
+import os
+import sys
+import tempfile
+
+LOG_PATH = os.path.join(tempfile.mkdtemp(prefix='iti-slow-log-'), 'slow_statements.log')
+os.environ.update(ITI_SLOW_LOG_THRESHOLD_MS='0', ITI_SLOW_LOG_CAPTURE='1', ITI_SLOW_LOG_PATH=LOG_PATH)
+
+from common import open_exam_now, setup_database  # noqa: E402
+
+PASSWORDS = ('pass1001', 'instructor')
+
+
+def main():
+    path = setup_database(students=20)
+    exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=10)
+
+    import app as appmod
+    import slow_queries
+
+    app = appmod.app
+    student = app.test_client()
+    instructor = app.test_client()
+    answers = {f'question_{question_id}': str(options[0]) for question_id, options in choices.items()}
+    student.post('/student/login', data={'student_id': '1001', 'password': 'pass1001'}).close()
+    student.get('/student/dashboard').close()
+    student.get(f'/exam/{exam_id}').close()
+    student.post(f'/submit_exam/{exam_id}', data=answers).close()
+    student.get(f'/results/{exam_id}').close()
+    instructor.post('/instructor/login', data={'instructor_id': '1', 'password': 'instructor'}).close()
+    instructor.get('/instructor/dashboard').close()
+
+    entries = list(slow_queries.read_entries([LOG_PATH]))
+    procedures = [entry for entry in entries if entry['sql'].upper().startswith('EXEC')]
+
+    problems = []
+    if not procedures:
+        problems.append('no procedure calls logged')
+    written = json.dumps([(entry['sql'], entry['params'], entry.get('plan')) for entry in entries])
+    for password in PASSWORDS:
+        if f"'{password}'" in written or f'"{password}"' in written:
+            problems.append(f'password {password!r} written to the log')
+    if any(entry['route'] is None for entry in procedures):
+        problems.append('procedure call without a route')
+    if not any(entry.get('plan') for entry in procedures):
+        problems.append('no query plan captured')
+
+    print(f" {len(entries)} statements logged to {LOG_PATH}, {len(procedures)} procedure calls")
+    print(f" {'statement':<40} {'route':>20} {'ms':>8} {'rows':>5}  params")
+    for entry in procedures:
+        print(f" {entry['statement'][:40]:<40} {entry['route']:>20} {entry['ms']:>8.3f} {entry['rows']:>5}  "
+              f"{entry['params']}")
+    login = next((entry for entry in procedures if entry['route'] == 'student_login'), None)
+    if login and login.get('plan'):
+        print(" student_login plan:")
+        for step in login['plan']:
+            print(f"   {step['sql'][:100]}")
+            for detail in step['plan']:
+                print(f"     {detail}")
+
+    print(" summary by total time:")
+    for stats in slow_queries.summarize(slow_queries.read_entries([LOG_PATH]))[:5]:
+        print(f"   {stats['statement'][:40]:<40} count {stats['count']:>3}, total {stats['total_ms']:8.3f} ms, "
+              f"routes {sorted(stats['routes'])}")
+    print(f" metrics: {slow_queries.slow_statements.metrics()}")
+
+    for problem in problems:
+        print(f" PROBLEM: {problem}")
+    print(" OK" if not problems else " FAILED")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
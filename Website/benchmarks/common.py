@@ -0,0 +1,129 @@
+# benchmarks/common.py
+"""Shared setup for the benchmark scripts: a seeded SQLite stand-in database"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+WEBSITE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if WEBSITE_DIR not in sys.path:
+    sys.path.insert(0, WEBSITE_DIR)
+
+from config import Config  # noqa: E402
+
+
+def setup_database(students=300, path=None, tf_per_course=40, mcq_per_course=60):
+    """Create a fresh seeded SQLite database and point the app at it"""
+    import sqlite_backend
+
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix='iti-bench-'), 'iti_system.db')
+    Config.DATABASE_CONFIG.update(backend='sqlite', sqlite_path=path)
+
+    sqlite_backend.SQLiteBackend(path)
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        sqlite_backend.seed_demo_data(raw, students=students, tf_per_course=tf_per_course,
+                                      mcq_per_course=mcq_per_course)
+    finally:
+        raw.close()
+    return path
+
+
+def open_exam_now(path, course_id=1, no_tf=5, no_mcq=20, minutes_left=60):
+    """Insert an exam whose window is open right now; returns (exam_id, {Question_ID: [Choice_ID, ...]})"""
+    import sqlite_backend
+
+    now = datetime.now()
+    raw = sqlite_backend.open_sqlite(path)
+    try:
+        cursor = raw.cursor()
+        exam_id = cursor.execute("SELECT IFNULL(MAX(Exam_ID), 0) + 1 FROM Exams").fetchone()[0]
+        cursor.execute("""
+            INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
+            VALUES (?, 'Benchmark Exam', ?, ?, ?, ?, ?, ?)
+        """, (exam_id, (no_tf + no_mcq) * 2, now.strftime('%Y-%m-%d'), no_tf + no_mcq,
+              (now - timedelta(minutes=5)).strftime('%H:%M:%S'),
+              min(now + timedelta(minutes=minutes_left), now.replace(hour=23, minute=59, second=59)).strftime('%H:%M:%S'),
+              course_id))
+        for question_type, count in (('T/F', no_tf), ('MCQ', no_mcq)):
+            cursor.execute("""
+                INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+                SELECT ?, Question_ID FROM Questions
+                WHERE Course_ID = ? AND Question_Type = ?
+                ORDER BY Question_ID LIMIT ?
+            """, (exam_id, course_id, question_type, count))
+        choices = {}
+        for question_id, choice_id in cursor.execute("""
+            SELECT qc.Question_ID, qc.Choice_ID
+            FROM Exam_Questions eq JOIN Question_Choices qc ON eq.Question_ID = qc.Question_ID
+            WHERE eq.Exam_ID = ? ORDER BY qc.Choice_ID
+        """, (exam_id,)):
+            choices.setdefault(question_id, []).append(choice_id)
+        raw.commit()
+    finally:
+        raw.close()
+    return exam_id, choices
+
+
+class RoundTripCounter:
+    """Wraps a connection and counts statements sent to the server.
+
+    ``rtt`` adds a simulated network round-trip time per call, so numbers from
+    the in-process SQLite stand-in resemble a remote SQL Server.
+    """
+
+    def __init__(self, conn, rtt=0.0):
+        self._conn = conn
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def _trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def cursor(self):
+        return _CountingCursor(self, self._conn.cursor())
+
+    def commit(self):
+        self._trip()
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+class _CountingCursor:
+    def __init__(self, counter, cursor):
+        self._counter = counter
+        self._cursor = cursor
+
+    def execute(self, *args):
+        self._counter._trip()
+        return self._cursor.execute(*args)
+
+    def executemany(self, *args):
+        self._counter._trip()
+        return self._cursor.executemany(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
@@ -0,0 +1,362 @@
+# benchmarks/load_exam_rush.py
+"""Load test: a cohort of students through one exam, end to end.
+
+An instructor schedules an exam through /instructor/create_exam opening
+--lead-seconds from now and lasting --exam-seconds.  Then every student,
+on their own thread:
+
+1. logs in (student_login), spread over --login-spread seconds
+2. polls the dashboard (student_dashboard) every --poll-seconds, +-50%,
+   until Start_Time
+3. opens the exam (take_exam) at Start_Time, within --start-spread seconds
+4. submits (submit_exam) --submit-before seconds ahead of End_Time, the
+   whole cohort within --submit-spread seconds, and follows the redirect
+   to the results page (exam_results)
+
+A request counts as an error when it raises, returns a 4xx/5xx, or does
+not do its job (a take_exam page without questions, a submit_exam that is
+not the redirect to the results).  Per route the run reports p50/p95/p99
+latency, throughput and error rate, and writes them with the settings and
+the git commit to a JSON file; --compare prints the change against an
+earlier file.
+
+Targets:
+    (default)        the app in-process on a fresh seeded SQLite stand-in
+    --configured-db  the app in-process on the database configured in
+                     config.py (ITI_DB_BACKEND, DATABASE_CONFIG)
+    --url URL        a running server over HTTP
+
+Against anything but the fresh stand-in, pass --credentials (a CSV of
+Student_ID,Password) unless the cohort logs in as the seeded 1001.. /
+'pass<Student_ID>', and --instructor-id/--instructor-password.
+
+    python benchmarks/load_exam_rush.py --students 300
+    python benchmarks/load_exam_rush.py --students 1000 --lead-seconds 60 --exam-seconds 120
+    python benchmarks/load_exam_rush.py --url http://127.0.0.1:5000 --compare load_results/before.json
+"""
+import argparse
+import csv
+import http.cookiejar
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+from common import WEBSITE_DIR, percentile, setup_database
+
+ROUTES = ('student_login', 'student_dashboard', 'take_exam', 'submit_exam', 'exam_results')
+
+CHOICE_INPUT = re.compile(r'name="question_(\d+)" value="(\d+)"')
+CREATED_EXAM_ID = re.compile(r'Exam ID:</span>\s*<span class="value">(\d+)</span>')
+
+
+class InProcessClient:
+    """One browser session against the app through the Flask test client"""
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self._client.open(path, method=method, data=data)
+        try:
+            return response.status_code, response.get_data(as_text=True), response.headers.get('Location', '')
+        finally:
+            response.close()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """One browser session against a running server: cookies kept, redirects not followed"""
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8', 'replace'), ''
+        except urllib.error.HTTPError as e:
+            with e:
+                return e.code, e.read().decode('utf-8', 'replace'), e.headers.get('Location', '')
+
+
+class Recorder:
+    """Latency and outcome of every request, by route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {route: [] for route in ROUTES}  # route -> [(started, seconds, ok)]
+        self.errors = {}  # (route, reason) -> count
+
+    def timed(self, route, client, method, path, data=None, check=None):
+        """Send one request; returns (status, body, location), or None when it raised"""
+        started = time.perf_counter()
+        try:
+            result = client.request(method, path, data)
+        except Exception as e:
+            result, reason = None, type(e).__name__
+        else:
+            status, body, location = result
+            if status >= 400:
+                reason = f'HTTP {status}'
+            else:
+                reason = check(status, body, location) if check else None
+        seconds = time.perf_counter() - started
+        with self._lock:
+            self.samples[route].append((started, seconds, reason is None))
+            if reason is not None:
+                key = (route, reason)
+                self.errors[key] = self.errors.get(key, 0) + 1
+        return result
+
+    def summary(self):
+        routes = {}
+        everything = []
+        for route, samples in self.samples.items():
+            if samples:
+                routes[route] = _stats(samples)
+                everything.extend(samples)
+        return {'routes': routes, 'total': _stats(everything) if everything else None,
+                'errors': {f'{route}: {reason}': count for (route, reason), count in sorted(self.errors.items())}}
+
+
+def _stats(samples):
+    latencies = [seconds * 1000 for _, seconds, _ in samples]
+    first = min(started for started, _, _ in samples)
+    last = max(started + seconds for started, seconds, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples),
+        'throughput_rps': len(samples) / (last - first) if last > first else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies),
+    }
+
+
+def expect_redirect_to(fragment):
+    def check(status, body, location):
+        if status not in (301, 302, 303) or fragment not in location:
+            return 'no redirect' if status == 200 else f'HTTP {status}'
+        return None
+    return check
+
+
+def expect_questions(status, body, location):
+    return None if CHOICE_INPUT.search(body) else 'no questions'
+
+
+def load_credentials(path, count):
+    if path is None:
+        return [(str(1001 + number), f'pass{1001 + number}') for number in range(count)]
+    with open(path, newline='') as handle:
+        rows = [(row[0].strip(), row[1].strip()) for row in csv.reader(handle) if len(row) >= 2 and row[0].strip().isdigit()]
+    if len(rows) < count:
+        raise SystemExit(f" {path} has {len(rows)} students, --students asks for {count}")
+    return rows[:count]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=WEBSITE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def schedule_exam(client, args, start, end):
+    """Create the exam through the instructor routes; returns its Exam_ID"""
+    status, _, _ = client.request('POST', '/instructor/login', {
+        'instructor_id': args.instructor_id, 'password': args.instructor_password})
+    if status not in (301, 302, 303):
+        raise SystemExit(f" Instructor login failed (HTTP {status})")
+    status, body, _ = client.request('POST', '/instructor/create_exam', {
+        'course_name': args.course, 'exam_date': start.strftime('%Y-%m-%d'),
+        'start_time': start.strftime('%H:%M:%S'), 'end_time': end.strftime('%H:%M:%S'),
+        'no_tf': str(args.tf), 'no_mcq': str(args.mcq)})
+    match = CREATED_EXAM_ID.search(body)
+    if status != 200 or not match:
+        raise SystemExit(f" Could not create the exam (HTTP {status})")
+    return int(match.group(1))
+
+
+def run_student(client, credentials, exam_id, timeline, args, recorder, rng):
+    student_id, password = credentials
+    monotonic_at = timeline['monotonic_at']
+
+    def sleep_until(moment):
+        delay = moment - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    sleep_until(monotonic_at(timeline['logins']) + rng.uniform(0, args.login_spread))
+    if not recorder.timed('student_login', client, 'POST', '/student/login',
+                          {'student_id': student_id, 'password': password},
+                          check=expect_redirect_to('/student/dashboard')):
+        return
+
+    opens_at = monotonic_at(timeline['start']) + rng.uniform(0, args.start_spread)
+    while time.monotonic() < opens_at:
+        recorder.timed('student_dashboard', client, 'GET', '/student/dashboard')
+        sleep_until(min(opens_at, time.monotonic() + args.poll_seconds * rng.uniform(0.5, 1.5)))
+
+    result = recorder.timed('take_exam', client, 'GET', f'/exam/{exam_id}', check=expect_questions)
+    choices = {}
+    for question_id, choice_id in CHOICE_INPUT.findall(result[1] if result else ''):
+        choices.setdefault(question_id, []).append(choice_id)
+    answers = {f'question_{question_id}': rng.choice(options) for question_id, options in choices.items()}
+    answers['submission_token'] = f'load-{student_id}-{exam_id}'
+
+    sleep_until(monotonic_at(timeline['submit']) + rng.uniform(0, args.submit_spread))
+    result = recorder.timed('submit_exam', client, 'POST', f'/submit_exam/{exam_id}', answers,
+                            check=expect_redirect_to(f'/results/{exam_id}'))
+    if result and result[0] in (301, 302, 303):
+        recorder.timed('exam_results', client, 'GET', f'/results/{exam_id}')
+
+
+def print_summary(summary):
+    print(f" {'route':>18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    rows = list(summary['routes'].items())
+    if summary['total']:
+        rows.append(('total', summary['total']))
+    for route, stats in rows:
+        print(f" {route:>18} {stats['requests']:>9} {stats['error_rate']:>7.1%} {stats['throughput_rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+    for error, count in summary['errors'].items():
+        print(f"   error {error} x{count}")
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    print(f" against {baseline_path} (commit {baseline.get('commit')}, {baseline['settings']['students']} students):")
+    print(f" {'route':>18} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'errors':>15}")
+    for route, stats in results['routes'].items():
+        before = baseline['routes'].get(route)
+        if before is None:
+            continue
+        cells = [f"{before[key]:>7.1f} -> {stats[key]:<7.1f}" for key in ('p50_ms', 'p95_ms', 'p99_ms')]
+        print(f" {route:>18} {cells[0]:>17} {cells[1]:>17} {cells[2]:>17} "
+              f"{before['error_rate']:>5.1%} -> {stats['error_rate']:<5.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=200, help='cohort size')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help='drive a running server instead of the app in-process')
+    target.add_argument('--configured-db', action='store_true',
+                        help='run in-process on the database configured in config.py')
+    parser.add_argument('--credentials', help='CSV of Student_ID,Password for the cohort')
+    parser.add_argument('--instructor-id', default='1')
+    parser.add_argument('--instructor-password', default='instructor')
+    parser.add_argument('--course', default='SQL Server Fundamentals')
+    parser.add_argument('--tf', type=int, default=5, help='T/F questions on the exam')
+    parser.add_argument('--mcq', type=int, default=20, help='MCQ questions on the exam')
+    parser.add_argument('--lead-seconds', type=float, default=20, help='from now until Start_Time')
+    parser.add_argument('--exam-seconds', type=float, default=40, help='from Start_Time until End_Time')
+    parser.add_argument('--login-spread', type=float, default=None,
+                        help='seconds the logins are spread over (default: half the lead)')
+    parser.add_argument('--poll-seconds', type=float, default=3.0, help='mean think time between dashboard polls')
+    parser.add_argument('--start-spread', type=float, default=1.0, help='seconds after Start_Time the exam opens')
+    parser.add_argument('--submit-before', type=float, default=5.0, help='seconds ahead of End_Time to submit')
+    parser.add_argument('--submit-spread', type=float, default=1.0, help='seconds the submissions are spread over')
+    parser.add_argument('--seed', type=int, default=2024)
+    parser.add_argument('--out', help='JSON results file (default: load_results/exam_rush-<commit>-<time>.json)')
+    parser.add_argument('--compare', help='earlier JSON results to compare against')
+    parser.add_argument('--max-error-rate', type=float, default=0.0, help='exit 1 above this overall error rate')
+    args = parser.parse_args()
+    if args.login_spread is None:
+        args.login_spread = args.lead_seconds / 2
+    if args.submit_before + args.submit_spread >= args.exam_seconds:
+        parser.error('--submit-before plus --submit-spread must be shorter than --exam-seconds')
+
+    if args.url:
+        target_name = args.url
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+    else:
+        if not args.configured_db:
+            setup_database(students=args.students)
+        import app as appmod
+        target_name = 'in-process, ' + ('configured database' if args.configured_db else 'fresh SQLite stand-in')
+        make_client = lambda: InProcessClient(appmod.app)  # noqa: E731
+    cohort = load_credentials(args.credentials, args.students)
+
+    # Whole seconds: Start_Time and End_Time are stored to the second
+    now = datetime.now()
+    start = (now + timedelta(seconds=args.lead_seconds + 1)).replace(microsecond=0)
+    end = start + timedelta(seconds=args.exam_seconds)
+    if end.date() != now.date():
+        raise SystemExit(" The exam would run past midnight; try again in a few minutes")
+    exam_id = schedule_exam(make_client(), args, start, end)
+
+    # Wall clock -> monotonic; a small margin so nobody arrives a hair before Start_Time
+    offset = time.monotonic() - time.time()
+    timeline = {
+        'monotonic_at': lambda moment: moment.timestamp() + offset + 0.05,
+        'logins': now,
+        'start': start,
+        'submit': end - timedelta(seconds=args.submit_before + args.submit_spread),
+    }
+    print(f" {target_name}: {args.students} students, exam {exam_id} open "
+          f"{start:%H:%M:%S}-{end:%H:%M:%S}, submitting from {timeline['submit']:%H:%M:%S}")
+
+    recorder = Recorder()
+    threads = [threading.Thread(target=run_student, name=f'student-{credentials[0]}',
+                                args=(make_client(), credentials, exam_id, timeline, args, recorder,
+                                      random.Random(args.seed + number)))
+               for number, credentials in enumerate(cohort)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = recorder.summary()
+    print_summary(summary)
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'finished': datetime.now().isoformat(timespec='seconds'),
+        'target': target_name,
+        'exam_id': exam_id,
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('out', 'compare', 'instructor_password')},
+        **summary,
+    }
+    out = args.out or os.path.join('load_results', f"exam_rush-{commit or 'nocommit'}-{now:%Y%m%d-%H%M%S}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2)
+    print(f" results written to {out}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+    total = summary['total']
+    return 1 if total is None or total['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# benchmarks/stress_duplicate_submit.py
+"""Concurrency check: simultaneous duplicate submissions of one attempt.
+
+--duplicates requests for the same student and exam hit /submit_exam at the
+same instant, released by a barrier:
+
+1. same token   - a double click or a retry: exactly one request may reach
+                  the database, the rest are answered from the token ledger
+2. new tokens   - the same attempt from several tabs: the database lets one in
+3. no token     - a browser without the page script, same as 2
+
+Every response must be the redirect to the results page, and each attempt
+must end up with exactly one Student_Exam row and one row per answer.
+--rtt-ms slows each submission's write to widen the race window.
+
+    python benchmarks/stress_duplicate_submit.py --duplicates 50
+"""
+import argparse
+import random
+import sys
+import time
+
+from common import open_exam_now, setup_database
+from stress_id_allocation import run_threads
+
+import sqlite_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duplicates', type=int, default=50)
+    parser.add_argument('--rtt-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    path = setup_database(students=10)
+    exam_id, choices = open_exam_now(path, no_tf=5, no_mcq=20)
+
+    import app as appmod
+    from submissions import submission_ledger
+
+    app = appmod.app
+    writes = []
+    real_insert = appmod.insert_submission
+
+    def slow_insert(cursor, exam_id, student_id, answers, use_tvp=None):
+        writes.append(student_id)
+        time.sleep(args.rtt_ms / 1000.0)
+        return real_insert(cursor, exam_id, student_id, answers, use_tvp)
+
+    appmod.insert_submission = slow_insert
+
+    rng = random.Random(7)
+    answers = {f'question_{question_id}': str(rng.choice(options)) for question_id, options in choices.items()}
+    scenarios = [
+        ('same token', lambda number: 'retry-token'),
+        ('new tokens', lambda number: f'tab-{number}'),
+        ('no token', lambda number: None),
+    ]
+
+    failed = False
+    print(f" {args.duplicates} simultaneous submissions of one attempt, {len(answers)} answers each")
+    print(f" {'scenario':>11} {'redirects':>10} {'errors':>7} {'DB writes':>10} {'replays':>8} "
+          f"{'attempt rows':>13} {'answer rows':>12}")
+    for number, (label, token_for) in enumerate(scenarios):
+        student_id = 1001 + number
+        clients = []
+        for _ in range(args.duplicates):
+            client = app.test_client()
+            client.post('/student/login', data={'student_id': str(student_id), 'password': f'pass{student_id}'})
+            clients.append(client)
+        writes.clear()
+        replays_before = submission_ledger.metrics()['replays']
+
+        def work(thread):
+            form = dict(answers)
+            token = token_for(thread)
+            if token:
+                form['submission_token'] = token
+            response = clients[thread].post(f'/submit_exam/{exam_id}', data=form)
+            return response.status_code, response.location, response.data[:100]
+
+        results, _ = run_threads(args.duplicates, work)
+        redirects = sum(1 for status, location, _ in results
+                        if status == 302 and location.endswith(f'/results/{exam_id}'))
+        errors = [body for status, _, body in results if status != 302]
+
+        raw = sqlite_backend.open_sqlite(path)
+        attempt_rows = raw.execute("SELECT COUNT(*) FROM Student_Exam WHERE Exam_ID = ? AND Student_ID = ?",
+                                   (exam_id, student_id)).fetchone()[0]
+        answer_rows = raw.execute("SELECT COUNT(*) FROM Student_Exam_Questions WHERE Exam_ID = ? AND Student_ID = ?",
+                                  (exam_id, student_id)).fetchone()[0]
+        raw.close()
+        replays = submission_ledger.metrics()['replays'] - replays_before
+
+        print(f" {label:>11} {redirects:>10} {len(errors):>7} {len(writes):>10} {replays:>8} "
+              f"{attempt_rows:>13} {answer_rows:>12}")
+        ok = (redirects == args.duplicates and not errors and attempt_rows == 1 and answer_rows == len(answers))
+        if label == 'same token':
+            ok = ok and len(writes) == 1 and replays == args.duplicates - 1
+        if not ok:
+            failed = True
+            for body in errors[:3]:
+                print(f"   error response: {body!r}")
+
+    print(" OK" if not failed else " FAILED")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# benchmarks/stress_id_allocation.py
+"""Concurrent ID allocation: hi/lo blocks vs one round trip per ID vs MAX()+1.
+
+1. Allocation only: every thread draws IDs from a shared allocator; with
+   --rtt-ms each sp_Reserve_ID_Block call pays a simulated network round
+   trip.  All IDs must be unique; hi/lo throughput should grow with threads.
+2. End to end: every thread creates exams through sp_Generate_Exam with an
+   allocated Exam_ID, next to the old "SELECT MAX(Exam_ID) + 1" pattern whose
+   losers fail on the primary key.  SQLite has a single writer, so this part
+   checks correctness rather than scaling.
+
+    python benchmarks/stress_id_allocation.py --threads 1 2 4 8 16
+"""
+import argparse
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+from common import setup_database
+
+import database
+from id_allocator import HiLoAllocator, reserve_block
+
+
+def run_threads(threads, work):
+    """Run work(thread_number) on ``threads`` threads; returns (results, seconds)"""
+    results = [None] * threads
+    barrier = threading.Barrier(threads)
+
+    def target(number):
+        barrier.wait()
+        results[number] = work(number)
+
+    workers = [threading.Thread(target=target, args=(number,)) for number in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results, time.perf_counter() - started
+
+
+def allocation_stress(threads, per_thread, block_size, rtt):
+    """block_size None: every ID is its own sp_Reserve_ID_Block call (NEXT VALUE FOR per insert)"""
+    blocks = []
+
+    def reserve(sequence, size):
+        if rtt:
+            time.sleep(rtt)
+        blocks.append(size)
+        return reserve_block(sequence, size)
+
+    allocator = HiLoAllocator('Question_ID_Seq', block_size=block_size or 1, reserve=reserve)
+
+    def work(_):
+        if block_size is None:
+            return [reserve('Question_ID_Seq', 1) for _ in range(per_thread)]
+        return [allocator.next_id() for _ in range(per_thread)]
+
+    results, seconds = run_threads(threads, work)
+    ids = [value for chunk in results for value in chunk]
+    return len(ids), len(set(ids)), seconds, len(blocks)
+
+
+def create_exams(threads, per_thread, use_allocator):
+    exam_date = (date.today() + timedelta(days=1)).strftime('%Y-%m-%d')
+    allocator = HiLoAllocator('Exam_ID_Seq', block_size=20)
+
+    def work(_):
+        created, failed = [], 0
+        for _ in range(per_thread):
+            conn = database.get_db_connection()
+            try:
+                cursor = conn.cursor()
+                if use_allocator:
+                    exam_id = allocator.next_id()
+                else:
+                    # The old pattern: read MAX, then insert with it
+                    cursor.execute("SELECT IFNULL(MAX(Exam_ID), 0) + 1 FROM Exams")
+                    exam_id = cursor.fetchone()[0]
+                cursor.execute("EXEC sp_Generate_Exam ?, ?, ?, ?, ?, ?, ?",
+                               ['SQL Server Fundamentals', exam_date, '09:00', '10:00', 2, 3, exam_id])
+                created.append(cursor.fetchone()[0])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                failed += 1
+            finally:
+                conn.close()
+        return created, failed
+
+    results, seconds = run_threads(threads, work)
+    ids = [value for created, _ in results for value in created]
+    failed = sum(failed for _, failed in results)
+    return len(ids), len(set(ids)), failed, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--ids-per-thread', type=int, default=500)
+    parser.add_argument('--exams-per-thread', type=int, default=25)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_database(students=10)
+    rtt = args.rtt_ms / 1000.0
+    ok = True
+
+    print(f" ID allocation, {args.ids_per_thread} IDs per thread, simulated RTT {args.rtt_ms} ms")
+    print(f" {'threads':>7} {'strategy':>18} {'ids/s':>10} {'blocks':>7} {'unique':>7}")
+    for threads in args.threads:
+        for label, block_size in (('hi/lo (block 50)', 50), ('1 round trip/ID', None)):
+            total, unique, seconds, blocks = allocation_stress(threads, args.ids_per_thread, block_size, rtt)
+            ok &= total == unique
+            print(f" {threads:>7} {label:>18} {total / seconds:>10.0f} {blocks:>7} {'yes' if total == unique else 'NO':>7}")
+
+    print(f"\n Exam creation, {args.exams_per_thread} exams per thread")
+    print(f" {'threads':>7} {'strategy':>18} {'exams/s':>10} {'failed':>7} {'unique':>7}")
+    for threads in args.threads:
+        for label, use_allocator in (('sequence + hi/lo', True), ('MAX(Exam_ID) + 1', False)):
+            total, unique, failed, seconds = create_exams(threads, args.exams_per_thread, use_allocator)
+            if use_allocator:
+                ok &= total == unique and failed == 0
+            print(f" {threads:>7} {label:>18} {total / seconds:>10.0f} {failed:>7} {'yes' if total == unique else 'NO':>7}")
+
+    print('\n All allocated IDs unique' if ok else '\n DUPLICATE OR FAILED ALLOCATIONS')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
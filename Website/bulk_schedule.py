@@ -0,0 +1,260 @@
+# bulk_schedule.py
+"""Schedule a whole intake's exams from one CSV/JSON file.
+
+Every entry names a course (or a track: one exam per course listed for it in
+Track_Courses), a date, a window and the T/F and MCQ counts:
+
+    course,date,start_time,end_time,no_tf,no_mcq
+    SQL Server Fundamentals,2025-11-02,09:00,10:30,10,15
+    track,date,window,no_tf,no_mcq
+    Power BI Development,2025-11-03,12:00-13:30,5,20
+
+All entries are checked up front with sp_Generate_Exam's rules, the valid
+ones get a block of Exam_IDs and questions from the pools (question_pools.py),
+and sp_Bulk_Generate_Exams inserts them in one transaction.  The report lists
+what was created and what was rejected, by input row.
+
+    python bulk_schedule.py intake.csv --dry-run
+    python bulk_schedule.py intake.json --all-or-nothing --seed 7
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+from database import get_db_connection, to_date, to_time
+from id_allocator import exam_ids
+from question_pools import question_pools, STALE_POOL_MESSAGE
+
+BULK_GENERATE_SQL = "EXEC sp_Bulk_Generate_Exams ?, ?"
+
+# Accepted spellings of each field (CSV header or JSON key)
+FIELD_ALIASES = {
+    'course': ('course', 'course_name'),
+    'track': ('track', 'track_name'),
+    'date': ('date', 'exam_date'),
+    'start_time': ('start_time', 'start'),
+    'end_time': ('end_time', 'end'),
+    'window': ('window',),
+    'no_tf': ('no_tf', 'tf'),
+    'no_mcq': ('no_mcq', 'mcq'),
+}
+
+
+def parse_schedule(text, fmt=None):
+    """CSV or JSON text -> list of entry dicts; ``fmt`` is 'csv', 'json' or None to detect"""
+    if fmt is None:
+        fmt = 'json' if text.lstrip()[:1] in ('[', '{') else 'csv'
+    if fmt == 'json':
+        return json_entries(json.loads(text))
+    return list(csv.DictReader(io.StringIO(text.lstrip('\ufeff'))))
+
+
+def json_entries(data):
+    """Entries of a decoded JSON schedule: a list of objects or {"exams": [...]}"""
+    entries = data.get('exams', []) if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise ValueError('JSON schedule must be a list of objects (or {"exams": [...]})')
+    return entries
+
+
+def _field(entry, name):
+    for key in FIELD_ALIASES[name]:
+        for variant in (key, key.upper(), key.title()):
+            value = entry.get(variant)
+            if value not in (None, ''):
+                return str(value).strip()
+    return None
+
+
+def normalize_entry(entry):
+    """(course, track, exam_date, start_time, end_time, no_tf, no_mcq); ValueError if malformed"""
+    course, track = _field(entry, 'course'), _field(entry, 'track')
+    if not course and not track:
+        raise ValueError('A course or a track is required.')
+
+    start, end = _field(entry, 'start_time'), _field(entry, 'end_time')
+    window = _field(entry, 'window')
+    if window and not (start or end):
+        start, _, end = window.partition('-')
+    if not start or not end or not _field(entry, 'date'):
+        raise ValueError('A date and a start/end time (or window "HH:MM-HH:MM") are required.')
+    try:
+        exam_date = to_date(_field(entry, 'date'))
+        start_time, end_time = to_time(start), to_time(end)
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD and times HH:MM[:SS].') from None
+    try:
+        no_tf, no_mcq = int(_field(entry, 'no_tf') or 0), int(_field(entry, 'no_mcq') or 0)
+    except ValueError:
+        raise ValueError('Question counts must be whole numbers.') from None
+    if no_tf < 0 or no_mcq < 0:
+        raise ValueError('Question counts cannot be negative.')
+    return course, track, exam_date, start_time, end_time, no_tf, no_mcq
+
+
+def rule_violation(exam_date, start_time, end_time, no_tf, no_mcq, now):
+    """The message sp_Generate_Exam would raise for this exam (steps 2-5), or None"""
+    if exam_date < now.date():
+        return 'Exam date cannot be in the past.'
+    if exam_date == now.date() and start_time < now.time():
+        return 'Exam start time cannot be in the past.'
+    minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+    if minutes > 120:
+        return 'Exam duration cannot exceed 2 hours.'
+    if no_tf + no_mcq > 25:
+        return 'Total number of questions cannot exceed 25.'
+    return None
+
+
+def load_catalog(cursor, with_tracks):
+    """({Course_Name: Course_ID}, {Track_Name: [Course_Name, ...]})"""
+    cursor.execute("SELECT Course_ID, Course_Name FROM Course")
+    courses = {name: course_id for course_id, name in cursor.fetchall()}
+    tracks = {}
+    if with_tracks:
+        cursor.execute("""
+            SELECT t.Track_Name, c.Course_Name
+            FROM Track_Courses tc
+            JOIN Track t ON tc.Track_ID = t.Track_ID
+            JOIN Course c ON tc.Course_ID = c.Course_ID
+            ORDER BY t.Track_Name, c.Course_ID
+        """)
+        for track_name, course_name in cursor.fetchall():
+            tracks.setdefault(track_name, []).append(course_name)
+    return courses, tracks
+
+
+def plan_exams(entries, courses, tracks, now):
+    """Expand and validate every entry; returns (planned, rejected).
+
+    ``planned`` holds (row, Course_Name, Course_ID, exam_date, start_time, end_time, no_tf, no_mcq).
+    """
+    planned, rejected = [], []
+    for row, entry in enumerate(entries, start=1):
+        try:
+            course, track, exam_date, start_time, end_time, no_tf, no_mcq = normalize_entry(entry)
+        except ValueError as e:
+            rejected.append({'row': row, 'course': _field(entry, 'course') or _field(entry, 'track'),
+                             'error': str(e)})
+            continue
+
+        if course:
+            names = [course]
+        elif track in tracks:
+            names = tracks[track]
+        else:
+            rejected.append({'row': row, 'course': track, 'error': 'Track is invalid or has no courses.'})
+            continue
+
+        for name in names:
+            error = ('Course name is invalid or does not exist.' if name not in courses
+                     else rule_violation(exam_date, start_time, end_time, no_tf, no_mcq, now))
+            if error:
+                rejected.append({'row': row, 'course': name, 'error': error})
+            else:
+                planned.append((row, name, courses[name], exam_date, start_time, end_time, no_tf, no_mcq))
+    return planned, rejected
+
+
+def schedule_exams(entries, dry_run=False, all_or_nothing=False, seed=None, pools=question_pools,
+                   allocator=exam_ids):
+    """Create every valid exam of ``entries`` in one transaction; returns the report dict"""
+    started = time.perf_counter()
+    rng = random.Random(seed) if seed is not None else None
+
+    # One Exam_ID per entry, reserved before the request's connection is taken:
+    # a new block is reserved on a connection of its own, and a request holding
+    # one while waiting for another stalls once the pool is exhausted.  IDs of
+    # rejected entries are skipped, like the rest of an unused block
+    first_id = allocator.next_ids(len(entries)) if entries and not dry_run else None
+
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        with_tracks = any(_field(entry, 'track') and not _field(entry, 'course') for entry in entries)
+        courses, tracks = load_catalog(cursor, with_tracks)
+        planned, rejected = plan_exams(entries, courses, tracks, datetime.now())
+
+        created = []
+        if planned and not dry_run and not (all_or_nothing and rejected):
+            seeds = [rng.randrange(2 ** 32) if rng else None for _ in planned]
+            for attempt in range(2):
+                exams, exam_questions = [], []
+                for offset, (_, name, course_id, exam_date, start_time, end_time, no_tf, no_mcq) in enumerate(planned):
+                    exam_id = first_id + offset
+                    exams.append((exam_id, course_id, exam_date, start_time, end_time, no_tf, no_mcq))
+                    exam_questions.extend((exam_id, question_id)
+                                          for question_id, in pools.pick(name, no_tf, no_mcq, seeds[offset]))
+                try:
+                    cursor.execute(BULK_GENERATE_SQL, [exams, exam_questions])
+                    summary = cursor.fetchall()
+                    break
+                except Exception as e:
+                    conn.rollback()
+                    if attempt or STALE_POOL_MESSAGE not in str(e):
+                        raise
+                    for name in {plan[1] for plan in planned}:
+                        pools.evict(name)
+            conn.commit()
+
+            rows = {first_id + offset: plan[0] for offset, plan in enumerate(planned)}
+            for exam_id, title, course_name, no_tf, no_mcq, total, exam_date, start_time, end_time in summary:
+                created.append({'row': rows[exam_id], 'exam_id': exam_id, 'title': title, 'course': course_name,
+                                'date': str(exam_date), 'start_time': str(start_time), 'end_time': str(end_time),
+                                'no_tf': no_tf, 'no_mcq': no_mcq, 'total_questions': total})
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {
+        'created': created,
+        'rejected': rejected,
+        'valid': len(planned),
+        'dry_run': dry_run,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule a whole intake's exams from a CSV/JSON file")
+    parser.add_argument('schedule', help='CSV or JSON file ("-" for stdin)')
+    parser.add_argument('--format', choices=('csv', 'json'), help='default: detect from the content')
+    parser.add_argument('--dry-run', action='store_true', help='validate only, create nothing')
+    parser.add_argument('--all-or-nothing', action='store_true', help='create nothing if any entry is rejected')
+    parser.add_argument('--seed', type=int, help='draw the same questions on every run')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.schedule == '-':
+        text = sys.stdin.read()
+    else:
+        with open(args.schedule, encoding='utf-8') as f:
+            text = f.read()
+    report = schedule_exams(parse_schedule(text, args.format), dry_run=args.dry_run,
+                            all_or_nothing=args.all_or_nothing, seed=args.seed)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for exam in report['created']:
+            print(f" row {exam['row']}: exam {exam['exam_id']} {exam['course']} on {exam['date']} "
+                  f"{exam['start_time']}-{exam['end_time']}, {exam['total_questions']} questions")
+        for rejection in report['rejected']:
+            print(f" row {rejection['row']} REJECTED ({rejection['course']}): {rejection['error']}")
+        action = 'valid (dry run)' if args.dry_run else 'created'
+        count = report['valid'] if args.dry_run else len(report['created'])
+        print(f" {count} exam(s) {action}, {len(report['rejected'])} rejected in {report['seconds']}s")
+    return 1 if report['rejected'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
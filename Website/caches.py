@@ -0,0 +1,450 @@
+# caches.py
+"""In-process caches: per-exam data shared by every student, and short-lived per-student pages"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from config import Config
+from database import get_db_connection, to_date, to_time
+
+log = logging.getLogger(__name__)
+
+# How long a closed exam's window is remembered so late requests do not reload it
+CLOSED_RETENTION = timedelta(days=1)
+
+
+def rows_to_dicts(cursor):
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def group_exam_questions(columns, rows):
+    """Regroup one-row-per-choice results into {Question_ID: {text, type, choices}}.
+
+    One pass over the raw rows: the column positions are resolved once and
+    each question's choice list is looked up once per row.
+    """
+    qid_at, head_at, type_at, choice_at, text_at = (
+        columns.index(name) for name in ('Question_ID', 'Question_Head', 'Question_Type', 'Choice_ID', 'Choice_Text'))
+    organized_questions = {}
+    for row in rows:
+        question = organized_questions.get(row[qid_at])
+        if question is None:
+            question = organized_questions[row[qid_at]] = {
+                'text': row[head_at],
+                'type': row[type_at],
+                'choices': []
+            }
+        question['choices'].append({
+            'choice_id': row[choice_at],
+            'text': row[text_at]
+        })
+    return organized_questions
+
+
+def exam_window_start(exam):
+    """datetime at which the exam window opens"""
+    return datetime.combine(to_date(exam['Exam_Date']), to_time(exam['Start_Time']))
+
+
+def exam_window_end(exam):
+    """datetime at which the exam window closes"""
+    return datetime.combine(to_date(exam['Exam_Date']), to_time(exam['End_Time']))
+
+
+def load_exam_paper(exam_id):
+    """Run sp_Get_Exam_Paper once and build the shared exam paper"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Get_Exam_Paper ?", [exam_id])
+        header = rows_to_dicts(cursor)
+        if not header or not cursor.nextset():
+            return None
+        questions = group_exam_questions([column[0] for column in cursor.description], cursor.fetchall())
+        return {
+            'exam': header[0],
+            'questions': questions,
+            'opens_at': exam_window_start(header[0]),
+            'closes_at': exam_window_end(header[0]),
+        }
+    except Exception as e:
+        log.error("Error loading exam paper %s: %s", exam_id, e)
+        return None
+    finally:
+        conn.close()
+
+
+def load_answer_key(exam_id):
+    """Run sp_Get_Exam_Answer_Key: Choice_ID -> Is_Correct for every choice on the exam"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Get_Exam_Answer_Key ?", [exam_id])
+        header = rows_to_dicts(cursor)
+        if not header or not cursor.nextset():
+            return None
+        choices = {}
+        correct = {}
+        for question_id, choice_id, is_correct in cursor.fetchall():
+            choices[choice_id] = bool(is_correct)
+            if is_correct:
+                correct[question_id] = choice_id
+        return {
+            'choices': choices,
+            'correct': correct,
+            'closes_at': exam_window_end(header[0]),
+        }
+    except Exception as e:
+        log.error("Error loading answer key %s: %s", exam_id, e)
+        return None
+    finally:
+        conn.close()
+
+
+def load_enrolled_students(exam_id):
+    """Student_IDs whose track includes the exam's course (Track_Courses)"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT e.Exam_Date, e.End_Time, s.Student_ID
+            FROM Exams e
+            LEFT JOIN Track_Courses tc ON tc.Course_ID = e.Course_ID
+            LEFT JOIN Intake_Track_Branch itb ON itb.Track_ID = tc.Track_ID
+            LEFT JOIN Student s ON s.Intake_Track_Branch_ID = itb.Intake_Track_Branch_ID
+            WHERE e.Exam_ID = ?
+        """, (exam_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+        return {
+            'students': frozenset(row[2] for row in rows if row[2] is not None),
+            'closes_at': exam_window_end({'Exam_Date': rows[0][0], 'End_Time': rows[0][1]}),
+        }
+    except Exception as e:
+        log.error("Error loading enrolled students for exam %s: %s", exam_id, e)
+        return None
+    finally:
+        conn.close()
+
+
+def load_student_dashboard(student_id):
+    """Run sp_Get_Student_Dashboard: the exams the student has completed"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Get_Student_Dashboard ?", [student_id])
+        return {
+            'completed_exams': rows_to_dicts(cursor),
+        }
+    except Exception as e:
+        log.error("Error loading dashboard for student %s: %s", student_id, e)
+        return None
+    finally:
+        conn.close()
+
+
+def load_exam_results(exam_id, student_id):
+    """Run sp_Get_Exam_Results: the exam with the student's attempt and the answers in one round trip"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Get_Exam_Results ?, ?", [exam_id, student_id])
+        header = rows_to_dicts(cursor)
+        if not header:
+            return None
+        results = rows_to_dicts(cursor) if cursor.nextset() else []
+        return {
+            'exam': header[0],
+            'results': results,
+        }
+    except Exception as e:
+        log.error("Error loading results of exam %s for student %s: %s", exam_id, student_id, e)
+        return None
+    finally:
+        conn.close()
+
+
+class PerExamCache:
+    """Exam_ID -> data that is identical for every student of the exam.
+
+    Filled once per exam (concurrent first requests wait for a single load)
+    and dropped ``linger_seconds`` after the exam window closes - the submit
+    grace period, so the rush of last-second submissions is still served
+    from memory.  After that only the closing time is kept, for a day: get()
+    answers None for the closed exam without loading it again, and late
+    requests read the window from closed_at().
+    """
+
+    def __init__(self, loader, sweep_interval=60, linger_seconds=0):
+        self._loader = loader
+        self._linger = timedelta(seconds=linger_seconds)
+        self._entries = {}
+        self._closed = {}  # Exam_ID -> closes_at of exams past their window
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, exam_id):
+        """Cached entry, loading it on a miss (None if the loader found nothing or the exam is closed)"""
+        self._maybe_sweep()
+        entry = self._entries.get(exam_id)
+        if entry is not None and self._live(entry, datetime.now()):
+            self.hits += 1
+            return entry
+        if exam_id in self._closed:
+            self.hits += 1
+            return None
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(exam_id, threading.Lock())
+        with load_lock:
+            # Another request may have loaded it while we waited
+            entry = self._entries.get(exam_id)
+            if entry is not None and self._live(entry, datetime.now()):
+                self.hits += 1
+                return entry
+            if exam_id in self._closed:
+                self.hits += 1
+                return None
+
+            self.misses += 1
+            entry = self._loader(exam_id)
+            with self._lock:
+                self._entries.pop(exam_id, None)
+                if entry is not None and not self._live(entry, datetime.now()):
+                    self._closed[exam_id] = entry['closes_at']
+                    entry = None
+                elif entry is not None:
+                    self._entries[exam_id] = entry
+                self._load_locks.pop(exam_id, None)
+            return entry
+
+    def closed_at(self, exam_id):
+        """When the window of an exam get() no longer serves closed (None if not known closed)"""
+        return self._closed.get(exam_id)
+
+    def _live(self, entry, now):
+        return entry['closes_at'] + self._linger > now
+
+    def evict(self, exam_id):
+        with self._lock:
+            self._entries.pop(exam_id, None)
+            self._closed.pop(exam_id, None)
+
+    def evict_expired(self):
+        now = datetime.now()
+        with self._lock:
+            expired = [exam_id for exam_id, entry in self._entries.items() if not self._live(entry, now)]
+            for exam_id in expired:
+                self._closed[exam_id] = self._entries.pop(exam_id)['closes_at']
+            for exam_id in [exam_id for exam_id, closes_at in self._closed.items()
+                            if closes_at + CLOSED_RETENTION < now]:
+                del self._closed[exam_id]
+        return expired
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._closed.clear()
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._sweep_interval
+            self.evict_expired()
+
+    def __contains__(self, exam_id):
+        return exam_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PerStudentCache:
+    """Student_ID -> page data, served for ``ttl`` seconds.
+
+    Absorbs students refreshing a page while they wait; the owner calls
+    invalidate() when something the student did changes the data.  Load
+    times are recorded so metrics() can report the DB time the hits saved.
+    """
+
+    def __init__(self, loader, ttl=5.0, max_entries=50000):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # Student_ID -> (expires_at, data)
+        self._invalidated = {}  # Student_ID -> monotonic time of the last invalidate()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.load_seconds = 0.0
+
+    def get(self, student_id):
+        now = time.monotonic()
+        entry = self._entries.get(student_id)
+        if entry is not None and entry[0] > now:
+            with self._lock:
+                self.hits += 1
+            return entry[1]
+
+        started = time.perf_counter()
+        data = self._loader(student_id)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.misses += 1
+            self.load_seconds += elapsed
+            # Don't store a load that started before the student's data changed
+            stale = self._invalidated.get(student_id, -1.0) >= now
+            if data is not None and self.ttl > 0 and not stale:
+                if len(self._entries) >= self.max_entries:
+                    self._evict_expired(now)
+                self._entries[student_id] = (now + self.ttl, data)
+        return data
+
+    def invalidate(self, student_id):
+        with self._lock:
+            if len(self._invalidated) >= self.max_entries:
+                self._invalidated.clear()
+            self._invalidated[student_id] = time.monotonic()
+            if self._entries.pop(student_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidated.clear()
+
+    def _evict_expired(self, now):
+        expired = [student_id for student_id, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for student_id in expired:
+            del self._entries[student_id]
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            avg_load = self.load_seconds / self.misses if self.misses else 0.0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / requests, 3) if requests else 0.0,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'avg_db_ms': round(avg_load * 1000, 3),
+                'db_seconds_spent': round(self.load_seconds, 3),
+                # Every hit would have cost one load
+                'db_seconds_saved': round(self.hits * avg_load, 3),
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GradedResultsCache:
+    """(Exam_ID, Student_ID) -> rendered results page of a graded attempt.
+
+    A graded attempt only changes when the exam is regraded, so there is no
+    short TTL: regrade.py evicts the whole exam.  ``ttl`` only bounds how
+    long a regrade run from another process goes unnoticed, and the oldest
+    entries make room once ``max_entries`` pages are held.
+    """
+
+    def __init__(self, ttl=3600.0, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (Exam_ID, Student_ID) -> (expires_at, page)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    def get(self, exam_id, student_id):
+        key = (exam_id, student_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, exam_id, student_id, page):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(exam_id, student_id)] = (time.monotonic() + self.ttl, page)
+            self._entries.move_to_end((exam_id, student_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stores += 1
+
+    def evict_exam(self, exam_id):
+        """Drop every student's page of the exam (after a regrade)"""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == exam_id]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / requests, 3) if requests else 0.0,
+                'stores': self.stores,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': sum(len(page) for _, page in self._entries.values()),
+                'ttl_seconds': self.ttl,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Grouped question/choice structure rendered by take_exam; submit_exam reads
+# its window until the submit grace period is over
+exam_papers = PerExamCache(load_exam_paper, linger_seconds=Config.SUBMIT_GRACE_SECONDS)
+
+# Answer key used by the in-process grading engine (grading.py)
+answer_keys = PerExamCache(load_answer_key, linger_seconds=Config.SUBMIT_GRACE_SECONDS)
+
+# Students expected to sit the exam, filled ahead of Start_Time by prewarm.py
+enrolled_students = PerExamCache(load_enrolled_students)
+
+# Student dashboard (available + completed exams), a few seconds per student
+student_dashboards = PerStudentCache(load_student_dashboard, ttl=Config.DASHBOARD_CACHE_TTL)
+
+# Results pages of graded attempts, until the exam is regraded
+graded_results = GradedResultsCache(ttl=Config.RESULTS_CACHE_TTL, max_entries=Config.RESULTS_CACHE_MAX_ENTRIES)
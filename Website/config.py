@@ -4,11 +4,79 @@ import os
 class Config:
     # Secret key for session management - change this to a random string!
     SECRET_KEY = 'iti-exam-system-secret-key-2024'
-    
+
     # Database configuration
     DATABASE_CONFIG = {
         'server': 'DESKTOP-BH2IKQU\\SQLEXPRESS',
-        'database': 'ITI_System', 
+        'database': 'ITI_System',
         'driver': 'ODBC Driver 17 for SQL Server',
-        'trusted_connection': 'yes'
-    }
\ No newline at end of file
+        'trusted_connection': 'yes',
+
+        # 'sqlserver' (pyodbc) or 'sqlite' (local stand-in, see sqlite_backend.py)
+        'backend': os.environ.get('ITI_DB_BACKEND', 'sqlserver'),
+        'sqlite_path': os.environ.get('ITI_SQLITE_PATH', 'iti_system.db'),
+
+        # Submit answers through sp_Submit_Exam with a table-valued parameter;
+        # False falls back to executemany with fast_executemany
+        'submit_with_tvp': os.environ.get('ITI_SUBMIT_WITH_TVP', '1') == '1',
+
+        # Connection pool settings
+        'pool_min_size': int(os.environ.get('ITI_POOL_MIN_SIZE', 2)),
+        'pool_max_size': int(os.environ.get('ITI_POOL_MAX_SIZE', 20)),
+        'pool_max_idle_seconds': int(os.environ.get('ITI_POOL_MAX_IDLE_SECONDS', 300)),
+        'pool_timeout_seconds': int(os.environ.get('ITI_POOL_TIMEOUT_SECONDS', 10))
+    }
+
+    # Background grading (see grading_queue.py)
+    GRADING_QUEUE_PATH = os.environ.get('ITI_GRADING_QUEUE_PATH', 'grading_queue.db')
+    GRADING_WORKERS = int(os.environ.get('ITI_GRADING_WORKERS', 4))
+
+    # Seconds a student's dashboard is served from memory (see caches.py)
+    DASHBOARD_CACHE_TTL = float(os.environ.get('ITI_DASHBOARD_CACHE_TTL', 5))
+
+    # Seconds before the in-memory index of today's exams reloads (see exam_schedule.py)
+    SCHEDULE_REFRESH_SECONDS = float(os.environ.get('ITI_SCHEDULE_REFRESH_SECONDS', 60))
+
+    # IDs reserved per sp_Reserve_ID_Block call (see id_allocator.py)
+    ID_BLOCK_SIZE = int(os.environ.get('ITI_ID_BLOCK_SIZE', 20))
+
+    # Seconds before a course's question pool reloads (see question_pools.py)
+    QUESTION_POOL_TTL = float(os.environ.get('ITI_QUESTION_POOL_TTL', 300))
+
+    # Give every student their own question and choice order (see exam_variants.py)
+    SHUFFLE_EXAMS = os.environ.get('ITI_SHUFFLE_EXAMS', '1') == '1'
+
+    # Assemble exam pages from fragments rendered once per exam (see exam_pages.py)
+    EXAM_PAGE_FRAGMENTS = os.environ.get('ITI_EXAM_PAGE_FRAGMENTS', '1') == '1'
+
+    # Warm caches and pool connections for exams starting soon (see prewarm.py)
+    PREWARM_LEAD_MINUTES = float(os.environ.get('ITI_PREWARM_LEAD_MINUTES', 5))
+    PREWARM_INTERVAL_SECONDS = float(os.environ.get('ITI_PREWARM_INTERVAL_SECONDS', 30))
+    PREWARM_POOL_CONNECTIONS = int(os.environ.get('ITI_PREWARM_POOL_CONNECTIONS', 8))
+
+    # Seconds between flushes of buffered autosaves, and answer rows per flush call (see autosave.py)
+    AUTOSAVE_FLUSH_SECONDS = float(os.environ.get('ITI_AUTOSAVE_FLUSH_SECONDS', 5))
+    AUTOSAVE_BATCH_ROWS = int(os.environ.get('ITI_AUTOSAVE_BATCH_ROWS', 5000))
+
+    # Seconds after End_Time a submission is still accepted; open attempts are auto-submitted then (see deadlines.py)
+    SUBMIT_GRACE_SECONDS = float(os.environ.get('ITI_SUBMIT_GRACE_SECONDS', 30))
+
+    # Graded results pages stay cached until a regrade; the TTL covers regrades run from another process (see caches.py)
+    RESULTS_CACHE_TTL = float(os.environ.get('ITI_RESULTS_CACHE_TTL', 3600))
+    RESULTS_CACHE_MAX_ENTRIES = int(os.environ.get('ITI_RESULTS_CACHE_MAX_ENTRIES', 100000))
+
+    # Log level (DEBUG, INFO, WARNING, ERROR or OFF) and the share of records below WARNING kept (see instrumentation.py)
+    LOG_LEVEL = os.environ.get('ITI_LOG_LEVEL', 'INFO')
+    LOG_SAMPLE_RATE = float(os.environ.get('ITI_LOG_SAMPLE_RATE', 1.0))
+
+    # Statements slower than this many ms go to a rotating JSON-lines log (negative disables it); CAPTURE=1 adds
+    # SET STATISTICS TIME/IO output on SQL Server, EXPLAIN QUERY PLAN on SQLite (see slow_queries.py)
+    SLOW_LOG_THRESHOLD_MS = float(os.environ.get('ITI_SLOW_LOG_THRESHOLD_MS', 250))
+    SLOW_LOG_PATH = os.environ.get('ITI_SLOW_LOG_PATH', 'slow_statements.log')
+    SLOW_LOG_CAPTURE = os.environ.get('ITI_SLOW_LOG_CAPTURE', '0') == '1'
+    SLOW_LOG_MAX_BYTES = int(os.environ.get('ITI_SLOW_LOG_MAX_BYTES', 10 * 1024 * 1024))
+    SLOW_LOG_BACKUPS = int(os.environ.get('ITI_SLOW_LOG_BACKUPS', 5))
+
+    # /metrics and /metrics/* need an instructor session or this token (Authorization: Bearer <token>);
+    # empty means instructors only
+    METRICS_TOKEN = os.environ.get('ITI_METRICS_TOKEN', '')
\ No newline at end of file
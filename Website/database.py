@@ -1,19 +1,602 @@
 # database.py
-import pyodbc
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from datetime import time as time_of_day
+
+from config import Config
+from slow_queries import bound_params, slow_statements
+
+log = logging.getLogger(__name__)
+
+
+def build_connection_string(db_config=None):
+    """Build the ODBC connection string from Config.DATABASE_CONFIG"""
+    db_config = db_config or Config.DATABASE_CONFIG
+    return (
+        f"Driver={{{db_config['driver']}}};"
+        f"Server={db_config['server']};"
+        f"Database={db_config['database']};"
+        f"Trusted_Connection={db_config['trusted_connection']};"
+    )
+
+
+def to_date(value):
+    """DATE column value (date from pyodbc, 'YYYY-MM-DD' text from SQLite) -> date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip()[:10], '%Y-%m-%d').date()
+
+
+def to_time(value):
+    """TIME(7) column value (time from pyodbc, 'HH:MM[:SS]' text from SQLite) -> time"""
+    if isinstance(value, datetime):
+        return value.time().replace(microsecond=0)
+    if isinstance(value, time_of_day):
+        return value.replace(microsecond=0)
+    text = str(value).strip().split('.')[0]
+    fmt = '%H:%M:%S' if text.count(':') == 2 else '%H:%M'
+    return datetime.strptime(text, fmt).time()
+
+
+class SQLServerBackend:
+    """The production backend: SQL Server through pyodbc"""
+
+    name = 'sqlserver'
+    health_check_sql = 'SELECT 1'
+
+    def connect(self):
+        import pyodbc
+        conn = pyodbc.connect(build_connection_string())
+        if slow_statements.capture:
+            # The statistics come back as messages of each statement (see _CountingCursor)
+            conn.execute('SET STATISTICS TIME ON; SET STATISTICS IO ON')
+        return conn
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the backend selected by Config.DATABASE_CONFIG['backend']"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                db_config = Config.DATABASE_CONFIG
+                name = db_config.get('backend', 'sqlserver')
+                if name == 'sqlserver':
+                    _backend = SQLServerBackend()
+                elif name == 'sqlite':
+                    from sqlite_backend import SQLiteBackend
+                    _backend = SQLiteBackend(db_config.get('sqlite_path', 'iti_system.db'),
+                                             trace_statements=slow_statements.capture)
+                else:
+                    raise ValueError(f"Unknown database backend: {name}")
+    return _backend
+
+
+def open_raw_connection():
+    """Open a brand new (unpooled) connection - a full login on SQL Server"""
+    return get_backend().connect()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the pool timeout"""
+
+
+class PooledConnection:
+    """Thin wrapper around a raw connection.
+
+    Behaves like the raw connection, except that close() hands it back to
+    the pool instead of logging out, so existing ``conn.close()`` calls keep
+    working unchanged.
+    """
+
+    # RequestScope whose statements this connection counts, if any
+    scope = None
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._cursors = []  # wrapped cursors whose last statement is still open
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise RuntimeError('Connection already returned to the pool')
+        return getattr(self._raw, name)
+
+    def cursor(self):
+        if self._raw is None:
+            raise RuntimeError('Connection already returned to the pool')
+        cursor = self._raw.cursor()
+        if self.scope is None and not slow_statements.enabled:
+            return cursor
+        cursor = _CountingCursor(self.scope, cursor)
+        self._cursors = [open_cursor for open_cursor in self._cursors if open_cursor._statement is not None]
+        self._cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        if self._raw is not None:
+            for cursor in self._cursors:
+                cursor.finish()
+            self._cursors = []
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _CountingCursor:
+    """Cursor that records the statements it sends, the time they take and the
+    rows fetched into a RequestScope (if any), and hands the slow ones to the
+    slow-statement log (slow_queries.py).
+
+    A statement's time covers its execute and every fetch and nextset up to
+    the next execute, the cursor's close or the connection's close.
+    """
+
+    def __init__(self, scope, cursor):
+        self._scope = scope
+        self._cursor = cursor
+        self._statement = None  # [sql, params, seconds, rows, messages] while the log is on
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            if self._scope is not None:
+                self._scope.db_seconds += elapsed
+            if self._statement is not None:
+                self._statement[2] += elapsed
+
+    def _fetched(self, count):
+        if self._scope is not None:
+            self._scope.rows += count
+        if self._statement is not None:
+            self._statement[3] += count
+
+    def _collect_messages(self):
+        # SET STATISTICS TIME/IO output of the current result set (pyodbc only)
+        if self._statement is not None and slow_statements.capture:
+            self._statement[4].extend(getattr(self._cursor, 'messages', None) or ())
+
+    def _begin(self, sql, params):
+        self.finish()
+        if self._scope is not None:
+            self._scope.statements += 1
+        if slow_statements.enabled:
+            self._statement = [sql, params, 0.0, 0, []]
+
+    def finish(self):
+        """Close the books on the last statement, logging it if it was slow"""
+        statement, self._statement = self._statement, None
+        if statement is None or not slow_statements.is_slow(statement[2]):
+            return
+        sql, params, seconds, rows, messages = statement
+        if not rows:
+            try:
+                rows = max(self._cursor.rowcount, 0)
+            except Exception:
+                rows = 0
+        route = self._scope.endpoint if self._scope is not None else threading.current_thread().name
+        slow_statements.record(sql, params, seconds, rows, route, cursor=self._cursor, messages=messages)
+
+    def execute(self, sql, *params):
+        self._begin(sql, bound_params(params))
+        self._timed(self._cursor.execute, sql, *params)
+        self._collect_messages()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._begin(sql, [seq_of_params] if isinstance(seq_of_params, (list, tuple)) else [])
+        self._timed(self._cursor.executemany, sql, seq_of_params)
+        return self
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._fetched(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._timed(self._cursor.fetchmany, *args)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._fetched(len(rows))
+        return rows
+
+    def nextset(self):
+        more = self._timed(self._cursor.nextset)
+        if more:
+            self._collect_messages()
+        return more
+
+    def close(self):
+        self.finish()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class RequestConnection:
+    """The one connection of a request, handed to every get_db_connection() call.
+
+    close() is a no-op so the existing ``conn.close()`` calls of each step
+    leave it open for the next one; release() at the end of the request gives
+    it back to the pool, rolling back anything not committed.
+    """
+
+    def __init__(self, scope, conn):
+        self._scope = scope
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        self._scope.commits += 1
+        started = time.perf_counter()
+        try:
+            self._conn.commit()
+        finally:
+            self._scope.db_seconds += time.perf_counter() - started
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        pass
+
+    def release(self):
+        self._conn.close()
+
+
+class RequestScope:
+    """Connection and counters of the request handled by the current thread"""
+
+    __slots__ = ('endpoint', 'connection', 'connections', 'independent_connections',
+                 'statements', 'commits', 'rows', 'db_seconds', 'started')
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+        self.connection = None
+        self.connections = 0              # pool checkouts for the request's own connection
+        self.independent_connections = 0  # get_independent_connection() checkouts
+        self.statements = 0
+        self.commits = 0
+        self.rows = 0          # rows fetched
+        self.db_seconds = 0.0  # time spent in execute, fetch and commit calls
+        self.started = time.perf_counter()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of database connections.
+
+    - at most ``max_size`` connections are open at any time; callers wait up
+      to ``timeout`` seconds for one to be returned before giving up
+    - every checkout runs a cheap health check, dead connections are replaced
+    - idle connections older than ``max_idle_seconds`` are closed, down to
+      ``min_size`` warm connections
+    """
+
+    def __init__(self, connect, min_size=2, max_size=20, max_idle_seconds=300,
+                 timeout=10, health_check_sql='SELECT 1'):
+        if max_size < 1:
+            raise ValueError('pool_max_size must be at least 1')
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self.health_check_sql = health_check_sql
+
+        self._idle = deque()  # (raw_connection, returned_at), most recent on the right
+        self._size = 0        # open connections, idle + checked out
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0, 'waits': 0, 'timeouts': 0}
+
+    # ---- internal helpers ---------------------------------------------------
+    def _open(self):
+        raw = self._connect()
+        with self._cond:
+            self.stats['created'] += 1
+        return raw
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self.stats['discarded'] += 1
+            self._cond.notify()
+
+    def _is_healthy(self, raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute(self.health_check_sql)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _take_expired(self):
+        """Pop idle connections past their max idle age (caller holds the lock)"""
+        expired = []
+        cutoff = time.monotonic() - self.max_idle_seconds
+        while self._idle and self._idle[0][1] < cutoff and self._size > self.min_size:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+            self.stats['discarded'] += 1
+        return expired
+
+    @staticmethod
+    def _close_quietly(connections):
+        for raw in connections:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    # ---- public API ---------------------------------------------------------
+    def warm_up(self, count=None):
+        """Open connections ahead of time (defaults to min_size)"""
+        target = self.min_size if count is None else min(count, self.max_size)
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= target:
+                    break
+                self._size += 1
+            try:
+                raw = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+            opened += 1
+        return opened
+
+    def acquire(self):
+        """Borrow a healthy connection, opening a new one if the pool has room"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            raw = None
+            open_new = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError('Connection pool is closed')
+                expired = self._take_expired()
+                if self._idle:
+                    raw = self._idle.pop()[0]
+                elif self._size < self.max_size:
+                    self._size += 1
+                    open_new = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection available within {self.timeout}s')
+                    self.stats['waits'] += 1
+                    self._cond.wait(remaining)
+            self._close_quietly(expired)
+
+            if raw is not None:
+                if self._is_healthy(raw):
+                    with self._cond:
+                        self.stats['reused'] += 1
+                    return PooledConnection(self, raw)
+                self._discard(raw)
+            elif open_new:
+                try:
+                    raw = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a connection; any open transaction is rolled back first"""
+        if self._closed:
+            self._discard(raw)
+            return
+        try:
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection; checked-out ones close when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close_quietly(raw for raw, _ in idle)
+
+    def status(self):
+        with self._cond:
+            return dict(self.stats, size=self._size, idle=len(self._idle),
+                        in_use=self._size - len(self._idle), max_size=self.max_size)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                db_config = Config.DATABASE_CONFIG
+                pool = ConnectionPool(
+                    open_raw_connection,
+                    health_check_sql=get_backend().health_check_sql,
+                    min_size=db_config.get('pool_min_size', 2),
+                    max_size=db_config.get('pool_max_size', 20),
+                    max_idle_seconds=db_config.get('pool_max_idle_seconds', 300),
+                    timeout=db_config.get('pool_timeout_seconds', 10),
+                )
+                try:
+                    pool.warm_up()
+                except Exception as e:
+                    log.warning("Could not pre-open pool connections: %s", e)
+                _pool = pool
+    return _pool
+
+
+_request = threading.local()
+
+
+def begin_request_scope(endpoint=None):
+    """Start sharing one connection between every step of the current request"""
+    _request.scope = RequestScope(endpoint)
+    return _request.scope
+
+
+def current_request_scope():
+    return getattr(_request, 'scope', None)
+
+
+def end_request_scope(error=None):
+    """Give the request's connection back (rolled back on error); returns the finished scope"""
+    scope = getattr(_request, 'scope', None)
+    _request.scope = None
+    if scope is not None and scope.connection is not None:
+        if error is not None:
+            try:
+                scope.connection.rollback()
+            except Exception:
+                pass
+        scope.connection.release()
+        scope.connection = None
+    return scope
+
+
+def _acquire(scope):
+    conn = get_pool().acquire()
+    conn.scope = scope
+    return conn
+
 
 def get_db_connection():
+    """Borrow a connection from the pool - call close() to give it back.
+
+    Inside a request scope every call returns the request's one connection
+    (a RequestConnection), so a handler runs in a single transaction however
+    many helpers it goes through.
+    """
+    scope = getattr(_request, 'scope', None)
+    if scope is not None and scope.connection is not None:
+        return scope.connection
     try:
-        connection_string = (
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=DESKTOP-BH2IKQU\\SQLEXPRESS;"
-            "Database=ITI_System;"
-            "Trusted_Connection=yes;"
-        )
-        connection = pyodbc.connect(connection_string)
-        return connection
+        conn = _acquire(scope)
     except Exception as e:
-        print(f"Database connection failed: {e}")
+        log.error("Database connection failed: %s", e)
         return None
+    if scope is None:
+        return conn
+    scope.connections += 1
+    scope.connection = RequestConnection(scope, conn)
+    return scope.connection
+
+
+def get_independent_connection():
+    """A pool connection outside the request's transaction, for writes that must
+    commit on their own whatever the request does (ID block reservations)"""
+    scope = getattr(_request, 'scope', None)
+    try:
+        conn = _acquire(scope)
+    except Exception as e:
+        log.error("Database connection failed: %s", e)
+        return None
+    if scope is not None:
+        scope.independent_connections += 1
+    return conn
+
+
+class RequestDBStats:
+    """Connections, statements and commits per request, aggregated per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, scope):
+        with self._lock:
+            stats = self._endpoints.get(scope.endpoint)
+            if stats is None:
+                stats = self._endpoints[scope.endpoint] = {
+                    'requests': 0, 'connections': 0, 'independent_connections': 0,
+                    'statements': 0, 'commits': 0,
+                    'max_connections': 0, 'max_statements': 0, 'max_commits': 0,
+                }
+            stats['requests'] += 1
+            stats['connections'] += scope.connections
+            stats['independent_connections'] += scope.independent_connections
+            stats['statements'] += scope.statements
+            stats['commits'] += scope.commits
+            stats['max_connections'] = max(stats['max_connections'], scope.connections)
+            stats['max_statements'] = max(stats['max_statements'], scope.statements)
+            stats['max_commits'] = max(stats['max_commits'], scope.commits)
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {endpoint: dict(stats, avg_statements=round(stats['statements'] / stats['requests'], 2))
+                    for endpoint, stats in self._endpoints.items()}
+
+
+request_db_stats = RequestDBStats()
+
 
 def test_connection():
     conn = get_db_connection()
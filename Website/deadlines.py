@@ -0,0 +1,282 @@
+# deadlines.py
+"""Server-side exam deadlines: late submissions are refused and open attempts
+are auto-submitted when the window closes.
+
+take_exam and the autosave endpoint register each open attempt here.  The
+attempts are grouped per exam and the exams sit in a heap ordered by their
+End_Time, so one thread sleeping until the earliest deadline covers any
+number of attempts.  SUBMIT_GRACE_SECONDS after End_Time (the slack given to
+a POST that left the browser in time) the thread sweeps the exam:
+
+  1. flushes the autosave buffer, so the last saved answers are in the database
+  2. sp_Auto_Submit_Exam turns every 'In Progress' attempt of the exam into
+     'Auto-Submitted' - attempts opened through another process included
+  3. grades the exam in one batch with regrade.py's vectorized pass and a
+     single sp_Apply_Exam_Regrade call, in the same transaction
+
+submit_exam and the autosave endpoint refuse requests after the deadline.
+A submission admitted before it is registered as in flight, and the sweep
+waits for those to commit first, so a last-second POST is never overtaken
+by the auto-submit.  Only the attempts the sweep closed are graded by it;
+'Submitted' ones are left to their grading_queue job.
+"""
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from autosave import autosaves
+from caches import student_dashboards
+from config import Config
+from database import get_db_connection, to_date, to_time
+from exam_schedule import todays_exams
+from regrade import apply_regrade, compute_regrade, load_exam_answers
+
+log = logging.getLogger(__name__)
+
+AUTO_SUBMIT_SQL = "EXEC sp_Auto_Submit_Exam ?"
+
+OPEN_ATTEMPTS_SQL = """
+    SELECT DISTINCT e.Exam_ID, e.Exam_Date, e.End_Time
+    FROM Student_Exam se
+    JOIN Exams e ON e.Exam_ID = se.Exam_ID
+    WHERE se.Exam_Status = 'In Progress'
+"""
+
+# Seconds before a failed sweep of an exam is retried
+RETRY_SECONDS = 30
+
+# Seconds a sweep waits for admitted submissions to finish before retrying later
+IN_FLIGHT_WAIT_SECONDS = 30
+
+
+class DeadlineSweeper:
+    """Heap of (deadline, Exam_ID) with the open attempts of each exam"""
+
+    def __init__(self, grace_seconds=30, max_wait=60):
+        self.grace = timedelta(seconds=grace_seconds)
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        self._heap = []       # (deadline, Exam_ID), one entry per exam
+        self._attempts = {}   # Exam_ID -> {Student_ID, ...} still open
+        self._in_flight = {}  # Exam_ID -> submissions admitted and not finished yet
+        self._stopping = False
+        self._thread = None
+        self.sweeps = 0
+        self.failed_sweeps = 0
+        self.auto_submitted = 0
+        self.graded = 0
+        self.late_rejected = 0
+        self.last_sweep_ms = 0.0
+
+    def deadline(self, closes_at):
+        """Last moment a submission for a window closing at ``closes_at`` is accepted"""
+        return closes_at + self.grace
+
+    def accepting(self, closes_at, now=None):
+        """False once the deadline has passed; counts the refusal"""
+        if (now or datetime.now()) <= self.deadline(closes_at):
+            return True
+        with self._lock:
+            self.late_rejected += 1
+        return False
+
+    def begin_submission(self, exam_id, closes_at, now=None):
+        """Admit a submission before the deadline; pair with end_submission().
+
+        The check and the registration happen under the sweep's lock, so an
+        admitted submission is always waited for by the sweep of its exam.
+        """
+        with self._lock:
+            if (now or datetime.now()) > self.deadline(closes_at):
+                self.late_rejected += 1
+                return False
+            self._in_flight[exam_id] = self._in_flight.get(exam_id, 0) + 1
+            return True
+
+    def end_submission(self, exam_id):
+        with self._lock:
+            remaining = self._in_flight.get(exam_id, 0) - 1
+            if remaining > 0:
+                self._in_flight[exam_id] = remaining
+            else:
+                self._in_flight.pop(exam_id, None)
+                self._drained.notify_all()
+
+    def _wait_for_submissions(self, exam_id, timeout):
+        """Block until no admitted submission of the exam is running; False on timeout"""
+        give_up = time.monotonic() + timeout
+        with self._lock:
+            while self._in_flight.get(exam_id):
+                remaining = give_up - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._drained.wait(remaining)
+        return True
+
+    def track(self, exam_id, student_id, closes_at):
+        """Register an open attempt (take_exam, autosave)"""
+        with self._lock:
+            attempts = self._attempts.get(exam_id)
+            if attempts is None:
+                attempts = self._attempts[exam_id] = set()
+                self._push(self.deadline(closes_at), exam_id)
+            attempts.add(student_id)
+        self.start()
+
+    def finish(self, exam_id, student_id):
+        """The student submitted; nothing left to sweep for this attempt"""
+        with self._lock:
+            attempts = self._attempts.get(exam_id)
+            if attempts is not None:
+                attempts.discard(student_id)
+
+    def _push(self, deadline, exam_id):
+        heapq.heappush(self._heap, (deadline, exam_id))
+        if self._heap[0][1] == exam_id:
+            self._wakeup.notify()
+
+    def recover(self):
+        """Schedule exams with attempts left 'In Progress' (e.g. by a previous process)"""
+        conn = get_db_connection()
+        if not conn:
+            return 0
+        try:
+            cursor = conn.cursor()
+            cursor.execute(OPEN_ATTEMPTS_SQL)
+            exams = [(exam_id, datetime.combine(to_date(day), to_time(end_time)))
+                     for exam_id, day, end_time in cursor.fetchall()]
+        except Exception as e:
+            log.error("Could not scan for open attempts: %s", e)
+            return 0
+        finally:
+            conn.close()
+        with self._lock:
+            for exam_id, closes_at in exams:
+                if exam_id not in self._attempts:
+                    self._attempts[exam_id] = set()
+                    self._push(self.deadline(closes_at), exam_id)
+        return len(exams)
+
+    def due(self, now=None):
+        """Pop the exams whose deadline has passed"""
+        now = now or datetime.now()
+        exams = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                _, exam_id = heapq.heappop(self._heap)
+                exams.append(exam_id)
+        return exams
+
+    def sweep(self, exam_id):
+        """Auto-submit and grade every open attempt of a closed exam; returns the Student_IDs"""
+        started = time.perf_counter()
+        # Submissions admitted before the deadline commit first; their
+        # answers must not be replaced by the autosaved ones
+        if not self._wait_for_submissions(exam_id, IN_FLIGHT_WAIT_SECONDS):
+            raise RuntimeError('Submissions admitted before the deadline are still running')
+        autosaves.flush()
+        conn = get_db_connection()
+        if not conn:
+            raise RuntimeError('No database connection')
+        try:
+            cursor = conn.cursor()
+            cursor.execute(AUTO_SUBMIT_SQL, (exam_id,))
+            submitted = [row[0] for row in cursor.fetchall()]
+
+            # One grading batch for the attempts just closed; 'Submitted' ones
+            # are graded by their own grading_queue job
+            changed_answers = changed_scores = []
+            if submitted:
+                answers, choices, submissions = load_exam_answers(cursor, exam_id, statuses=('Auto-Submitted',))
+                changed_answers, changed_scores = compute_regrade(answers, choices, submissions)
+                closed = set(submitted)
+                changed_answers = [row for row in changed_answers if row[0] in closed]
+                changed_scores = [row for row in changed_scores if row[0] in closed]
+                if changed_answers or changed_scores:
+                    apply_regrade(cursor, exam_id, changed_answers, changed_scores)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        for student_id in submitted:
+            student_dashboards.invalidate(student_id)
+            todays_exams.mark_taken(exam_id, student_id)
+        with self._lock:
+            self._attempts.pop(exam_id, None)
+            self.sweeps += 1
+            self.auto_submitted += len(submitted)
+            self.graded += len(changed_scores)
+            self.last_sweep_ms = (time.perf_counter() - started) * 1000
+        return submitted
+
+    # ---- background thread ----------------------------------------------------
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    if self._heap and self._heap[0][0] < datetime.now():
+                        break
+                    wait = self.max_wait
+                    if self._heap:
+                        wait = min(wait, (self._heap[0][0] - datetime.now()).total_seconds())
+                    self._wakeup.wait(max(wait, 0.01))
+                if self._stopping:
+                    return
+
+            for exam_id in self.due():
+                try:
+                    self.sweep(exam_id)
+                except Exception as e:
+                    log.error("Auto-submit of exam %s failed: %s", exam_id, e)
+                    with self._lock:
+                        self.failed_sweeps += 1
+                        self._push(datetime.now() + timedelta(seconds=RETRY_SECONDS), exam_id)
+
+    def start(self):
+        """Start the sweeper thread once per process"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='exam-deadlines', daemon=True)
+        self.recover()
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self):
+        with self._lock:
+            next_deadline = self._heap[0][0] if self._heap else None
+            return {
+                'grace_seconds': self.grace.total_seconds(),
+                'exams_scheduled': len(self._heap),
+                'open_attempts': sum(len(attempts) for attempts in self._attempts.values()),
+                'next_deadline': next_deadline.isoformat(timespec='seconds') if next_deadline else None,
+                'sweeps': self.sweeps,
+                'failed_sweeps': self.failed_sweeps,
+                'auto_submitted': self.auto_submitted,
+                'graded': self.graded,
+                'late_rejected': self.late_rejected,
+                'submissions_in_flight': sum(self._in_flight.values()),
+                'last_sweep_ms': round(self.last_sweep_ms, 2),
+                'running': self._thread is not None,
+            }
+
+
+deadline_sweeper = DeadlineSweeper(grace_seconds=Config.SUBMIT_GRACE_SECONDS)
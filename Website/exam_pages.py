@@ -0,0 +1,73 @@
+# exam_pages.py
+"""Exam pages assembled from fragments rendered once per exam.
+
+student/exam.html comes out the same for every student of an exam except
+for the order of the question cards and of the choices inside them
+(exam_variants.py).  So the page is rendered once into pieces: the shell
+around the cards, and for each question its head (split at the question
+number), one string per choice and its tail.  A student's page is a join of
+those strings in their order; Jinja no longer runs per request.
+
+The fragments are stored on the cached paper (caches.exam_papers), so they
+are dropped and rebuilt together with it.
+"""
+import threading
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+from exam_variants import page_order
+
+CARDS_MARK = '<!--exam-cards-->'
+NUMBER_MARK = '<!--question-number-->'
+
+
+class ExamPageRenderer:
+    """Builds each exam's fragments once and assembles per-student pages from them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.pages = 0
+
+    def _build(self, paper, exam_id):
+        cards = current_app.jinja_env.get_template('student/_question_card.html').module
+        shell = render_template('student/exam.html', exam=paper['exam'], questions=paper['questions'],
+                                exam_id=exam_id, cards=Markup(CARDS_MARK))
+        before, after = shell.split(CARDS_MARK)
+
+        questions = {}
+        for question_id, question in paper['questions'].items():
+            head_before, head_after = str(cards.card_head(Markup(NUMBER_MARK), question)).split(NUMBER_MARK)
+            choices = [str(cards.choice_label(question_id, choice)) for choice in question['choices']]
+            questions[question_id] = (head_before, head_after, choices, str(cards.card_tail(question_id, question)))
+        return {'before': before, 'after': after, 'questions': questions}
+
+    def fragments(self, paper, exam_id):
+        fragments = paper.get('fragments')
+        if fragments is None:
+            with self._lock:
+                fragments = paper.get('fragments')
+                if fragments is None:
+                    fragments = paper['fragments'] = self._build(paper, exam_id)
+                    self.builds += 1
+        return fragments
+
+    def render(self, paper, exam_id, student_id):
+        """The student's exam page, identical to rendering student/exam.html with their variant"""
+        fragments = self.fragments(paper, exam_id)
+        questions = fragments['questions']
+        parts = [fragments['before']]
+        for number, (question_id, positions) in enumerate(page_order(paper['questions'], exam_id, student_id), 1):
+            head_before, head_after, choices, tail = questions[question_id]
+            parts.append(head_before)
+            parts.append(str(number))
+            parts.append(head_after)
+            parts.extend([choices[position] for position in positions])
+            parts.append(tail)
+        parts.append(fragments['after'])
+        self.pages += 1
+        return ''.join(parts)
+
+
+exam_pages = ExamPageRenderer()
@@ -0,0 +1,204 @@
+# exam_schedule.py
+"""In-memory index of today's exams for "which exams are open right now".
+
+Today's exams are loaded once and cut into time segments: every Start_Time
+and End_Time is a boundary, and each segment holds the exams open for all of
+it.  A lookup is one bisect over the boundaries, O(log n).  The NOT EXISTS
+Student_Exam check becomes a per-student set of today's Exam_IDs taken.
+
+The index reloads when an exam is generated (refresh()), at midnight, and
+every SCHEDULE_REFRESH_SECONDS so exams created by another process show up too.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+from config import Config
+from database import get_db_connection, to_time
+
+log = logging.getLogger(__name__)
+
+# How long a request waits for another one's load of a new day's index
+REFRESH_WAIT_SECONDS = 10
+
+TODAYS_EXAMS_SQL = """
+    SELECT e.Exam_ID, e.Title, e.Exam_Date, e.Start_Time, e.End_Time, c.Course_Name, e.Total_Marks
+    FROM Exams e
+    JOIN Course c ON e.Course_ID = c.Course_ID
+    WHERE e.Exam_Date = ?
+    ORDER BY e.Start_Time
+"""
+
+TAKEN_TODAY_SQL = """
+    SELECT se.Student_ID, se.Exam_ID
+    FROM Student_Exam se
+    JOIN Exams e ON se.Exam_ID = e.Exam_ID
+    WHERE e.Exam_Date = ? AND se.Exam_Status <> 'In Progress'
+"""
+
+
+def seconds_of_day(value):
+    """TIME value -> seconds since midnight (fractional)"""
+    value = to_time(value)
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+
+
+# End_Time is inclusive (End_Time >= now), so an exam is open on [start, end + EPSILON)
+EPSILON = 1e-6
+
+
+def build_segments(exams):
+    """Cut the day at every boundary; returns (boundaries, open exams per segment)"""
+    windows = [(seconds_of_day(exam['Start_Time']), seconds_of_day(exam['End_Time']) + EPSILON, exam)
+               for exam in exams]
+    boundaries = sorted({start for start, _, _ in windows} | {end for _, end, _ in windows})
+    segments = []
+    for boundary in boundaries:
+        segments.append([exam for start, end, exam in windows if start <= boundary < end])
+    return boundaries, segments
+
+
+class ExamSchedule:
+    """Today's exams as an interval index, plus the Exam_IDs each student has taken today"""
+
+    def __init__(self, refresh_seconds=60):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._day = None
+        self._loaded_at = 0.0
+        self._boundaries = []
+        self._segments = []
+        self._taken = {}  # Student_ID -> {Exam_ID, ...} for today's exams
+        self._refreshed = threading.Condition(self._lock)
+        self._refreshing = 0  # reloads in flight
+        self._marks_during_refresh = []
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self.lookups = 0
+
+    def refresh(self):
+        """Reload today's exams and attempts; False if the database is unavailable"""
+        with self._lock:
+            self._begin_refresh()
+        return self._load()
+
+    def _begin_refresh(self):
+        # Called with the lock held; marks are collected until every reload in flight is done
+        if not self._refreshing:
+            self._marks_during_refresh = []
+        self._refreshing += 1
+
+    def _end_refresh(self):
+        # Called with the lock held
+        self._refreshing -= 1
+        if not self._refreshing:
+            self._marks_during_refresh = []
+            self._refreshed.notify_all()
+
+    def _load(self):
+        today = datetime.now().date()
+        conn = get_db_connection()
+        if not conn:
+            log.error("Error loading exam schedule: no database connection")
+            with self._lock:
+                self.failed_refreshes += 1
+                self._end_refresh()
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute(TODAYS_EXAMS_SQL, (today.strftime('%Y-%m-%d'),))
+            columns = [column[0] for column in cursor.description]
+            exams = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+            cursor.execute(TAKEN_TODAY_SQL, (today.strftime('%Y-%m-%d'),))
+            taken = {}
+            for student_id, exam_id in cursor.fetchall():
+                taken.setdefault(student_id, set()).add(exam_id)
+        except Exception as e:
+            log.error("Error loading exam schedule: %s", e)
+            with self._lock:
+                self.failed_refreshes += 1
+                self._end_refresh()
+            return False
+        finally:
+            conn.close()
+
+        boundaries, segments = build_segments(exams)
+        with self._lock:
+            # Submissions committed while we were reading may be missing from the query
+            for student_id, exam_id in self._marks_during_refresh:
+                taken.setdefault(student_id, set()).add(exam_id)
+            self._day = today
+            self._boundaries = boundaries
+            self._segments = segments
+            self._taken = taken
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            self._end_refresh()
+        return True
+
+    def _ensure_current(self):
+        today = datetime.now().date()
+        with self._lock:
+            if self._day == today:
+                if time.monotonic() - self._loaded_at < self.refresh_seconds or self._refreshing:
+                    return True  # fresh, or another request is already reloading it
+            elif self._refreshing:
+                # Cold start or a new day: nothing current to serve, so wait for
+                # the request that is loading it instead of querying again
+                self._refreshed.wait_for(lambda: not self._refreshing, timeout=REFRESH_WAIT_SECONDS)
+                return self._day == today
+            # Only the request that sets the flag reloads
+            self._begin_refresh()
+        if self._load():
+            return True
+        # A failed reload leaves today's index in service; only a missing one is reported
+        with self._lock:
+            if self._day == today:
+                log.warning("Serving the exam schedule loaded %.0fs ago until a reload succeeds",
+                            time.monotonic() - self._loaded_at)
+                return True
+        return False
+
+    def open_now(self, now=None):
+        """Exams whose window contains ``now``; None if the index could not be loaded"""
+        if not self._ensure_current():
+            return None
+        now = now or datetime.now()
+        boundaries, segments = self._boundaries, self._segments
+        index = bisect_right(boundaries, seconds_of_day(now.time())) - 1
+        self.lookups += 1
+        return segments[index] if index >= 0 else []
+
+    def open_for(self, student_id, now=None):
+        """Open exams this student has not taken yet (dashboard "available exams")"""
+        exams = self.open_now(now)
+        if exams is None:
+            return None
+        taken = self._taken.get(student_id)
+        if not taken:
+            return list(exams)
+        return [exam for exam in exams if exam['Exam_ID'] not in taken]
+
+    def mark_taken(self, exam_id, student_id):
+        """Record a submitted attempt (call after it is committed)"""
+        with self._lock:
+            self._taken.setdefault(student_id, set()).add(exam_id)
+            if self._refreshing:
+                self._marks_during_refresh.append((student_id, exam_id))
+
+    def status(self):
+        return {
+            'day': self._day.isoformat() if self._day else None,
+            'exams_today': len({exam['Exam_ID'] for segment in self._segments for exam in segment}),
+            'segments': len(self._segments),
+            'students_with_attempts': len(self._taken),
+            'refreshes': self.refreshes,
+            'failed_refreshes': self.failed_refreshes,
+            'lookups': self.lookups,
+        }
+
+
+todays_exams = ExamSchedule(refresh_seconds=Config.SCHEDULE_REFRESH_SECONDS)
@@ -0,0 +1,64 @@
+# exam_variants.py
+"""Per-student question and choice order for the shared exam paper.
+
+The cached paper (caches.exam_papers) lists questions by Question_ID.  Each
+student instead sees a permutation seeded from a hash of (Exam_ID,
+Student_ID): the same student always gets the same order (reloads, another
+worker process), neighbours get different ones, and no query is added.
+Answers are still posted as question_<Question_ID> = Choice_ID, so grading
+is unchanged.
+
+T/F choices keep their True/False order; MCQ choices are shuffled too.
+"""
+import hashlib
+import random
+
+from config import Config
+
+
+def variant_seed(exam_id, student_id):
+    """Stable 64-bit seed for one student's variant of an exam (unlike hash(), same in every process)"""
+    digest = hashlib.blake2b(f'{exam_id}:{student_id}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def variant_order(questions, exam_id, student_id):
+    """[(Question_ID, [choice positions]), ...] in this student's order"""
+    rng = random.Random(variant_seed(exam_id, student_id))
+    order = list(questions)
+    rng.shuffle(order)
+
+    variant = []
+    for question_id in order:
+        question = questions[question_id]
+        positions = list(range(len(question['choices'])))
+        if question['type'] == 'MCQ' and len(positions) > 1:
+            rng.shuffle(positions)
+        variant.append((question_id, positions))
+    return variant
+
+
+def page_order(questions, exam_id, student_id):
+    """The order take_exam shows: the student's variant, or the paper as is when SHUFFLE_EXAMS is off"""
+    if not Config.SHUFFLE_EXAMS:
+        return [(question_id, list(range(len(question['choices'])))) for question_id, question in questions.items()]
+    return variant_order(questions, exam_id, student_id)
+
+
+def shuffle_questions(questions, exam_id, student_id):
+    """{Question_ID: question} in this student's order; the cached ``questions`` are not modified"""
+    variant = {}
+    for question_id, positions in variant_order(questions, exam_id, student_id):
+        question = questions[question_id]
+        if positions != sorted(positions):
+            question = {'text': question['text'], 'type': question['type'],
+                        'choices': [question['choices'][position] for position in positions]}
+        variant[question_id] = question
+    return variant
+
+
+def questions_for(questions, exam_id, student_id):
+    """What take_exam renders: the student's variant, or the paper as is when SHUFFLE_EXAMS is off"""
+    if not Config.SHUFFLE_EXAMS:
+        return questions
+    return shuffle_questions(questions, exam_id, student_id)
@@ -0,0 +1,67 @@
+# grading.py
+"""In-process grading engine.
+
+Scores a submission against the cached answer key with exactly the rules of
+sp_Correct_Exam: a question is correct when the selected choice has
+Is_Correct = 1, worth 2 marks, and Student_Score is 2 x correct answers.
+"""
+from caches import answer_keys
+from config import Config
+
+MARK_PER_QUESTION = 2
+
+APPLY_GRADES_SQL = "EXEC sp_Apply_Exam_Grades ?, ?, ?"
+
+UPDATE_ANSWER_SQL = """
+    UPDATE Student_Exam_Questions SET Is_Correct = ?, Ques_Mark = ?
+    WHERE Exam_ID = ? AND Student_ID = ? AND Question_ID = ?
+"""
+
+UPDATE_SCORE_SQL = """
+    UPDATE Student_Exam SET Student_Score = ?, Exam_Status = 'Graded'
+    WHERE Exam_ID = ? AND Student_ID = ?
+"""
+
+
+def grade_answers(answer_key, answers):
+    """[(Question_ID, Choice_ID), ...] -> [(Question_ID, Is_Correct, Ques_Mark), ...]
+
+    Returns None when a selected choice is not in the key (e.g. a tampered
+    form); sp_Correct_Exam must grade those so the result stays identical.
+    """
+    choices = answer_key['choices']
+    graded = []
+    for question_id, choice_id in answers:
+        is_correct = choices.get(choice_id)
+        if is_correct is None:
+            return None
+        graded.append((question_id, 1 if is_correct else 0, MARK_PER_QUESTION if is_correct else 0))
+    return graded
+
+
+def total_score(graded):
+    return sum(mark for _, _, mark in graded)
+
+
+def grade_submission(exam_id, answers):
+    """Grade against the cached key for this exam, or None to fall back to sp_Correct_Exam"""
+    answer_key = answer_keys.get(exam_id)
+    if answer_key is None:
+        return None
+    return grade_answers(answer_key, answers)
+
+
+def apply_grades(cursor, exam_id, student_id, graded, use_tvp=None):
+    """Write Is_Correct/Ques_Mark and Student_Score in one set-based call (no commit)"""
+    if use_tvp is None:
+        use_tvp = Config.DATABASE_CONFIG.get('submit_with_tvp', True)
+
+    if use_tvp and graded:
+        cursor.execute(APPLY_GRADES_SQL, (exam_id, student_id, [tuple(row) for row in graded]))
+        return
+
+    if graded:
+        cursor.fast_executemany = True
+        cursor.executemany(UPDATE_ANSWER_SQL, [(is_correct, mark, exam_id, student_id, question_id)
+                                               for question_id, is_correct, mark in graded])
+    cursor.execute(UPDATE_SCORE_SQL, (total_score(graded), exam_id, student_id))
@@ -0,0 +1,280 @@
+# grading_queue.py
+"""Background grading: submit_exam enqueues, a small worker pool grades.
+
+Jobs live in a local SQLite file so they survive a restart; on start-up any
+job that was mid-flight goes back to pending, and Student_Exam rows still in
+'Submitted' or 'Auto-Submitted' state are re-enqueued in case the app died
+between committing the answers and grading them.  That recovery runs on the
+first worker thread, not in the request that started the queue.  Enqueueing
+a submission whose job failed for good queues it again from scratch.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from config import Config
+from database import get_db_connection
+
+log = logging.getLogger(__name__)
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Grading_Jobs (
+    Job_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Exam_ID INTEGER NOT NULL,
+    Student_ID INTEGER NOT NULL,
+    Status TEXT NOT NULL DEFAULT 'pending',  -- pending / running / done / failed
+    Attempts INTEGER NOT NULL DEFAULT 0,
+    Enqueued_At REAL NOT NULL,
+    Started_At REAL,
+    Finished_At REAL,
+    Error TEXT,
+    UNIQUE (Exam_ID, Student_ID)
+);
+CREATE INDEX IF NOT EXISTS IX_Grading_Jobs_Status ON Grading_Jobs (Status, Job_ID);
+"""
+
+# A new job, or a failed one started over; queued and finished jobs are left alone
+ENQUEUE_SQL = """
+    INSERT INTO Grading_Jobs (Exam_ID, Student_ID, Enqueued_At) VALUES (?, ?, ?)
+    ON CONFLICT (Exam_ID, Student_ID) DO UPDATE
+    SET Status = 'pending', Attempts = 0, Enqueued_At = excluded.Enqueued_At,
+        Started_At = NULL, Finished_At = NULL, Error = NULL
+    WHERE Status = 'failed'
+"""
+
+
+def grade_with_procedure(exam_id, student_id):
+    """Default grader: run sp_Correct_Exam"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Correct_Exam ?, ?", [exam_id, student_id])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+class GradingQueue:
+    """Durable job table + worker threads that grade submissions"""
+
+    def __init__(self, path, grader=grade_with_procedure, workers=4, max_attempts=3, poll_interval=1.0):
+        self.path = path
+        self.grader = grader
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._started = False
+        self._stopping = False
+        self._start_lock = threading.Lock()
+        self._started_at = None
+
+        self._finished = deque(maxlen=10000)  # (finished_at, lag_seconds) of recent jobs
+        self.completed = 0
+        self.failed = 0
+        self._schema_ready = False
+
+    # ---- storage --------------------------------------------------------------
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = FULL')
+            if not self._schema_ready:
+                conn.executescript(JOBS_SCHEMA)
+                self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, exam_id, student_id):
+        """Add a grading job (no-op if this submission is already queued or graded)"""
+        self._conn().execute(ENQUEUE_SQL, (exam_id, student_id, time.time()))
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def enqueue_many(self, submissions):
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(ENQUEUE_SQL, [(exam_id, student_id, now) for exam_id, student_id in submissions])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _claim(self):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute("""
+                SELECT Job_ID, Exam_ID, Student_ID, Enqueued_At FROM Grading_Jobs
+                WHERE Status = 'pending' ORDER BY Job_ID LIMIT 1
+            """).fetchone()
+            if row:
+                conn.execute("""
+                    UPDATE Grading_Jobs SET Status = 'running', Attempts = Attempts + 1, Started_At = ?
+                    WHERE Job_ID = ?
+                """, (time.time(), row[0]))
+            conn.execute('COMMIT')
+            return row
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _finish(self, job_id, enqueued_at):
+        now = time.time()
+        self._conn().execute("""
+            UPDATE Grading_Jobs SET Status = 'done', Finished_At = ?, Error = NULL WHERE Job_ID = ?
+        """, (now, job_id))
+        with self._wakeup:
+            self.completed += 1
+            self._finished.append((now, now - enqueued_at))
+
+    def _fail(self, job_id, error):
+        conn = self._conn()
+        attempts = conn.execute("SELECT Attempts FROM Grading_Jobs WHERE Job_ID = ?", (job_id,)).fetchone()[0]
+        status = 'failed' if attempts >= self.max_attempts else 'pending'
+        conn.execute("UPDATE Grading_Jobs SET Status = ?, Error = ? WHERE Job_ID = ?",
+                     (status, str(error)[:500], job_id))
+        if status == 'failed':
+            with self._wakeup:
+                self.failed += 1
+
+    def is_pending(self, exam_id, student_id):
+        """True while the submission is queued or being graded"""
+        row = self._conn().execute("""
+            SELECT 1 FROM Grading_Jobs
+            WHERE Exam_ID = ? AND Student_ID = ? AND Status IN ('pending', 'running')
+        """, (exam_id, student_id)).fetchone()
+        return row is not None
+
+    # ---- workers ----------------------------------------------------------------
+    def _worker(self):
+        while not self._stopping:
+            try:
+                job = self._claim()
+            except Exception as e:
+                log.error("Grading queue error: %s", e)
+                job = None
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            job_id, exam_id, student_id, enqueued_at = job
+            try:
+                self.grader(exam_id, student_id)
+            except Exception as e:
+                log.warning("Grading failed for exam %s, student %s: %s", exam_id, student_id, e)
+                self._fail(job_id, e)
+            else:
+                self._finish(job_id, enqueued_at)
+
+    def _recover_and_work(self):
+        try:
+            self.recover(before=self._started_at)
+        except Exception as e:
+            log.error("Grading queue recovery failed: %s", e)
+        self._worker()
+
+    def recover(self, before=None):
+        """Requeue interrupted jobs and submissions that never got a job.
+
+        Only jobs claimed before ``before`` count as interrupted, so the
+        workers already running are not disturbed.
+        """
+        self._conn().execute("UPDATE Grading_Jobs SET Status = 'pending' WHERE Status = 'running' AND Started_At < ?",
+                             (before if before is not None else time.time(),))
+        conn = get_db_connection()
+        if not conn:
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT Exam_ID, Student_ID FROM Student_Exam "
+                           "WHERE Exam_Status IN ('Submitted', 'Auto-Submitted')")
+            ungraded = [(row[0], row[1]) for row in cursor.fetchall()]
+        except Exception as e:
+            log.error("Could not scan for ungraded submissions: %s", e)
+            ungraded = []
+        finally:
+            conn.close()
+        if ungraded:
+            self.enqueue_many(ungraded)
+
+    def start(self):
+        """Start the worker threads once per process"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self._stopping = False
+            self._started_at = time.time()
+        # The first worker recovers before it starts claiming jobs
+        for number in range(self.workers):
+            target = self._recover_and_work if number == 0 else self._worker
+            thread = threading.Thread(target=target, name=f'grading-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._started = False
+
+    def wait_until_idle(self, timeout=30):
+        """Block until no job is pending or running (used by benchmarks)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.depth() == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    # ---- metrics ------------------------------------------------------------------
+    def depth(self):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM Grading_Jobs WHERE Status IN ('pending', 'running')"
+        ).fetchone()[0]
+
+    def metrics(self, window=60):
+        conn = self._conn()
+        counts = dict(conn.execute("SELECT Status, COUNT(*) FROM Grading_Jobs GROUP BY Status").fetchall())
+        oldest = conn.execute(
+            "SELECT MIN(Enqueued_At) FROM Grading_Jobs WHERE Status IN ('pending', 'running')"
+        ).fetchone()[0]
+        now = time.time()
+        with self._wakeup:
+            recent = [lag for finished_at, lag in self._finished if finished_at >= now - window]
+        return {
+            'queue_depth': counts.get('pending', 0) + counts.get('running', 0),
+            'pending': counts.get('pending', 0),
+            'running': counts.get('running', 0),
+            'failed': counts.get('failed', 0),
+            'completed_total': self.completed,
+            'throughput_per_second': round(len(recent) / float(window), 3),
+            'oldest_pending_lag_seconds': round(now - oldest, 3) if oldest else 0.0,
+            'avg_grading_lag_seconds': round(sum(recent) / len(recent), 3) if recent else 0.0,
+            'max_grading_lag_seconds': round(max(recent), 3) if recent else 0.0,
+            'workers': len(self._threads),
+        }
+
+
+grading_queue = GradingQueue(Config.GRADING_QUEUE_PATH, workers=Config.GRADING_WORKERS)
@@ -0,0 +1,72 @@
+# id_allocator.py
+"""Hi/lo ID allocation on top of the database sequences (ID Sequences.sql).
+
+Each allocator reserves a block of consecutive IDs with one
+sp_Reserve_ID_Block call and then hands them out from memory, so creating
+an exam or a question costs no extra round trip most of the time.  IDs are
+unique across processes because every block comes from the sequence;
+unused IDs of a block are simply skipped after a restart.
+
+A block is reserved on a second pool connection, so request handlers take
+their IDs before their own connection (get_db_connection()): a request
+holding one connection while waiting for another deadlocks the pool once
+every connection is held that way.
+"""
+import threading
+
+from config import Config
+from database import get_independent_connection
+
+RESERVE_BLOCK_SQL = "EXEC sp_Reserve_ID_Block ?, ?"
+
+
+def reserve_block(sequence, size):
+    """First ID of a freshly reserved block of ``size`` IDs.
+
+    Committed on its own connection: a block handed out from memory must
+    stay reserved even if the request that needed it rolls back.
+    """
+    conn = get_independent_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        cursor.execute(RESERVE_BLOCK_SQL, [sequence, size])
+        first_id = cursor.fetchone()[0]
+        conn.commit()
+        return int(first_id)
+    finally:
+        conn.close()
+
+
+class HiLoAllocator:
+    """Thread-safe IDs from blocks of a database sequence"""
+
+    def __init__(self, sequence, block_size=50, reserve=reserve_block):
+        self.sequence = sequence
+        self.block_size = block_size
+        self._reserve = reserve
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0  # first ID past the current block
+        self.blocks_reserved = 0
+
+    def next_ids(self, count):
+        """``count`` consecutive IDs (first, first + 1, ...); returns the first"""
+        with self._lock:
+            if self._limit - self._next < count:
+                size = max(self.block_size, count)
+                self._next = self._reserve(self.sequence, size)
+                self._limit = self._next + size
+                self.blocks_reserved += 1
+            first = self._next
+            self._next += count
+            return first
+
+    def next_id(self):
+        return self.next_ids(1)
+
+
+exam_ids = HiLoAllocator('Exam_ID_Seq', block_size=Config.ID_BLOCK_SIZE)
+question_ids = HiLoAllocator('Question_ID_Seq', block_size=Config.ID_BLOCK_SIZE)
+choice_ids = HiLoAllocator('Choice_ID_Seq', block_size=Config.ID_BLOCK_SIZE * 4)
@@ -0,0 +1,225 @@
+# instrumentation.py
+"""Per-endpoint request instrumentation and the application's logging setup.
+
+MetricsMiddleware wraps the WSGI app and times every request from the first
+byte in to the last byte out.  The database side comes from the request's
+RequestScope (database.py): each statement sent on a connection borrowed
+during the request is timed and its fetched rows counted by the cursor
+wrapper, and Flask's teardown hands the finished scope over through the
+WSGI environ.  Per endpoint, four HDR-style histograms are kept - wall
+time, DB time, rows fetched and statements - and /metrics exports them in
+the Prometheus text format as summaries.  Like every /metrics/* endpoint it
+needs an instructor session or the METRICS_TOKEN bearer token.
+
+Logging goes through a queue: the request thread only enqueues a record,
+a listener thread writes it out.  Records below WARNING are sampled at
+LOG_SAMPLE_RATE, and LOG_LEVEL=OFF silences everything.
+"""
+import atexit
+import logging
+import logging.handlers
+import math
+import queue
+import random
+import threading
+import time
+
+from werkzeug.wsgi import ClosingIterator
+
+# Environ key under which the teardown hook leaves the request's RequestScope
+SCOPE_ENVIRON_KEY = 'iti.db_scope'
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+class Histogram:
+    """HDR-style histogram of non-negative integers.
+
+    Values below 2**precision_bits are counted exactly.  Above that, every
+    power-of-two range is split into 2**(precision_bits - 1) equal buckets, so
+    a reported value is within 1/2**(precision_bits - 1) of the recorded one
+    (1.6% with the default 7 bits) and memory grows with the log of the range.
+    """
+
+    def __init__(self, precision_bits=7):
+        self.precision_bits = precision_bits
+        self._counts = {}  # bucket lower bound -> count
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _bucket(self, value):
+        shift = value.bit_length() - self.precision_bits
+        return value if shift <= 0 else (value >> shift) << shift
+
+    def _bucket_top(self, bucket):
+        shift = bucket.bit_length() - self.precision_bits
+        return bucket if shift <= 0 else bucket + (1 << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        bucket = self._bucket(value)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Highest value equivalent to the pct-th percentile (0 when empty)"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen >= rank:
+                return min(self._bucket_top(bucket), self.max)
+        return self.max
+
+
+class RequestMetrics:
+    """endpoint -> histograms of wall time, DB time, rows fetched and statements"""
+
+    # name -> (unit scale to the exported value, help text)
+    SERIES = {
+        'request_duration_seconds': (1e-6, 'Wall time from request start to the last byte of the response'),
+        'db_duration_seconds': (1e-6, 'Time spent in database calls during the request'),
+        'db_rows_fetched': (1, 'Rows fetched from the database during the request'),
+        'db_statements': (1, 'Statements sent to the database during the request'),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}  # endpoint -> {series name: Histogram}
+        self._responses = {}  # (endpoint, status) -> count
+
+    def record(self, endpoint, status, wall_seconds, scope=None):
+        with self._lock:
+            histograms = self._endpoints.get(endpoint)
+            if histograms is None:
+                histograms = self._endpoints[endpoint] = {name: Histogram() for name in self.SERIES}
+            histograms['request_duration_seconds'].record(wall_seconds * 1e6)
+            if scope is not None:
+                histograms['db_duration_seconds'].record(scope.db_seconds * 1e6)
+                histograms['db_rows_fetched'].record(scope.rows)
+                histograms['db_statements'].record(scope.statements)
+            key = (endpoint, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._responses.clear()
+
+    def summary(self):
+        """{endpoint: {series: {count, p50, p95, p99, max}}} in the exported units"""
+        with self._lock:
+            return {endpoint: {name: {'count': histogram.count,
+                                      'p50': histogram.percentile(50) * self.SERIES[name][0],
+                                      'p95': histogram.percentile(95) * self.SERIES[name][0],
+                                      'p99': histogram.percentile(99) * self.SERIES[name][0],
+                                      'max': histogram.max * self.SERIES[name][0]}
+                               for name, histogram in histograms.items()}
+                    for endpoint, histograms in self._endpoints.items()}
+
+    def prometheus(self):
+        """Everything in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, (scale, help_text) in self.SERIES.items():
+                metric = f'iti_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} summary')
+                for endpoint in sorted(self._endpoints):
+                    histogram = self._endpoints[endpoint][name]
+                    label = f'endpoint="{endpoint}"'
+                    for quantile in QUANTILES:
+                        lines.append(f'{metric}{{{label},quantile="{quantile}"}} '
+                                     f'{_number(histogram.percentile(quantile * 100) * scale)}')
+                    lines.append(f'{metric}_sum{{{label}}} {_number(histogram.total * scale)}')
+                    lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+            lines.append('# HELP iti_http_responses_total Responses sent, by endpoint and status code')
+            lines.append('# TYPE iti_http_responses_total counter')
+            for (endpoint, status), count in sorted(self._responses.items()):
+                lines.append(f'iti_http_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+class MetricsMiddleware:
+    """WSGI middleware recording every request into a RequestMetrics"""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        status = ['500']
+
+        def recording_start_response(status_line, headers, exc_info=None):
+            status[0] = status_line.split(' ', 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        def record():
+            scope = environ.get(SCOPE_ENVIRON_KEY)
+            endpoint = (scope.endpoint if scope is not None else None) or 'unmatched'
+            self.metrics.record(endpoint, status[0], time.perf_counter() - started, scope)
+
+        try:
+            body = self.app(environ, recording_start_response)
+        except Exception:
+            record()
+            raise
+        return ClosingIterator(body, record)
+
+
+class SampleFilter(logging.Filter):
+    """Pass every WARNING and above, and a random ``rate`` share of the rest"""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+_listener = None
+
+
+def configure_logging(level='INFO', sample_rate=1.0):
+    """Route the root logger through a queue to stderr; level 'OFF' disables logging"""
+    global _listener
+    if str(level).upper() == 'OFF':
+        logging.disable(logging.CRITICAL)
+        return
+    logging.disable(logging.NOTSET)
+
+    root = logging.getLogger()
+    root.setLevel(str(level).upper())
+    if _listener is not None:
+        for handler in root.handlers:
+            for log_filter in handler.filters:
+                if isinstance(log_filter, SampleFilter):
+                    log_filter.rate = sample_rate
+        return
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(SampleFilter(sample_rate))
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(records, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    root.addHandler(queue_handler)
+
+
+request_metrics = RequestMetrics()
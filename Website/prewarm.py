@@ -0,0 +1,200 @@
+# prewarm.py
+"""Warm the caches before an exam opens.
+
+Everyone clicks "Start Exam" in the first minute, so whatever is cold at
+Start_Time is loaded by the first students in the door.  A background thread
+scans Exams every PREWARM_INTERVAL_SECONDS for windows starting in the next
+PREWARM_LEAD_MINUTES and, for each one, loads the exam paper, the answer key
+and the enrolled-student set into the in-process caches and opens pool
+connections ahead of the burst.
+
+The first request starts the thread (app.py before_request).  The
+enrolled-student set only sizes the connection warm-up.  take_exam reports
+whether the paper was already cached for requests in the first minute
+after Start_Time, so metrics() shows the hit/miss counts at exam open next
+to the lead time the exams were warmed with.
+"""
+import logging
+import math
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from caches import answer_keys, enrolled_students, exam_papers
+from config import Config
+from database import get_db_connection, get_pool, to_date, to_time
+
+log = logging.getLogger(__name__)
+
+UPCOMING_EXAMS_SQL = """
+    SELECT Exam_ID, Exam_Date, Start_Time
+    FROM Exams
+    WHERE Exam_Date = ? AND Start_Time >= ? AND Start_Time <= ?
+"""
+
+# Requests within this many seconds of Start_Time count as "at exam open"
+OPEN_WINDOW_SECONDS = 60
+
+
+def scan_ranges(now, lead):
+    """(Exam_Date, from, to) ranges covering [now, now + lead], split at midnight"""
+    end = now + lead
+    if end.date() == now.date():
+        return [(now.date(), now.time(), end.time())]
+    return [(now.date(), now.time(), datetime.max.time()),
+            (end.date(), datetime.min.time(), end.time())]
+
+
+class PrewarmScheduler:
+    """Background scans for exams about to start; warms their caches once each"""
+
+    def __init__(self, lead_minutes=10, interval=30, pool_connections=8, students_per_connection=25):
+        self.lead = timedelta(minutes=lead_minutes)
+        self.interval = interval
+        self.pool_connections = pool_connections
+        self.students_per_connection = students_per_connection
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._warmed = {}  # Exam_ID -> (warmed_at, starts_at, pool connections wanted)
+        self._leads = deque(maxlen=1000)
+        self._first_open = {}  # Exam_ID -> True if the first request at open was a hit
+        self.scans = 0
+        self.failures = 0
+        self.open_hits = 0
+        self.open_misses = 0
+
+    def upcoming(self, now=None):
+        """[(Exam_ID, starts_at)] for exams starting within the lead time"""
+        now = now or datetime.now()
+        conn = get_db_connection()
+        if not conn:
+            return []
+        try:
+            cursor = conn.cursor()
+            exams = []
+            for exam_date, start, end in scan_ranges(now, self.lead):
+                cursor.execute(UPCOMING_EXAMS_SQL, (exam_date.strftime('%Y-%m-%d'),
+                                                    start.strftime('%H:%M:%S'), end.strftime('%H:%M:%S')))
+                for exam_id, day, start_time in cursor.fetchall():
+                    exams.append((exam_id, datetime.combine(to_date(day), to_time(start_time))))
+            return exams
+        finally:
+            conn.close()
+
+    def warm(self, exam_id, starts_at=None):
+        """Load everything the exam's first requests need; returns the number of enrolled students"""
+        exam_papers.get(exam_id)
+        answer_keys.get(exam_id)
+        enrolled = enrolled_students.get(exam_id)
+        students = len(enrolled['students']) if enrolled else 0
+
+        # Enough warm connections for the burst, within the pool limit
+        connections = min(self.pool_connections, max(1, math.ceil(students / self.students_per_connection)))
+        self._open_connections(connections)
+
+        now = datetime.now()
+        with self._lock:
+            self._warmed[exam_id] = (now, starts_at, connections)
+            if starts_at is not None:
+                self._leads.append((starts_at - now).total_seconds())
+        return students
+
+    def _open_connections(self, count):
+        try:
+            pool = get_pool()
+            pool.warm_up(max(count, pool.status()['size']))
+        except Exception as e:
+            log.warning("Could not pre-open pool connections: %s", e)
+
+    def scan(self, now=None):
+        """Warm every upcoming exam not warmed yet; returns their Exam_IDs"""
+        warmed = []
+        for exam_id, starts_at in self.upcoming(now):
+            with self._lock:
+                if exam_id in self._warmed:
+                    continue
+            self.warm(exam_id, starts_at)
+            warmed.append(exam_id)
+        now = datetime.now()
+        with self._lock:
+            self.scans += 1
+            # The pool closes connections idle for pool_max_idle_seconds, so top
+            # it up again for exams opening before the next scan
+            soon = [connections for exam_id, (_, starts_at, connections) in self._warmed.items()
+                    if exam_id not in warmed and starts_at is not None
+                    and now <= starts_at <= now + timedelta(seconds=self.interval)]
+            # Forget exams that started long ago
+            cutoff = now - timedelta(days=1)
+            for exam_id in [exam_id for exam_id, (_, starts_at, _) in self._warmed.items()
+                            if starts_at is not None and starts_at < cutoff]:
+                del self._warmed[exam_id]
+                self._first_open.pop(exam_id, None)
+        if soon:
+            self._open_connections(max(soon))
+        return warmed
+
+    def record_open(self, exam, was_cached, now=None):
+        """Called by take_exam with the paper's exam row and whether it was already cached"""
+        now = now or datetime.now()
+        starts_at = datetime.combine(to_date(exam['Exam_Date']), to_time(exam['Start_Time']))
+        if not 0 <= (now - starts_at).total_seconds() <= OPEN_WINDOW_SECONDS:
+            return
+        with self._lock:
+            if was_cached:
+                self.open_hits += 1
+            else:
+                self.open_misses += 1
+            self._first_open.setdefault(exam['Exam_ID'], was_cached)
+
+    # ---- background thread ----------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                self.failures += 1
+                log.error("Exam pre-warm scan failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='exam-prewarm', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self):
+        with self._lock:
+            leads = list(self._leads)
+            first = list(self._first_open.values())
+            opens = self.open_hits + self.open_misses
+            return {
+                'lead_minutes': self.lead.total_seconds() / 60,
+                'scans': self.scans,
+                'scan_failures': self.failures,
+                'exams_warmed': len(self._warmed),
+                'avg_lead_seconds': round(sum(leads) / len(leads), 1) if leads else 0.0,
+                'min_lead_seconds': round(min(leads), 1) if leads else 0.0,
+                'open_hits': self.open_hits,
+                'open_misses': self.open_misses,
+                'open_hit_rate': round(self.open_hits / opens, 3) if opens else 0.0,
+                'first_request_hits': sum(1 for hit in first if hit),
+                'first_request_misses': sum(1 for hit in first if not hit),
+                'running': self._thread is not None,
+            }
+
+
+prewarm_scheduler = PrewarmScheduler(lead_minutes=Config.PREWARM_LEAD_MINUTES,
+                                     interval=Config.PREWARM_INTERVAL_SECONDS,
+                                     pool_connections=Config.PREWARM_POOL_CONNECTIONS)
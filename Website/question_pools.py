@@ -0,0 +1,148 @@
+# question_pools.py
+"""Per-course question pools for exam generation.
+
+sp_Generate_Exam used to pick questions with ORDER BY NEWID(), sorting the
+whole course bank for every exam.  Here each (Course_ID, Question_Type) pool
+is a Question_ID array loaded once; an exam draws k of them with a partial
+Fisher-Yates shuffle in O(k) and sends them to sp_Generate_Exam as one
+ExamQuestionIDsTableType batch.
+
+Pools follow the bank: add_question() appends a question added through the
+app, and a question deleted elsewhere stays in its pool until the course
+reloads after QUESTION_POOL_TTL seconds - if sp_Generate_Exam reports the
+stale pick first, the course is reloaded and the exam retried once.
+Pass ``seed`` to get the same questions again.
+"""
+import random
+import threading
+import time
+
+from config import Config
+from database import get_db_connection
+
+QUESTION_TYPES = ('T/F', 'MCQ')
+
+GENERATE_EXAM_SQL = "EXEC sp_Generate_Exam ?, ?, ?, ?, ?, ?, ?, ?"
+
+STALE_POOL_MESSAGE = 'Question pool is out of date.'
+
+
+def partial_fisher_yates(items, k, rng):
+    """k distinct items chosen uniformly at random, O(k) time and space.
+
+    ``items`` is not modified: swaps are kept in a small dict instead, so the
+    same pool and seed always give the same sample.
+    """
+    n = len(items)
+    k = min(k, n)
+    swapped = {}
+    chosen = []
+    for i in range(k):
+        j = rng.randrange(i, n)
+        chosen.append(swapped.get(j, items[j]))
+        swapped[j] = swapped.get(i, items[i])
+    return chosen
+
+
+def load_course_questions(course_name):
+    """(Course_ID, {Question_Type: [Question_ID, ...]}) for a course, or None if it does not exist"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.Course_ID, q.Question_ID, q.Question_Type
+            FROM Course c
+            LEFT JOIN Questions q ON q.Course_ID = c.Course_ID
+            WHERE c.Course_Name = ?
+            ORDER BY q.Question_ID
+        """, (course_name,))
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return None
+    pools = {question_type: [] for question_type in QUESTION_TYPES}
+    for _, question_id, question_type in rows:
+        if question_id is not None:
+            pools.setdefault(question_type, []).append(question_id)
+    return rows[0][0], pools
+
+
+class QuestionPools:
+    """Course_Name -> pools of Question_IDs per Question_Type"""
+
+    def __init__(self, loader=load_course_questions, ttl=300, seed=None):
+        self._loader = loader
+        self.ttl = ttl
+        self._rng = random.Random(seed)
+        self._courses = {}  # Course_Name -> (loaded_at, Course_ID, pools)
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.samples = 0
+
+    def _course(self, course_name):
+        entry = self._courses.get(course_name)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            loaded = self._loader(course_name)
+            if loaded is None:
+                return None
+            course_id, pools = loaded
+            entry = (time.monotonic(), course_id, pools)
+            with self._lock:
+                self._courses[course_name] = entry
+                self.loads += 1
+        return entry
+
+    def pick(self, course_name, no_tf, no_mcq, seed=None):
+        """[(Question_ID,), ...] for a new exam, [] if the course is unknown"""
+        entry = self._course(course_name)
+        if entry is None:
+            return []
+        pools = entry[2]
+        rng = random.Random(seed) if seed is not None else self._rng
+        with self._lock:
+            chosen = (partial_fisher_yates(pools.get('T/F', []), max(no_tf, 0), rng)
+                      + partial_fisher_yates(pools.get('MCQ', []), max(no_mcq, 0), rng))
+            self.samples += 1
+        return [(question_id,) for question_id in chosen]
+
+    def add_question(self, course_id, question_type, question_id):
+        """Call after a new question is committed"""
+        with self._lock:
+            for _, loaded_course_id, pools in self._courses.values():
+                if loaded_course_id == course_id:
+                    pool = pools.setdefault(question_type, [])
+                    if question_id not in pool:
+                        pool.append(question_id)
+
+    def evict(self, course_name):
+        with self._lock:
+            self._courses.pop(course_name, None)
+
+    def generate_exam(self, cursor, course_name, exam_date, start_time, end_time, no_tf, no_mcq,
+                      exam_id, seed=None):
+        """Run sp_Generate_Exam with questions drawn from the pools (no commit).
+
+        The summary row is left on ``cursor``.  A pick that went stale between
+        sampling and inserting is retried once against a freshly loaded pool.
+        """
+        for attempt in range(2):
+            question_ids = self.pick(course_name, no_tf, no_mcq, seed)
+            params = [course_name, exam_date, start_time, end_time, no_tf, no_mcq, exam_id]
+            try:
+                if question_ids:
+                    cursor.execute(GENERATE_EXAM_SQL, params + [question_ids])
+                else:
+                    # Unknown course or empty bank: let the procedure report it
+                    cursor.execute(GENERATE_EXAM_SQL.rsplit(',', 1)[0], params)
+                return cursor
+            except Exception as e:
+                if attempt or STALE_POOL_MESSAGE not in str(e):
+                    raise
+                self.evict(course_name)
+
+
+question_pools = QuestionPools(ttl=Config.QUESTION_POOL_TTL)
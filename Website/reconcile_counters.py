@@ -0,0 +1,49 @@
+# reconcile_counters.py
+"""Rebuild the per-exam Students_Taken counters and report any drift.
+
+Exam_Submission_Counts is kept by a trigger on Student_Exam; this recounts
+the submitted Student_Exam rows (not 'In Progress') from scratch (sp_Reconcile_Exam_Counters) and lists every exam
+whose stored counter disagreed.  Meant for a nightly job.
+
+    python reconcile_counters.py            # fix and report
+    python reconcile_counters.py --check    # report only; exit code 1 on drift
+"""
+import argparse
+import sys
+
+from database import get_db_connection
+
+
+def reconcile_counters(fix=True):
+    """[(Exam_ID, Stored_Count, Actual_Count, Drift), ...] for every exam that drifted"""
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXEC sp_Reconcile_Exam_Counters ?", [1 if fix else 0])
+        drift = [tuple(row) for row in cursor.fetchall()]
+        conn.commit()
+        return drift
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild per-exam submission counters')
+    parser.add_argument('--check', action='store_true', help='report drift without fixing it')
+    args = parser.parse_args()
+
+    drift = reconcile_counters(fix=not args.check)
+    for exam_id, stored, actual, difference in drift:
+        print(f" Exam {exam_id}: stored {stored}, actual {actual} ({difference:+d})")
+    action = 'found' if args.check else 'fixed'
+    print(f" {len(drift)} drifted counter(s) {action}, total drift {sum(abs(row[3]) for row in drift)}")
+    return 1 if drift and args.check else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# regrade.py
+"""Bulk regrade of a whole exam after a question's correct choice is fixed.
+
+sp_Correct_Exam grades one student at a time and refuses exams that are
+already 'Graded'.  This loads every Student_Exam_Questions row of the exam
+into NumPy arrays, recomputes Is_Correct, Ques_Mark and Student_Score for the
+whole cohort in one vectorized pass, and writes back only the rows that
+changed with a single sp_Apply_Exam_Regrade call.
+
+Only 'Graded' attempts are regraded.  Attempts still 'Submitted' have a
+grading_queue job that grades them against the fixed key; marking them
+'Graded' here would make that job fail.
+
+    python regrade.py 825            # regrade exam 825
+    python regrade.py 825 --dry-run  # only report what would change
+"""
+import argparse
+import time
+
+import numpy as np
+
+from caches import answer_keys, graded_results
+from config import Config
+from database import get_db_connection
+from grading import MARK_PER_QUESTION
+
+APPLY_REGRADE_SQL = "EXEC sp_Apply_Exam_Regrade ?, ?, ?"
+
+UPDATE_ANSWER_SQL = """
+    UPDATE Student_Exam_Questions SET Is_Correct = ?, Ques_Mark = ?
+    WHERE Exam_ID = ? AND Student_ID = ? AND Question_ID = ?
+"""
+
+UPDATE_SCORE_SQL = """
+    UPDATE Student_Exam SET Student_Score = ?, Exam_Status = 'Graded'
+    WHERE Exam_ID = ? AND Student_ID = ?
+"""
+
+# Foreign choices are looked up this many at a time (SQL Server allows 2100 parameters)
+CHOICE_LOOKUP_CHUNK = 1000
+
+
+def _column_arrays(rows, dtypes):
+    """Rows -> one array per column; NULL (not graded yet) becomes -1"""
+    if not rows:
+        return [np.empty(0, dtype=dtype) for dtype in dtypes]
+    table = np.array(rows, dtype=np.float64)  # one C-level pass, None -> nan
+    table[np.isnan(table)] = -1
+    return [table[:, index].astype(dtype) for index, dtype in enumerate(dtypes)]
+
+
+def load_exam_answers(cursor, exam_id, statuses=('Graded',)):
+    """Every answer of the exam's attempts in ``statuses`` plus the correctness of each selected choice"""
+    in_statuses = ', '.join('?' * len(statuses))
+    cursor.execute(f"""
+        SELECT seq.Student_ID, seq.Question_ID, seq.Selected_Choice_ID, seq.Is_Correct, seq.Ques_Mark
+        FROM Student_Exam_Questions seq
+        JOIN Student_Exam se ON se.Exam_ID = seq.Exam_ID AND se.Student_ID = seq.Student_ID
+        WHERE seq.Exam_ID = ? AND se.Exam_Status IN ({in_statuses})
+    """, (exam_id, *statuses))
+    answers = _column_arrays(cursor.fetchall(), [np.int64, np.int64, np.int64, np.int8, np.int32])
+
+    # Choices of the exam's questions, plus any other choice a student managed to select
+    cursor.execute("""
+        SELECT qc.Choice_ID, qc.Is_Correct
+        FROM Exam_Questions eq
+        JOIN Question_Choices qc ON qc.Question_ID = eq.Question_ID
+        WHERE eq.Exam_ID = ?
+    """, (exam_id,))
+    rows = cursor.fetchall()
+    foreign = np.setdiff1d(answers[2], np.asarray([row[0] for row in rows], dtype=np.int64)).tolist()
+    for offset in range(0, len(foreign), CHOICE_LOOKUP_CHUNK):
+        chunk = foreign[offset:offset + CHOICE_LOOKUP_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f"SELECT Choice_ID, Is_Correct FROM Question_Choices WHERE Choice_ID IN ({placeholders})",
+                       chunk)
+        rows += cursor.fetchall()
+    choices = _column_arrays(rows, [np.int64, np.int8])
+
+    # Attempts in other states are graded when they are submitted or by their queued job
+    cursor.execute(f"""
+        SELECT Student_ID, Student_Score, Exam_Status FROM Student_Exam
+        WHERE Exam_ID = ? AND Exam_Status IN ({in_statuses})
+    """, (exam_id, *statuses))
+    submissions = cursor.fetchall()
+    return answers, choices, submissions
+
+
+def compute_regrade(answers, choices, submissions):
+    """Vectorized sp_Correct_Exam over the whole cohort.
+
+    Returns (changed_answers, changed_scores) ready for sp_Apply_Exam_Regrade:
+    [(Student_ID, Question_ID, Is_Correct, Ques_Mark)] and [(Student_ID, Student_Score)].
+    """
+    student_ids, question_ids, selected, current_correct, current_marks = answers
+    choice_ids, choice_correct = choices
+
+    # Correctness of each selected choice (sp_Correct_Exam joins on Choice_ID)
+    order = np.argsort(choice_ids)
+    choice_ids, choice_correct = choice_ids[order], choice_correct[order]
+    if len(choice_ids):
+        position = np.minimum(np.searchsorted(choice_ids, selected), len(choice_ids) - 1)
+        found = choice_ids[position] == selected
+        is_correct = np.where(found, choice_correct[position], current_correct).astype(np.int8)
+    else:
+        found = np.zeros(len(selected), dtype=bool)
+        is_correct = current_correct.astype(np.int8)
+    # Rows without a matching choice are left untouched, like the UPDATE ... INNER JOIN
+    marks = np.where(found, is_correct * MARK_PER_QUESTION, current_marks).astype(np.int32)
+
+    changed = (is_correct != current_correct) | (marks != current_marks)
+    changed_answers = list(zip(student_ids[changed].tolist(), question_ids[changed].tolist(),
+                               is_correct[changed].tolist(), marks[changed].tolist()))
+
+    # Student_Score = 2 x correct answers, per student
+    cohort, inverse = np.unique(student_ids, return_inverse=True)
+    scores = np.bincount(inverse, weights=is_correct == 1, minlength=len(cohort)).astype(np.int64) * MARK_PER_QUESTION
+    score_by_student = dict(zip(cohort.tolist(), scores.tolist()))
+
+    changed_scores = []
+    for student_id, current_score, status in submissions:
+        score = score_by_student.get(student_id, 0)
+        if score != current_score or status != 'Graded':
+            changed_scores.append((student_id, score))
+    return changed_answers, changed_scores
+
+
+def apply_regrade(cursor, exam_id, changed_answers, changed_scores, use_tvp=None):
+    """Single bulk write-back (no commit)"""
+    if use_tvp is None:
+        use_tvp = Config.DATABASE_CONFIG.get('submit_with_tvp', True)
+
+    if use_tvp:
+        cursor.execute(APPLY_REGRADE_SQL, (exam_id, changed_answers, changed_scores))
+        return
+
+    cursor.fast_executemany = True
+    if changed_answers:
+        cursor.executemany(UPDATE_ANSWER_SQL, [(is_correct, mark, exam_id, student_id, question_id)
+                                               for student_id, question_id, is_correct, mark in changed_answers])
+    if changed_scores:
+        cursor.executemany(UPDATE_SCORE_SQL, [(score, exam_id, student_id) for student_id, score in changed_scores])
+
+
+def regrade_exam(exam_id, dry_run=False):
+    """Regrade every submission of an exam; returns a summary dict"""
+    started = time.perf_counter()
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        answers, choices, submissions = load_exam_answers(cursor, exam_id)
+        loaded = time.perf_counter()
+
+        changed_answers, changed_scores = compute_regrade(answers, choices, submissions)
+        computed = time.perf_counter()
+
+        if not dry_run and (changed_answers or changed_scores):
+            apply_regrade(cursor, exam_id, changed_answers, changed_scores)
+            conn.commit()
+        written = time.perf_counter()
+    finally:
+        conn.close()
+
+    # The correct choice changed, so the cached answer key and results pages are stale
+    answer_keys.evict(exam_id)
+    if not dry_run:
+        graded_results.evict_exam(exam_id)
+
+    return {
+        'exam_id': exam_id,
+        'submissions': len(submissions),
+        'answers': len(answers[0]),
+        'answers_changed': len(changed_answers),
+        'scores_changed': len(changed_scores),
+        'dry_run': dry_run,
+        'load_seconds': round(loaded - started, 3),
+        'compute_seconds': round(computed - loaded, 3),
+        'write_seconds': round(written - computed, 3),
+        'total_seconds': round(written - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regrade every submission of an exam')
+    parser.add_argument('exam_id', type=int)
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing them')
+    args = parser.parse_args()
+
+    summary = regrade_exam(args.exam_id, dry_run=args.dry_run)
+    print(f" Exam {summary['exam_id']}: {summary['submissions']} submissions, {summary['answers']} answers")
+    print(f" Changed: {summary['answers_changed']} answers, {summary['scores_changed']} scores"
+          f"{' (dry run, nothing written)' if summary['dry_run'] else ''}")
+    print(f" Time: load {summary['load_seconds']}s, compute {summary['compute_seconds']}s, "
+          f"write {summary['write_seconds']}s, total {summary['total_seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+# slow_queries.py
+"""Slow-statement log for everything sent through the pooled connections.
+
+The cursor wrapper in database.py times each statement - execute plus the
+fetches and nextset calls that belong to it - and hands the slow ones
+(at least SLOW_LOG_THRESHOLD_MS) to slow_statements.  One JSON line per
+statement goes to a rotating local file: procedure or SQL text, parameters
+with sensitive ones redacted, duration, rows, and the route (or background
+thread) that ran it.
+
+With SLOW_LOG_CAPTURE=1 each entry also carries how the database ran it:
+on SQL Server every connection runs SET STATISTICS TIME, IO ON and the
+messages of the statement are kept; on the SQLite stand-in the statements a
+procedure issued are traced and explained with EXPLAIN QUERY PLAN.
+
+Summarize the top offenders by total time:
+
+    python slow_queries.py                      # slow_statements.log and its backups
+    python slow_queries.py --by max --top 20
+    python slow_queries.py --route take_exam
+"""
+import argparse
+import glob
+import json
+import logging
+import logging.handlers
+import re
+import sys
+import threading
+from datetime import datetime
+
+from config import Config
+
+# Parameters bound to a column with one of these names are never written out
+SENSITIVE_NAMES = re.compile(r'password|passwd|secret|token', re.IGNORECASE)
+
+EXEC_PATTERN = re.compile(r'^\s*EXEC(?:UTE)?\s+(?:dbo\.)?(\w+)', re.IGNORECASE)
+PLACEHOLDER = re.compile(r'(?:(\w+)\s*(?:=|<>|LIKE)\s*)?\?', re.IGNORECASE)
+
+MAX_SQL_CHARS = 1000
+MAX_PARAM_CHARS = 200
+
+
+def statement_key(sql):
+    """Procedure name for EXEC calls, otherwise the SQL text on one line"""
+    match = EXEC_PATTERN.match(sql)
+    if match:
+        return match.group(1)
+    return ' '.join(sql.split())[:120]
+
+
+def redact_params(sql, params):
+    """JSON-safe parameters: sensitive ones masked, table-valued ones summarized"""
+    sensitive = {position for position, match in enumerate(PLACEHOLDER.finditer(sql))
+                 if match.group(1) and SENSITIVE_NAMES.search(match.group(1))}
+    redacted = []
+    for position, value in enumerate(params):
+        if position in sensitive:
+            redacted.append('***')
+        elif isinstance(value, (list, tuple)):
+            redacted.append(f'<{len(value)} rows>')
+        elif value is None or isinstance(value, (int, float, bool)):
+            redacted.append(value)
+        else:
+            redacted.append(str(value)[:MAX_PARAM_CHARS])
+    return redacted
+
+
+def bound_params(args):
+    """Parameters of cursor.execute(sql, [a, b]) or cursor.execute(sql, a, b)"""
+    if len(args) == 1 and isinstance(args[0], (list, tuple)):
+        return list(args[0])
+    return list(args)
+
+
+class SlowStatementLog:
+    """Writes statements at or above ``threshold_ms`` to a rotating JSON-lines file"""
+
+    def __init__(self, path, threshold_ms=250, capture=False, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.threshold = threshold_ms / 1000.0 if threshold_ms >= 0 else None
+        self.capture = capture
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._lock = threading.Lock()
+        self._logger = None
+        self.logged = 0
+        self.capture_failures = 0
+        self.write_failures = 0
+
+    @property
+    def enabled(self):
+        return self.threshold is not None
+
+    def is_slow(self, seconds):
+        return self.threshold is not None and seconds >= self.threshold
+
+    def _file_logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    logger = logging.getLogger(f'{__name__}.file')
+                    logger.propagate = False
+                    logger.setLevel(logging.INFO)
+                    handler = logging.handlers.RotatingFileHandler(
+                        self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding='utf-8', delay=True)
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+    def record(self, sql, params, seconds, rows, route, cursor=None, messages=None):
+        """Write one slow statement; ``cursor`` and ``messages`` feed the plan capture"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'statement': statement_key(sql),
+            'ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'route': route,
+            'params': redact_params(sql, params),
+            'sql': ' '.join(sql.split())[:MAX_SQL_CHARS],
+        }
+        if self.capture:
+            entry['plan'] = self._capture(cursor, messages)
+        try:
+            self._file_logger().info(json.dumps(entry, default=str))
+        except Exception:
+            with self._lock:
+                self.write_failures += 1
+            return
+        with self._lock:
+            self.logged += 1
+
+    def _capture(self, cursor, messages):
+        # SQL Server: the SET STATISTICS TIME/IO messages collected with the statement
+        if messages:
+            return [str(message) for message in messages]
+        # SQLite stand-in: EXPLAIN QUERY PLAN of what the statement ran
+        explain = getattr(cursor, 'explain_query_plan', None)
+        if explain is None:
+            return None
+        try:
+            return explain()
+        except Exception as e:
+            with self._lock:
+                self.capture_failures += 1
+            return f'plan capture failed: {e}'
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'threshold_ms': self.threshold * 1000 if self.threshold is not None else None,
+                'capture': self.capture,
+                'logged': self.logged,
+                'capture_failures': self.capture_failures,
+                'write_failures': self.write_failures,
+                'path': self.path,
+            }
+
+
+def read_entries(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def summarize(entries, by='total', route=None):
+    """Per statement: count, total/avg/max ms, average rows and the routes that ran it"""
+    statements = {}
+    for entry in entries:
+        if route and entry.get('route') != route:
+            continue
+        stats = statements.setdefault(entry['statement'], {
+            'statement': entry['statement'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'routes': {},
+        })
+        stats['count'] += 1
+        stats['total_ms'] += entry['ms']
+        stats['max_ms'] = max(stats['max_ms'], entry['ms'])
+        stats['rows'] += entry.get('rows') or 0
+        stats['routes'][entry.get('route')] = stats['routes'].get(entry.get('route'), 0) + 1
+    for stats in statements.values():
+        stats['avg_ms'] = stats['total_ms'] / stats['count']
+        stats['avg_rows'] = stats['rows'] / stats['count']
+    sort_key = {'total': 'total_ms', 'max': 'max_ms', 'avg': 'avg_ms', 'count': 'count'}[by]
+    return sorted(statements.values(), key=lambda stats: stats[sort_key], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the slow-statement log: top offenders')
+    parser.add_argument('paths', nargs='*', help=f'log files (default: {Config.SLOW_LOG_PATH} and its backups)')
+    parser.add_argument('--by', choices=['total', 'max', 'avg', 'count'], default='total')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--route', help='only statements run by this route or thread')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(glob.escape(Config.SLOW_LOG_PATH) + '*'))
+    if not paths:
+        print(f" No slow-statement log at {Config.SLOW_LOG_PATH}")
+        return 1
+
+    ranked = summarize(read_entries(paths), by=args.by, route=args.route)
+    total = sum(stats['total_ms'] for stats in ranked)
+    print(f" {sum(stats['count'] for stats in ranked)} slow statements, {total / 1000:.1f}s in total, "
+          f"from {len(paths)} file(s); top {args.top} by {args.by}")
+    print(f" {'statement':<45} {'count':>6} {'total ms':>10} {'share':>6} {'avg ms':>8} {'max ms':>8} "
+          f"{'avg rows':>9}  routes")
+    for stats in ranked[:args.top]:
+        routes = ', '.join(f'{name} x{count}' for name, count in
+                           sorted(stats['routes'].items(), key=lambda item: -item[1])[:3])
+        print(f" {stats['statement'][:45]:<45} {stats['count']:>6} {stats['total_ms']:>10.1f} "
+              f"{stats['total_ms'] / total if total else 0:>6.1%} {stats['avg_ms']:>8.1f} {stats['max_ms']:>8.1f} "
+              f"{stats['avg_rows']:>9.1f}  {routes}")
+    return 0
+
+
+slow_statements = SlowStatementLog(Config.SLOW_LOG_PATH, threshold_ms=Config.SLOW_LOG_THRESHOLD_MS,
+                                   capture=Config.SLOW_LOG_CAPTURE, max_bytes=Config.SLOW_LOG_MAX_BYTES,
+                                   backups=Config.SLOW_LOG_BACKUPS)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,548 @@
+# sqlite_backend.py
+"""SQLite stand-in for the SQL Server database.
+
+Lets the Flask app run (and be benchmarked / load tested) on a machine
+without SQL Server or an ODBC driver.  The connection wrapper speaks the
+small part of the pyodbc API that app.py uses, and routes
+``EXEC <procedure> ?, ?`` statements to the Python re-implementations in
+sqlite_procedures.py.
+
+Create and seed a database:
+    python sqlite_backend.py --path iti_system.db --students 300
+
+Then run the app against it:
+    ITI_DB_BACKEND=sqlite ITI_SQLITE_PATH=iti_system.db python app.py
+"""
+import argparse
+import contextlib
+import os
+import random
+import re
+import sqlite3
+from datetime import date, datetime
+
+from sqlite_procedures import PROCEDURES
+
+# Translation of "Database Implementation/Tables & Constraints.sql" (tables,
+# foreign keys, checks and defaults) plus the exam related indexes from Indexes.sql
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Faculty (
+    Faculty_ID INTEGER NOT NULL PRIMARY KEY,
+    Faculty_Name VARCHAR(100) NOT NULL,
+    University VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Department (
+    Dept_ID INTEGER NOT NULL PRIMARY KEY,
+    Dept_Name VARCHAR(60) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Track (
+    Track_ID INTEGER NOT NULL PRIMARY KEY,
+    Track_Name VARCHAR(60) NOT NULL,
+    Total_Hours INTEGER NOT NULL,
+    Dept_ID INTEGER NOT NULL REFERENCES Department (Dept_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Intake (
+    Intake_ID INTEGER NOT NULL PRIMARY KEY,
+    Intake_Name VARCHAR(15) NOT NULL,
+    Start_Date DATE NOT NULL,
+    End_Date DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Branch (
+    Branch_ID INTEGER NOT NULL PRIMARY KEY,
+    Branch_Name VARCHAR(20) NOT NULL,
+    Location VARCHAR(25) NOT NULL,
+    Launching_Year VARCHAR(4)
+);
+
+CREATE TABLE IF NOT EXISTS Intake_Track_Branch (
+    Intake_Track_Branch_ID INTEGER NOT NULL PRIMARY KEY,
+    Intake_ID INTEGER NOT NULL REFERENCES Intake (Intake_ID),
+    Track_ID INTEGER NOT NULL REFERENCES Track (Track_ID),
+    Branch_ID INTEGER NOT NULL REFERENCES Branch (Branch_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Student (
+    Student_ID INTEGER NOT NULL PRIMARY KEY,
+    Student_Name VARCHAR(60) NOT NULL,
+    Gender VARCHAR(6) NOT NULL,
+    Phone_Number VARCHAR(11) NOT NULL,
+    Birthdate DATE NOT NULL,
+    Email VARCHAR(100) UNIQUE NOT NULL,
+    Password VARCHAR(255) NOT NULL,
+    Governorate VARCHAR(15) NOT NULL,
+    Graduation_Year INTEGER NOT NULL,
+    GPA DECIMAL(3,2) NOT NULL,
+    Faculty_ID INTEGER NOT NULL REFERENCES Faculty (Faculty_ID),
+    Intake_Track_Branch_ID INTEGER NOT NULL REFERENCES Intake_Track_Branch (Intake_Track_Branch_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Certificates (
+    Certificate_ID INTEGER NOT NULL PRIMARY KEY,
+    Certificate_Name VARCHAR(60) NOT NULL,
+    Provider VARCHAR(20) NOT NULL,
+    Date DATE NOT NULL,
+    Student_ID INTEGER NOT NULL REFERENCES Student (Student_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Freelancing_Jobs (
+    Freelancing_Job_ID INTEGER NOT NULL PRIMARY KEY,
+    Platform VARCHAR(15) NOT NULL,
+    Date DATE NOT NULL,
+    Income_USD DECIMAL(10,2) NOT NULL,
+    Duration INTEGER NOT NULL,
+    Student_ID INTEGER NOT NULL REFERENCES Student (Student_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Employment (
+    Employment_ID INTEGER NOT NULL PRIMARY KEY,
+    Type VARCHAR(10) NOT NULL
+        CONSTRAINT Employment_Type_Check CHECK (Type IN ('Internship', 'Part-time', 'Full-time', 'Freelancer')),
+    Company VARCHAR(50),
+    Job_Title TEXT,
+    Salary INTEGER NOT NULL,
+    Start_Date DATE NOT NULL,
+    Student_ID INTEGER NOT NULL UNIQUE REFERENCES Student (Student_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Instructor (
+    Instructor_ID INTEGER NOT NULL PRIMARY KEY,
+    Instructor_Name VARCHAR(60) NOT NULL,
+    Gender VARCHAR(6) NOT NULL,
+    Salary DECIMAL(10,2) NOT NULL,
+    Email VARCHAR(100) UNIQUE NOT NULL,
+    Password VARCHAR(255) NOT NULL,
+    Phone_Number VARCHAR(11) NOT NULL,
+    Hire_Date DATE NOT NULL,
+    Dept_ID INTEGER NOT NULL REFERENCES Department (Dept_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Topic (
+    Topic_ID INTEGER NOT NULL PRIMARY KEY,
+    Topic_Name VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Course (
+    Course_ID INTEGER NOT NULL PRIMARY KEY,
+    Course_Name VARCHAR(100) NOT NULL,
+    Topic_ID INTEGER NOT NULL REFERENCES Topic (Topic_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Track_Courses (
+    Track_ID INTEGER NOT NULL REFERENCES Track (Track_ID),
+    Course_ID INTEGER NOT NULL REFERENCES Course (Course_ID),
+    Hours INTEGER NOT NULL,
+    PRIMARY KEY (Track_ID, Course_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Instructors_Courses (
+    Instructor_ID INTEGER NOT NULL REFERENCES Instructor (Instructor_ID),
+    Course_ID INTEGER NOT NULL REFERENCES Course (Course_ID),
+    PRIMARY KEY (Instructor_ID, Course_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Exams (
+    Exam_ID INTEGER NOT NULL PRIMARY KEY,
+    Title TEXT NOT NULL,
+    Total_Marks INTEGER NOT NULL,
+    Exam_Date DATE NOT NULL,
+    No_Questions INTEGER NOT NULL,
+    Start_Time TIME NOT NULL,
+    End_Time TIME NOT NULL,
+    Course_ID INTEGER NOT NULL REFERENCES Course (Course_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Questions (
+    Question_ID INTEGER NOT NULL PRIMARY KEY,
+    Question_Type VARCHAR(3) NOT NULL
+        CONSTRAINT Question_Type_Check CHECK (Question_Type IN ('T/F', 'MCQ')),
+    Question_Head TEXT NOT NULL,
+    Correct_Answer TEXT NOT NULL,
+    Course_ID INTEGER NOT NULL REFERENCES Course (Course_ID),
+    Question_Mark INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Question_Choices (
+    Choice_ID INTEGER NOT NULL PRIMARY KEY,
+    Question_ID INTEGER NOT NULL REFERENCES Questions (Question_ID),
+    Choice_Text TEXT NOT NULL,
+    Is_Correct BIT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Exam_Questions (
+    Exam_ID INTEGER NOT NULL REFERENCES Exams (Exam_ID),
+    Question_ID INTEGER NOT NULL REFERENCES Questions (Question_ID),
+    PRIMARY KEY (Exam_ID, Question_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Student_Exam (
+    Student_ID INTEGER NOT NULL REFERENCES Student (Student_ID),
+    Exam_ID INTEGER NOT NULL REFERENCES Exams (Exam_ID),
+    Student_Score INTEGER NOT NULL,
+    Submission_Time TIME NOT NULL,
+    Exam_Status VARCHAR(15) NOT NULL DEFAULT 'Not Started'
+        CONSTRAINT Exam_Status_Check CHECK (Exam_Status IN ('Not Started', 'In Progress', 'Submitted', 'Auto-Submitted', 'Graded')),
+    PRIMARY KEY (Student_ID, Exam_ID)
+);
+
+CREATE TABLE IF NOT EXISTS Student_Exam_Questions (
+    Student_ID INTEGER NOT NULL REFERENCES Student (Student_ID),
+    Exam_ID INTEGER NOT NULL REFERENCES Exams (Exam_ID),
+    Question_ID INTEGER NOT NULL REFERENCES Questions (Question_ID),
+    Selected_Choice_ID INTEGER NOT NULL REFERENCES Question_Choices (Choice_ID),
+    Ques_Mark INTEGER NOT NULL,
+    Is_Correct BIT NOT NULL DEFAULT 0,
+    PRIMARY KEY (Student_ID, Exam_ID, Question_ID)
+);
+
+-- Database Implementation/Exam Counters.sql
+CREATE TABLE IF NOT EXISTS Exam_Submission_Counts (
+    Exam_ID INTEGER PRIMARY KEY REFERENCES Exams (Exam_ID) ON DELETE CASCADE,
+    Students_Taken INTEGER NOT NULL DEFAULT 0
+);
+
+-- Attempts still 'In Progress' (autosaved, not submitted) are not counted
+DROP TRIGGER IF EXISTS Exam_Submission_Counts_Insert;
+DROP TRIGGER IF EXISTS Exam_Submission_Counts_Delete;
+DROP TRIGGER IF EXISTS Exam_Submission_Counts_Move;
+DROP TRIGGER IF EXISTS Exam_Submission_Counts_Update;
+
+CREATE TRIGGER Exam_Submission_Counts_Insert AFTER INSERT ON Student_Exam
+WHEN NEW.Exam_Status <> 'In Progress'
+BEGIN
+    INSERT INTO Exam_Submission_Counts (Exam_ID, Students_Taken) VALUES (NEW.Exam_ID, 1)
+    ON CONFLICT (Exam_ID) DO UPDATE SET Students_Taken = Students_Taken + 1;
+END;
+
+CREATE TRIGGER Exam_Submission_Counts_Delete AFTER DELETE ON Student_Exam
+WHEN OLD.Exam_Status <> 'In Progress'
+BEGIN
+    UPDATE Exam_Submission_Counts SET Students_Taken = Students_Taken - 1 WHERE Exam_ID = OLD.Exam_ID;
+END;
+
+-- A submitted attempt is counted; an attempt moved to another exam moves its count
+CREATE TRIGGER Exam_Submission_Counts_Update AFTER UPDATE OF Exam_ID, Exam_Status ON Student_Exam
+WHEN NEW.Exam_ID <> OLD.Exam_ID OR (NEW.Exam_Status <> 'In Progress') <> (OLD.Exam_Status <> 'In Progress')
+BEGIN
+    UPDATE Exam_Submission_Counts SET Students_Taken = Students_Taken - 1
+    WHERE Exam_ID = OLD.Exam_ID AND OLD.Exam_Status <> 'In Progress';
+    INSERT INTO Exam_Submission_Counts (Exam_ID, Students_Taken)
+    SELECT NEW.Exam_ID, 1 WHERE NEW.Exam_Status <> 'In Progress'
+    ON CONFLICT (Exam_ID) DO UPDATE SET Students_Taken = Students_Taken + 1;
+END;
+
+-- Database Implementation/ID Sequences.sql (see sp_reserve_id_block)
+CREATE TABLE IF NOT EXISTS ID_Sequences (
+    Sequence_Name TEXT PRIMARY KEY,
+    Next_Value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO ID_Sequences VALUES ('Exam_ID_Seq', 1), ('Question_ID_Seq', 1), ('Choice_ID_Seq', 1);
+
+-- Backfill exams whose attempts predate the counters (no-op once filled)
+INSERT OR IGNORE INTO Exam_Submission_Counts (Exam_ID, Students_Taken)
+SELECT Exam_ID, COUNT(*) FROM Student_Exam WHERE Exam_Status <> 'In Progress' GROUP BY Exam_ID;
+
+CREATE INDEX IF NOT EXISTS IX_Exams_Course_ID ON Exams (Course_ID);
+CREATE INDEX IF NOT EXISTS IX_Exams_Date_Window ON Exams (Exam_Date, Start_Time, End_Time, Title, Course_ID, Total_Marks);
+CREATE INDEX IF NOT EXISTS IX_Questions_Course_ID ON Questions (Course_ID);
+CREATE INDEX IF NOT EXISTS IX_Questions_Type ON Questions (Question_Type);
+CREATE INDEX IF NOT EXISTS IX_Choices_Question_ID ON Question_Choices (Question_ID);
+CREATE INDEX IF NOT EXISTS IX_Exam_Questions_Exam_ID ON Exam_Questions (Exam_ID);
+CREATE INDEX IF NOT EXISTS IX_Exam_Questions_Question_ID ON Exam_Questions (Question_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Student_ID ON Student_Exam (Student_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Exam_ID ON Student_Exam (Exam_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Questions_Student_ID ON Student_Exam_Questions (Student_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Questions_Exam_ID ON Student_Exam_Questions (Exam_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Questions_Question_ID ON Student_Exam_Questions (Question_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Exam_Questions_Choice_ID ON Student_Exam_Questions (Selected_Choice_ID);
+CREATE INDEX IF NOT EXISTS IX_Instructors_Courses_Instructor_ID ON Instructors_Courses (Instructor_ID);
+CREATE INDEX IF NOT EXISTS IX_Student_Intake_Track_Branch_ID ON Student (Intake_Track_Branch_ID);
+"""
+
+# EXEC sp_Name ?, ?   /   EXECUTE dbo.sp_Name
+EXEC_PATTERN = re.compile(r'^\s*EXEC(?:UTE)?\s+(?:dbo\.)?(\w+)', re.IGNORECASE)
+
+# Traced statements EXPLAIN QUERY PLAN is run on, and the string literals masked in them
+EXPLAINABLE = re.compile(r'^\s*(?:SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+MAX_EXPLAINED = 20
+
+
+def _getdate():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _isnull(value, replacement):
+    return replacement if value is None else value
+
+
+class SQLiteCursor:
+    """pyodbc-style cursor: description, fetchone/fetchall/nextset, EXEC support"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+        self._result_sets = []
+        self._rows = None
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False  # accepted for pyodbc compatibility, sqlite3 batches anyway
+        self.statements = []  # SQL the last execute ran, procedures included (with trace_statements)
+
+    def _load_result_set(self):
+        if self._result_sets:
+            columns, rows = self._result_sets.pop(0)
+            self.description = [(name, None, None, None, None, None, None) for name in columns]
+            self._rows = list(rows)
+        else:
+            self.description = None
+            self._rows = []
+
+    def execute(self, sql, *params):
+        # pyodbc accepts both execute(sql, [a, b]) and execute(sql, a, b)
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        params = tuple(params)
+        if self.connection.trace_statements:
+            with self.connection.tracing() as self.statements:
+                return self._execute(sql, params)
+        return self._execute(sql, params)
+
+    def _execute(self, sql, params):
+        match = EXEC_PATTERN.match(sql)
+        if match:
+            name = match.group(1)
+            procedure = PROCEDURES.get(name)
+            if procedure is None:
+                raise sqlite3.OperationalError(f"Could not find stored procedure '{name}'.")
+            self._result_sets = list(procedure(self.connection.raw, *params))
+            self.rowcount = -1
+            self._load_result_set()
+        else:
+            self._result_sets = []
+            self._rows = None
+            self._cursor.execute(sql, params)
+            self.description = self._cursor.description
+            self.rowcount = self._cursor.rowcount
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._result_sets = []
+        self._rows = None
+        self._cursor.executemany(sql, seq_of_params)
+        self.description = None
+        self.rowcount = self._cursor.rowcount
+
+    def fetchone(self):
+        if self._rows is None:
+            return self._cursor.fetchone()
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        if self._rows is None:
+            return self._cursor.fetchall()
+        rows, self._rows = self._rows, []
+        return rows
+
+    def nextset(self):
+        if not self._result_sets:
+            return False
+        self._load_result_set()
+        return True
+
+    def close(self):
+        self._cursor.close()
+
+    def explain_query_plan(self):
+        """EXPLAIN QUERY PLAN of each distinct statement the last execute ran,
+        with string literals masked in the SQL reported alongside"""
+        plans = []
+        seen = set()
+        for sql in self.statements:
+            if not EXPLAINABLE.match(sql) or sql in seen:
+                continue
+            seen.add(sql)
+            if len(plans) == MAX_EXPLAINED:
+                break
+            rows = self.connection.raw.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()
+            plans.append({'sql': STRING_LITERAL.sub("'?'", ' '.join(sql.split()))[:300],
+                          'plan': [row[3] for row in rows]})
+        return plans
+
+
+class SQLiteConnection:
+    """Wraps a sqlite3 connection with the pyodbc calls app.py relies on.
+
+    With ``trace_statements`` every statement sqlite runs - including those
+    issued inside the Python procedures - is recorded on the cursor that
+    caused it, for the slow-statement log's query plans.
+    """
+
+    def __init__(self, raw, trace_statements=False):
+        self.raw = raw
+        self.trace_statements = trace_statements
+        self._traced = None
+        if trace_statements:
+            raw.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        if self._traced is not None:
+            self._traced.append(sql)
+
+    @contextlib.contextmanager
+    def tracing(self):
+        self._traced = traced = []
+        try:
+            yield traced
+        finally:
+            self._traced = None
+
+    def cursor(self):
+        return SQLiteCursor(self)
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+def open_sqlite(path):
+    raw = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    raw.execute('PRAGMA foreign_keys = ON')
+    raw.execute('PRAGMA journal_mode = WAL')
+    raw.execute('PRAGMA synchronous = NORMAL')
+    raw.create_function('GETDATE', 0, _getdate)
+    raw.create_function('ISNULL', 2, _isnull)
+    return raw
+
+
+def create_schema(raw):
+    raw.executescript(SCHEMA)
+    raw.commit()
+
+
+class SQLiteBackend:
+    """Database backend that stores everything in a local SQLite file"""
+
+    name = 'sqlite'
+    health_check_sql = 'SELECT 1'
+
+    def __init__(self, path, trace_statements=False):
+        self.path = path
+        self.trace_statements = trace_statements
+        raw = open_sqlite(path)
+        try:
+            create_schema(raw)
+        finally:
+            raw.close()
+
+    def connect(self):
+        return SQLiteConnection(open_sqlite(self.path), trace_statements=self.trace_statements)
+
+
+# ---- Demo data ----------------------------------------------------------------
+COURSE_NAMES = [
+    'Introduction to Programming using C',
+    'SQL Server Fundamentals',
+    'Python for Data Analysis',
+    'Power BI Dashboards',
+    'Statistics for Data Science',
+]
+
+FIRST_NAMES = ['Amira', 'Sarah', 'Doha', 'Walaa', 'Ashraqat', 'Omar', 'Youssef', 'Mona', 'Karim', 'Nour']
+LAST_NAMES = ['Maged', 'Hani', 'Waleed', 'Ahmed', 'Mohammed', 'Hassan', 'Ali', 'Ibrahim', 'Mostafa', 'Adel']
+
+
+def seed_demo_data(raw, students=300, tf_per_course=40, mcq_per_course=60, seed=2024):
+    """Fill an empty database with a cohort, one instructor and a question bank.
+
+    Students log in as <Student_ID> / 'pass<Student_ID>' starting from 1001,
+    the instructor as 1 / 'instructor'.
+    """
+    rng = random.Random(seed)
+    cursor = raw.cursor()
+    if cursor.execute("SELECT COUNT(*) FROM Student").fetchone()[0]:
+        return False
+
+    cursor.execute("INSERT INTO Faculty VALUES (1, 'Faculty of Computers and AI', 'Cairo University')")
+    cursor.execute("INSERT INTO Department VALUES (1, 'Data and AI')")
+    cursor.execute("INSERT INTO Track VALUES (1, 'Power BI Development', 600, 1)")
+    cursor.execute("INSERT INTO Intake VALUES (1, 'Intake 45', '2025-10-01', '2026-06-30')")
+    cursor.execute("INSERT INTO Branch VALUES (1, 'Smart Village', 'Giza', '2009')")
+    cursor.execute("INSERT INTO Intake_Track_Branch VALUES (1, 1, 1, 1)")
+    cursor.execute("INSERT INTO Topic VALUES (1, 'Data Analysis')")
+    cursor.execute("""INSERT INTO Instructor VALUES
+                      (1, 'Demo Instructor', 'Female', 15000, 'instructor@iti.gov.eg', 'instructor',
+                       '01000000000', '2020-01-01', 1)""")
+
+    for course_id, course_name in enumerate(COURSE_NAMES, start=1):
+        cursor.execute("INSERT INTO Course VALUES (?, ?, 1)", (course_id, course_name))
+        cursor.execute("INSERT INTO Track_Courses VALUES (1, ?, 30)", (course_id,))
+        cursor.execute("INSERT INTO Instructors_Courses VALUES (1, ?)", (course_id,))
+
+    question_id = 0
+    choice_id = 0
+    questions, choices = [], []
+    for course_id in range(1, len(COURSE_NAMES) + 1):
+        for _ in range(tf_per_course):
+            question_id += 1
+            answer = rng.choice(['True', 'False'])
+            questions.append((question_id, 'T/F', f'Statement #{question_id} is correct.', answer, course_id, 2))
+            for text, value in (('The sentence is True', 'True'), ('The sentence is False', 'False')):
+                choice_id += 1
+                choices.append((choice_id, question_id, text, 1 if value == answer else 0))
+        for _ in range(mcq_per_course):
+            question_id += 1
+            correct = rng.randrange(4)
+            questions.append((question_id, 'MCQ', f'Question #{question_id}: pick the right option.',
+                              f'Option {correct + 1}', course_id, 2))
+            for position in range(4):
+                choice_id += 1
+                choices.append((choice_id, question_id, f'Option {position + 1}', 1 if position == correct else 0))
+    cursor.executemany("INSERT INTO Questions VALUES (?, ?, ?, ?, ?, ?)", questions)
+    cursor.executemany("INSERT INTO Question_Choices VALUES (?, ?, ?, ?)", choices)
+
+    rows = []
+    for number in range(students):
+        student_id = 1001 + number
+        name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+        rows.append((student_id, name, rng.choice(['Male', 'Female']), '01000000000',
+                     date(2000, 1, 1).isoformat(), f'student{student_id}@iti.gov.eg', f'pass{student_id}',
+                     'Giza', 2024, 3.0, 1, 1))
+    cursor.executemany("INSERT INTO Student VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    raw.commit()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create and seed the SQLite stand-in database')
+    parser.add_argument('--path', default=os.environ.get('ITI_SQLITE_PATH', 'iti_system.db'))
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--reset', action='store_true', help='delete the database file first')
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.path):
+        os.remove(args.path)
+    SQLiteBackend(args.path)
+    raw = open_sqlite(args.path)
+    try:
+        if seed_demo_data(raw, students=args.students):
+            print(f" Seeded {args.path} with {args.students} students")
+        else:
+            print(f" {args.path} already has data, nothing seeded")
+    finally:
+        raw.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,673 @@
+# sqlite_procedures.py
+"""Python re-implementations of the SQL Server stored procedures used by app.py.
+
+Each procedure takes a sqlite3 connection followed by the same positional
+parameters as the T-SQL version, and returns a list of result sets
+``[(columns, rows), ...]``.  RAISERROR becomes a ProcedureError carrying the
+same message text, so the error handling in app.py works unchanged.
+
+Sources:
+    Exam Procedures/1. Exam Generation.sql    -> sp_Generate_Exam
+    Exam Procedures/2. Start Exam.sql         -> sp_Start_Exam, sp_Check_Exam_Eligibility,
+                                                 sp_Get_Exam_Paper, sp_Get_Student_Dashboard
+    Exam Procedures/3. Exam Answers.sql       -> sp_Submit_Exam, sp_Save_Exam_Progress,
+                                                 sp_Auto_Submit_Exam
+    Exam Procedures/4. Exam Correction.sql    -> sp_Correct_Exam, sp_Get_Exam_Answer_Key,
+                                                 sp_Apply_Exam_Grades, sp_Get_Exam_Results
+    Exam Procedures/5. Exam Regrade.sql       -> sp_Apply_Exam_Regrade
+    Exam Procedures/6. Bulk Exam Generation.sql -> sp_Bulk_Generate_Exams
+    Database Implementation/Exam Counters.sql -> sp_Reconcile_Exam_Counters
+    Database Implementation/ID Sequences.sql  -> sp_Reserve_ID_Block (+ NEXT VALUE FOR)
+    CRUD Procedures/Exams.sql                 -> Get_Exam_By_ID
+    CRUD Procedures/Question.sql              -> sp_Add_Question_With_Choices
+    SSRS Reports/SSRS Stored Procedures.sql   -> Get_Exam_Questions_With_Student_Answers,
+                                                 GetInstructorCoursesWithStudentCount
+"""
+import sqlite3
+from datetime import datetime
+
+from database import to_date, to_time
+
+
+class ProcedureError(sqlite3.DatabaseError):
+    """Equivalent of RAISERROR(..., 16, 1) inside a stored procedure"""
+
+
+# ---- T-SQL type helpers -----------------------------------------------------
+def date_str(value):
+    """DATE as stored in the SQLite schema ('YYYY-MM-DD')"""
+    return to_date(value).strftime('%Y-%m-%d')
+
+
+def time_str(value):
+    """TIME(7) as stored in the SQLite schema ('HH:MM:SS')"""
+    return to_time(value).strftime('%H:%M:%S')
+
+
+def minutes_between(start, end):
+    """DATEDIFF(MINUTE, start, end) for two TIME values"""
+    start, end = to_time(start), to_time(end)
+    return (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+
+
+def _result(cursor):
+    columns = [column[0] for column in cursor.description]
+    return columns, cursor.fetchall()
+
+
+# ---- Exam procedures ----------------------------------------------------------
+# ---- ID Sequences.sql -----------------------------------------------------------
+# Sequence -> (table, column).  The stand-in also skips past IDs that were
+# inserted directly (seed data, benchmarks), which a real SEQUENCE would not.
+SEQUENCES = {
+    'Exam_ID_Seq': ('Exams', 'Exam_ID'),
+    'Question_ID_Seq': ('Questions', 'Question_ID'),
+    'Choice_ID_Seq': ('Question_Choices', 'Choice_ID'),
+}
+
+
+def sp_reserve_id_block(conn, sequence_name, block_size):
+    if sequence_name not in SEQUENCES:
+        raise ProcedureError('Unknown ID sequence.')
+    block_size = int(block_size)
+    if block_size < 1:
+        raise ProcedureError('Block size must be at least 1.')
+
+    table, column = SEQUENCES[sequence_name]
+    # One UPDATE takes the write lock before reading, so concurrent callers never overlap
+    row = conn.execute(f"""
+        UPDATE ID_Sequences
+        SET Next_Value = MAX(Next_Value, (SELECT IFNULL(MAX({column}), 0) + 1 FROM {table})) + ?
+        WHERE Sequence_Name = ?
+        RETURNING Next_Value - ?
+    """, (block_size, sequence_name, block_size)).fetchone()
+    return [(['First_ID'], [row])]
+
+
+def next_sequence_value(conn, sequence_name):
+    """NEXT VALUE FOR <sequence>"""
+    return sp_reserve_id_block(conn, sequence_name, 1)[0][1][0][0]
+
+
+def sp_generate_exam(conn, course_name, exam_date, start_time, end_time, no_tf, no_mcq, exam_id=None,
+                     question_ids=None):
+    """``question_ids`` is the ExamQuestionIDsTableType TVP: [(Question_ID,), ...]"""
+    now = datetime.now()
+    cursor = conn.cursor()
+
+    # 1. Validate Course Name
+    row = cursor.execute("SELECT Course_ID FROM Course WHERE Course_Name = ?", (course_name,)).fetchone()
+    if row is None:
+        raise ProcedureError('Course name is invalid or does not exist.')
+    course_id = row[0]
+
+    exam_date = to_date(exam_date)
+    start_time = to_time(start_time)
+    end_time = to_time(end_time)
+    no_tf, no_mcq = int(no_tf), int(no_mcq)
+
+    # 2. Validate Exam Date (cannot be in the past)
+    if exam_date < now.date():
+        raise ProcedureError('Exam date cannot be in the past.')
+
+    # 3. Validate Exam Time (if same day, start time must be after current time)
+    if exam_date == now.date() and start_time < now.time():
+        raise ProcedureError('Exam start time cannot be in the past.')
+
+    # 4. Validate Exam Duration (cannot exceed 2 hours)
+    if minutes_between(start_time, end_time) > 120:
+        raise ProcedureError('Exam duration cannot exceed 2 hours.')
+
+    # 5. Validate Questions Count (max 25)
+    no_questions = no_tf + no_mcq
+    if no_questions > 25:
+        raise ProcedureError('Total number of questions cannot exceed 25.')
+
+    # 5b. Validate pre-sampled questions (question_pools.py)
+    question_ids = [row[0] for row in question_ids or []]
+    if question_ids:
+        found = dict.fromkeys(('T/F', 'MCQ'), 0)
+        for start in range(0, len(question_ids), 500):
+            chunk = question_ids[start:start + 500]
+            for question_type, count in cursor.execute(f"""
+                SELECT Question_Type, COUNT(*) FROM Questions
+                WHERE Course_ID = ? AND Question_ID IN ({', '.join('?' * len(chunk))})
+                GROUP BY Question_Type
+            """, [course_id] + chunk):
+                found[question_type] = found.get(question_type, 0) + count
+        if (sum(found.values()) != len(set(question_ids))
+                or found['T/F'] > no_tf or found['MCQ'] > no_mcq):
+            raise ProcedureError('Question pool is out of date.')
+
+    # 6. Generate new Exam_ID (ID Sequences.sql)
+    if exam_id is None:
+        exam_id = next_sequence_value(conn, 'Exam_ID_Seq')
+
+    # 7. Build Exam Title / 8. Total Marks
+    exam_title = course_name + ' Exam'
+    total_marks = no_questions * 2
+
+    # 9. Insert Exam
+    cursor.execute("""
+        INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (exam_id, exam_title, total_marks, date_str(exam_date), no_questions,
+          time_str(start_time), time_str(end_time), course_id))
+
+    if question_ids:
+        # 10 / 11. Questions already sampled by the application: one batch insert
+        cursor.executemany("INSERT INTO Exam_Questions (Exam_ID, Question_ID) VALUES (?, ?)",
+                           [(exam_id, question_id) for question_id in question_ids])
+    else:
+        # 10 / 11. Insert random True/False and MCQ questions
+        for question_type, count in (('T/F', no_tf), ('MCQ', no_mcq)):
+            cursor.execute("""
+                INSERT INTO Exam_Questions (Exam_ID, Question_ID)
+                SELECT ?, Question_ID
+                FROM Questions
+                WHERE Course_ID = ? AND Question_Type = ?
+                ORDER BY RANDOM()
+                LIMIT ?
+            """, (exam_id, course_id, question_type, max(count, 0)))
+
+    # 12. Return summary
+    columns = ['Exam_ID', 'Exam_Title', 'Course_Name', 'No_TF_Questions', 'No_MCQ_Questions',
+               'Total_Questions', 'Exam_Date', 'Start_Time', 'End_Time']
+    row = (exam_id, exam_title, course_name, no_tf, no_mcq, no_questions,
+           date_str(exam_date), time_str(start_time), time_str(end_time))
+    return [(columns, [row])]
+
+
+def sp_bulk_generate_exams(conn, exams, exam_questions):
+    """``exams``: BulkExamsTableType rows (Exam_ID, Course_ID, Exam_Date, Start_Time, End_Time, No_TF, No_MCQ),
+    ``exam_questions``: ExamQuestionsTableType rows (Exam_ID, Question_ID)"""
+    now = datetime.now()
+    cursor = conn.cursor()
+    courses = dict(cursor.execute("SELECT Course_ID, Course_Name FROM Course").fetchall())
+
+    exams = [(exam_id, course_id, to_date(exam_date), to_time(start_time), to_time(end_time), int(no_tf), int(no_mcq))
+             for exam_id, course_id, exam_date, start_time, end_time, no_tf, no_mcq in exams]
+    rules = (
+        ('Course name is invalid or does not exist.', lambda e: e[1] not in courses),
+        ('Exam date cannot be in the past.', lambda e: e[2] < now.date()),
+        ('Exam start time cannot be in the past.', lambda e: e[2] == now.date() and e[3] < now.time()),
+        ('Exam duration cannot exceed 2 hours.', lambda e: minutes_between(e[3], e[4]) > 120),
+        ('Total number of questions cannot exceed 25.', lambda e: e[5] + e[6] > 25),
+    )
+    for message, broken in rules:
+        for exam in exams:
+            if broken(exam):
+                raise ProcedureError(f'{message} (Exam_ID {exam[0]})')
+
+    # 5b. Each drawn question must belong to its exam's course
+    exam_courses = {exam[0]: exam[1] for exam in exams}
+    exam_questions = [(exam_id, question_id) for exam_id, question_id in exam_questions if exam_id in exam_courses]
+    question_ids = sorted({question_id for _, question_id in exam_questions})
+    question_courses = {}
+    for start in range(0, len(question_ids), 500):
+        chunk = question_ids[start:start + 500]
+        question_courses.update(cursor.execute(
+            f"SELECT Question_ID, Course_ID FROM Questions WHERE Question_ID IN ({', '.join('?' * len(chunk))})",
+            chunk).fetchall())
+    for exam_id, question_id in exam_questions:
+        if question_courses.get(question_id) != exam_courses[exam_id]:
+            raise ProcedureError(f'Question pool is out of date. (Exam_ID {exam_id})')
+
+    # 6 / 7. Set-based inserts (the caller's commit ends the transaction)
+    cursor.executemany("""
+        INSERT INTO Exams (Exam_ID, Title, Total_Marks, Exam_Date, No_Questions, Start_Time, End_Time, Course_ID)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(exam_id, courses[course_id] + ' Exam', (no_tf + no_mcq) * 2, date_str(exam_date), no_tf + no_mcq,
+           time_str(start_time), time_str(end_time), course_id)
+          for exam_id, course_id, exam_date, start_time, end_time, no_tf, no_mcq in exams])
+    cursor.executemany("INSERT INTO Exam_Questions (Exam_ID, Question_ID) VALUES (?, ?)", exam_questions)
+
+    # 8. One summary row per exam
+    columns = ['Exam_ID', 'Exam_Title', 'Course_Name', 'No_TF_Questions', 'No_MCQ_Questions',
+               'Total_Questions', 'Exam_Date', 'Start_Time', 'End_Time']
+    rows = [(exam_id, courses[course_id] + ' Exam', courses[course_id], no_tf, no_mcq, no_tf + no_mcq,
+             date_str(exam_date), time_str(start_time), time_str(end_time))
+            for exam_id, course_id, exam_date, start_time, end_time, no_tf, no_mcq in sorted(exams)]
+    return [(columns, rows)]
+
+
+def sp_check_exam_eligibility(conn, exam_id, student_id):
+    now = datetime.now()
+    cursor = conn.cursor()
+
+    exam = cursor.execute(
+        "SELECT Exam_Date, Start_Time, End_Time FROM Exams WHERE Exam_ID = ?", (exam_id,)
+    ).fetchone()
+    if exam is None:
+        raise ProcedureError('Exam not found. Please check the Exam ID.')
+
+    taken = cursor.execute(
+        "SELECT 1 FROM Student_Exam WHERE Exam_ID = ? AND Student_ID = ? AND Exam_Status <> 'In Progress'",
+        (exam_id, student_id)
+    ).fetchone()
+    if taken:
+        raise ProcedureError('You have already taken or started this exam.')
+
+    exam_date, start_time, end_time = to_date(exam[0]), to_time(exam[1]), to_time(exam[2])
+    if now.date() != exam_date:
+        raise ProcedureError('Exam is not scheduled for today.')
+    if now.time() < start_time:
+        raise ProcedureError('Exam has not started yet.')
+    if now.time() > end_time:
+        raise ProcedureError('Exam time is over. You cannot start now.')
+
+    return [(['Exam_ID', 'Exam_Date', 'Start_Time', 'End_Time'], [(exam_id,) + tuple(exam)])]
+
+
+def _exam_questions(conn, exam_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT q.Question_ID, q.Question_Type, q.Question_Head, qc.Choice_ID, qc.Choice_Text
+        FROM Exam_Questions eq
+        INNER JOIN Questions q ON eq.Question_ID = q.Question_ID
+        INNER JOIN Question_Choices qc ON q.Question_ID = qc.Question_ID
+        WHERE eq.Exam_ID = ?
+        ORDER BY q.Question_ID, qc.Choice_ID
+    """, (exam_id,))
+    return _result(cursor)
+
+
+def sp_start_exam(conn, exam_id, student_id):
+    sp_check_exam_eligibility(conn, exam_id, student_id)
+    return [_exam_questions(conn, exam_id)]
+
+
+def sp_get_exam_paper(conn, exam_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT e.Exam_ID, e.Title, c.Course_Name, e.Total_Marks, e.No_Questions,
+               e.Exam_Date, e.Start_Time, e.End_Time
+        FROM Exams e
+        INNER JOIN Course c ON e.Course_ID = c.Course_ID
+        WHERE e.Exam_ID = ?
+    """, (exam_id,))
+    return [_result(cursor), _exam_questions(conn, exam_id)]
+
+
+def sp_get_student_dashboard(conn, student_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT se.Exam_ID, e.Title AS Exam_Title, se.Student_Score, e.Total_Marks,
+               c.Course_Name, se.Exam_Status
+        FROM Student_Exam se
+        INNER JOIN Exams e ON se.Exam_ID = e.Exam_ID
+        INNER JOIN Course c ON e.Course_ID = c.Course_ID
+        WHERE se.Student_ID = ?
+          AND se.Exam_Status <> 'In Progress'
+    """, (student_id,))
+    return [_result(cursor)]
+
+
+def sp_submit_exam(conn, exam_id, student_id, answers):
+    """``answers`` is the StudentAnswersTableType TVP: [(Question_ID, Selected_Choice_ID), ...]"""
+    cursor = conn.cursor()
+
+    submitted_at = datetime.now().strftime('%H:%M:%S')
+
+    # 1. Check if student already submitted (an autosaved attempt is still open)
+    status = cursor.execute("SELECT Exam_Status FROM Student_Exam WHERE Exam_ID = ? AND Student_ID = ?",
+                            (exam_id, student_id)).fetchone()
+    if status and status[0] != 'In Progress':
+        raise ProcedureError('You have already submitted this exam.')
+
+    # 2. Insert new record into Student_Exam, or close the autosaved attempt;
+    #    the submitted form replaces the autosaved answers
+    if status:
+        cursor.execute("DELETE FROM Student_Exam_Questions WHERE Exam_ID = ? AND Student_ID = ?",
+                       (exam_id, student_id))
+        cursor.execute("""
+            UPDATE Student_Exam SET Submission_Time = ?, Exam_Status = 'Submitted'
+            WHERE Exam_ID = ? AND Student_ID = ?
+        """, (submitted_at, exam_id, student_id))
+    else:
+        cursor.execute("""
+            INSERT INTO Student_Exam (Exam_ID, Student_ID, Student_Score, Submission_Time, Exam_Status)
+            VALUES (?, ?, 0, ?, 'Submitted')
+        """, (exam_id, student_id, submitted_at))
+
+    # 3. Insert student answers into Student_Exam_Questions
+    cursor.executemany("""
+        INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
+        VALUES (?, ?, ?, ?, 0)
+    """, [(student_id, exam_id, question_id, choice_id) for question_id, choice_id in answers])
+
+    return [([''], [('Exam Submitted Successfully',)])]
+
+
+def sp_save_exam_progress(conn, answers):
+    """``answers`` is the AutosaveAnswersTableType TVP: [(Student_ID, Exam_ID, Question_ID, Selected_Choice_ID), ...]"""
+    now = datetime.now().strftime('%H:%M:%S')
+    cursor = conn.cursor()
+
+    # 1. Start the attempts saved for the first time
+    started = []
+    for student_id, exam_id in dict.fromkeys((student_id, exam_id) for student_id, exam_id, _, _ in answers):
+        cursor.execute("""
+            INSERT OR IGNORE INTO Student_Exam (Student_ID, Exam_ID, Student_Score, Submission_Time, Exam_Status)
+            VALUES (?, ?, 0, ?, 'In Progress')
+        """, (student_id, exam_id, now))
+        if cursor.rowcount:
+            started.append((student_id, exam_id))
+
+    # 2./3. Changed and first answers, only while the attempt is in progress
+    cursor.executemany("""
+        INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
+        SELECT ?, ?, ?, ?, 0
+        WHERE EXISTS (
+            SELECT 1 FROM Student_Exam
+            WHERE Student_ID = ? AND Exam_ID = ? AND Exam_Status = 'In Progress'
+        )
+        ON CONFLICT (Student_ID, Exam_ID, Question_ID) DO UPDATE SET Selected_Choice_ID = excluded.Selected_Choice_ID
+    """, [(student_id, exam_id, question_id, choice_id, student_id, exam_id)
+          for student_id, exam_id, question_id, choice_id in answers])
+
+    return [(['Student_ID', 'Exam_ID'], started)]
+
+
+def sp_auto_submit_exam(conn, exam_id):
+    now = datetime.now()
+    cursor = conn.cursor()
+
+    # 1. Check if exam exists
+    exam = cursor.execute("SELECT Exam_Date, End_Time FROM Exams WHERE Exam_ID = ?", (exam_id,)).fetchone()
+    if exam is None:
+        raise ProcedureError('Exam not found.')
+
+    # 2. Check if exam time is over
+    exam_date, end_time = to_date(exam[0]), to_time(exam[1])
+    if now.date() < exam_date or (now.date() == exam_date and now.time() <= end_time):
+        raise ProcedureError('Exam time is not over yet.')
+
+    # 3. Submit the open attempts as they were last saved
+    submitted = cursor.execute("""
+        SELECT Student_ID FROM Student_Exam WHERE Exam_ID = ? AND Exam_Status = 'In Progress'
+    """, (exam_id,)).fetchall()
+    cursor.execute("""
+        UPDATE Student_Exam SET Submission_Time = ?, Exam_Status = 'Auto-Submitted'
+        WHERE Exam_ID = ? AND Exam_Status = 'In Progress'
+    """, (time_str(end_time), exam_id))
+
+    return [(['Student_ID'], submitted)]
+
+
+def sp_correct_exam(conn, exam_id, student_id):
+    cursor = conn.cursor()
+
+    # 1. Check if exam exists
+    if cursor.execute("SELECT 1 FROM Exams WHERE Exam_ID = ?", (exam_id,)).fetchone() is None:
+        raise ProcedureError('Exam not found.')
+
+    # 2. Check if student submitted the exam
+    submitted = cursor.execute("""
+        SELECT 1 FROM Student_Exam
+        WHERE Exam_ID = ? AND Student_ID = ? AND Exam_Status IN ('Submitted', 'Auto-Submitted')
+    """, (exam_id, student_id)).fetchone()
+    if submitted is None:
+        raise ProcedureError('Exam not submitted or not found for this student.')
+
+    # 3. (already graded) - unreachable once step 2 passed, kept for parity
+    graded = cursor.execute("""
+        SELECT 1 FROM Student_Exam
+        WHERE Exam_ID = ? AND Student_ID = ? AND Exam_Status = 'Graded'
+    """, (exam_id, student_id)).fetchone()
+    if graded:
+        raise ProcedureError('This exam has already been graded.')
+
+    # 4. Update each question's correctness and mark
+    cursor.execute("""
+        UPDATE Student_Exam_Questions
+        SET Is_Correct = (SELECT CASE WHEN qc.Is_Correct = 1 THEN 1 ELSE 0 END
+                          FROM Question_Choices qc WHERE qc.Choice_ID = Student_Exam_Questions.Selected_Choice_ID),
+            Ques_Mark = (SELECT CASE WHEN qc.Is_Correct = 1 THEN 2 ELSE 0 END
+                         FROM Question_Choices qc WHERE qc.Choice_ID = Student_Exam_Questions.Selected_Choice_ID)
+        WHERE Exam_ID = ? AND Student_ID = ?
+          AND EXISTS (SELECT 1 FROM Question_Choices qc WHERE qc.Choice_ID = Student_Exam_Questions.Selected_Choice_ID)
+    """, (exam_id, student_id))
+
+    # 5 / 6. Count correct answers, 2 marks each
+    correct = cursor.execute("""
+        SELECT COUNT(*) FROM Student_Exam_Questions
+        WHERE Exam_ID = ? AND Student_ID = ? AND Is_Correct = 1
+    """, (exam_id, student_id)).fetchone()[0]
+    total_score = correct * 2
+
+    # 7. Update Student_Exam table
+    cursor.execute("""
+        UPDATE Student_Exam SET Student_Score = ?, Exam_Status = 'Graded'
+        WHERE Exam_ID = ? AND Student_ID = ?
+    """, (total_score, exam_id, student_id))
+
+    # 8. Return total score
+    return [(['Final_Score'], [(total_score,)])]
+
+
+def sp_get_exam_answer_key(conn, exam_id):
+    cursor = conn.cursor()
+    cursor.execute("SELECT Exam_ID, Exam_Date, End_Time FROM Exams WHERE Exam_ID = ?", (exam_id,))
+    header = _result(cursor)
+    cursor.execute("""
+        SELECT eq.Question_ID, qc.Choice_ID, qc.Is_Correct
+        FROM Exam_Questions eq
+        INNER JOIN Question_Choices qc ON eq.Question_ID = qc.Question_ID
+        WHERE eq.Exam_ID = ?
+    """, (exam_id,))
+    return [header, _result(cursor)]
+
+
+def sp_apply_exam_grades(conn, exam_id, student_id, grades):
+    """``grades`` is the GradedAnswersTableType TVP: [(Question_ID, Is_Correct, Ques_Mark), ...]"""
+    cursor = conn.cursor()
+    total_score = sum(int(mark) for _, _, mark in grades)
+
+    # 1. Marks per question
+    cursor.executemany("""
+        UPDATE Student_Exam_Questions SET Is_Correct = ?, Ques_Mark = ?
+        WHERE Exam_ID = ? AND Student_ID = ? AND Question_ID = ?
+    """, [(is_correct, mark, exam_id, student_id, question_id) for question_id, is_correct, mark in grades])
+
+    # 2. Total score
+    cursor.execute("""
+        UPDATE Student_Exam SET Student_Score = ?, Exam_Status = 'Graded'
+        WHERE Exam_ID = ? AND Student_ID = ?
+    """, (total_score, exam_id, student_id))
+
+    return [(['Final_Score'], [(total_score,)])]
+
+
+def sp_get_exam_results(conn, exam_id, student_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT e.Exam_ID, e.Course_ID, c.Course_Name, e.Title, e.Total_Marks, e.No_Questions,
+               e.Exam_Date, e.Start_Time, e.End_Time, se.Exam_Status, se.Student_Score
+        FROM Exams e
+        JOIN Course c ON e.Course_ID = c.Course_ID
+        LEFT JOIN Student_Exam se ON se.Exam_ID = e.Exam_ID AND se.Student_ID = ?
+        WHERE e.Exam_ID = ?
+    """, (student_id, exam_id))
+    columns = [column[0] for column in cursor.description]
+    header = [row[:6] + (to_date(row[6]).strftime('%m/%d/%Y'),
+                         to_time(row[7]).strftime('%H:%M'),
+                         to_time(row[8]).strftime('%H:%M')) + row[9:]
+              for row in cursor.fetchall()]
+    return [(columns, header)] + get_exam_questions_with_student_answers(conn, exam_id, student_id)
+
+
+def sp_apply_exam_regrade(conn, exam_id, answers, scores):
+    """``answers``: [(Student_ID, Question_ID, Is_Correct, Ques_Mark)], ``scores``: [(Student_ID, Student_Score)]"""
+    cursor = conn.cursor()
+    if cursor.execute("SELECT 1 FROM Exams WHERE Exam_ID = ?", (exam_id,)).fetchone() is None:
+        raise ProcedureError('Exam not found.')
+
+    cursor.executemany("""
+        UPDATE Student_Exam_Questions SET Is_Correct = ?, Ques_Mark = ?
+        WHERE Exam_ID = ? AND Student_ID = ? AND Question_ID = ?
+    """, [(is_correct, mark, exam_id, student_id, question_id)
+          for student_id, question_id, is_correct, mark in answers])
+    cursor.executemany("""
+        UPDATE Student_Exam SET Student_Score = ?, Exam_Status = 'Graded'
+        WHERE Exam_ID = ? AND Student_ID = ?
+    """, [(score, exam_id, student_id) for student_id, score in scores])
+
+    return [(['Answers_Updated', 'Scores_Updated'], [(len(answers), len(scores))])]
+
+
+def sp_reconcile_exam_counters(conn, fix=1):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT e.Exam_ID, IFNULL(c.Students_Taken, 0) AS Stored_Count, IFNULL(a.Actual_Count, 0) AS Actual_Count
+        FROM Exams e
+        LEFT JOIN Exam_Submission_Counts c ON c.Exam_ID = e.Exam_ID
+        LEFT JOIN (SELECT Exam_ID, COUNT(*) AS Actual_Count FROM Student_Exam
+                   WHERE Exam_Status <> 'In Progress' GROUP BY Exam_ID) a
+               ON a.Exam_ID = e.Exam_ID
+        WHERE c.Exam_ID IS NULL OR c.Students_Taken <> IFNULL(a.Actual_Count, 0)
+        ORDER BY e.Exam_ID
+    """)
+    drift = cursor.fetchall()
+
+    if fix:
+        cursor.executemany("""
+            INSERT INTO Exam_Submission_Counts (Exam_ID, Students_Taken) VALUES (?, ?)
+            ON CONFLICT (Exam_ID) DO UPDATE SET Students_Taken = excluded.Students_Taken
+        """, [(exam_id, actual) for exam_id, _, actual in drift])
+
+    return [(['Exam_ID', 'Stored_Count', 'Actual_Count', 'Drift'],
+             [(exam_id, stored, actual, actual - stored) for exam_id, stored, actual in drift])]
+
+
+def sp_add_question_with_choices(conn, question_type, question_head, correct_answer, course_id,
+                                 question_mark, choices, question_id=None, first_choice_id=None):
+    """``choices`` is the QuestionChoicesTableType TVP: [(Choice_Text, Is_Correct), ...]
+
+    Like the T-SQL version, failures come back as an 'Error: ...' Message row.
+    """
+    cursor = conn.cursor()
+
+    def error(message):
+        return [(['Message', 'LineNumber'], [('Error: ' + message, None)])]
+
+    # 1. Check if Course exists
+    if cursor.execute("SELECT 1 FROM Course WHERE Course_ID = ?", (course_id,)).fetchone() is None:
+        return error('No course found with this Course_ID.')
+
+    # 2. Validate Question_Type
+    if question_type not in ('MCQ', 'T/F'):
+        return error("Question_Type must be either 'MCQ' or 'T/F'.")
+
+    # 3. Validate Question_Mark
+    if int(question_mark) != 2:
+        return error('Question_Mark must be 2.')
+
+    choices = list(choices or [])
+    if question_type == 'MCQ':
+        if len(choices) != 4:
+            return error('MCQ questions must have exactly 4 choices.')
+        if sum(1 for _, is_correct in choices if is_correct) != 1:
+            return error('MCQ question must have exactly 1 correct choice.')
+    else:
+        choices = [('The sentence is True', 1 if correct_answer == 'True' else 0),
+                   ('The sentence is False', 1 if correct_answer == 'False' else 0)]
+
+    # 4. Generate new Question_ID / one consecutive block of Choice_IDs
+    if question_id is None:
+        question_id = next_sequence_value(conn, 'Question_ID_Seq')
+    if first_choice_id is None:
+        first_choice_id = sp_reserve_id_block(conn, 'Choice_ID_Seq', len(choices))[0][1][0][0]
+
+    # 5. Insert the new question and 6. its choices
+    cursor.execute("""
+        INSERT INTO Questions (Question_ID, Question_Type, Question_Head, Correct_Answer, Course_ID, Question_Mark)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (question_id, question_type, question_head, correct_answer, course_id, question_mark))
+    cursor.executemany("""
+        INSERT INTO Question_Choices (Choice_ID, Question_ID, Choice_Text, Is_Correct)
+        VALUES (?, ?, ?, ?)
+    """, [(first_choice_id + offset, question_id, text, 1 if is_correct else 0)
+          for offset, (text, is_correct) in enumerate(choices)])
+
+    return [(['Message'], [(f'Question added successfully. Question_ID = {question_id}',)])]
+
+
+# ---- Read procedures ------------------------------------------------------------
+def get_exam_by_id(conn, exam_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT Exam_ID, Course_ID, Title, Total_Marks, No_Questions, Exam_Date, Start_Time, End_Time
+        FROM Exams
+        WHERE Exam_ID = ?
+    """, (exam_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return [(['Message'], [('Error: Exam not found.',)])]
+
+    # CONVERT(VARCHAR(10), Exam_Date, 101) and LEFT(CONVERT(VARCHAR(8), time, 108), 5)
+    columns = ['Exam_ID', 'Course_ID', 'Title', 'Total_Marks', 'No_Questions',
+               'Exam_Date', 'Start_Time', 'End_Time']
+    formatted = row[:5] + (to_date(row[5]).strftime('%m/%d/%Y'),
+                           to_time(row[6]).strftime('%H:%M'),
+                           to_time(row[7]).strftime('%H:%M'))
+    return [(columns, [formatted]),
+            (['Message'], [('Exam data retrieved successfully.',)])]
+
+
+def get_exam_questions_with_student_answers(conn, exam_id, student_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT s.Student_Name, e.Title AS Exam_Title, q.Question_Head, q.Correct_Answer,
+               qc.Choice_Text AS Student_Choice, seq.Ques_Mark, seq.Is_Correct
+        FROM Student_Exam_Questions AS seq
+        JOIN Questions AS q ON seq.Question_ID = q.Question_ID
+        JOIN Question_Choices AS qc ON seq.Selected_Choice_ID = qc.Choice_ID
+        JOIN Student AS s ON seq.Student_ID = s.Student_ID
+        JOIN Exams AS e ON seq.Exam_ID = e.Exam_ID
+        WHERE seq.Exam_ID = ? AND seq.Student_ID = ?
+    """, (exam_id, student_id))
+    return [_result(cursor)]
+
+
+def get_instructor_courses_with_student_count(conn, instructor_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT i.Instructor_ID, i.Instructor_Name, c.Course_Name,
+               COUNT(DISTINCT s.Student_ID) AS Number_of_Students
+        FROM Instructor AS i
+        INNER JOIN Instructors_Courses AS ic ON i.Instructor_ID = ic.Instructor_ID
+        INNER JOIN Course AS c ON ic.Course_ID = c.Course_ID
+        INNER JOIN Department AS d ON i.Dept_ID = d.Dept_ID
+        INNER JOIN Track AS t ON t.Dept_ID = d.Dept_ID
+        INNER JOIN Intake_Track_Branch AS itb ON itb.Track_ID = t.Track_ID
+        INNER JOIN Student AS s ON s.Intake_Track_Branch_ID = itb.Intake_Track_Branch_ID
+        WHERE i.Instructor_ID = ?
+        GROUP BY i.Instructor_ID, i.Instructor_Name, c.Course_Name
+    """, (instructor_id,))
+    return [_result(cursor)]
+
+
+# Stored procedure name -> Python implementation
+PROCEDURES = {
+    'sp_Reserve_ID_Block': sp_reserve_id_block,
+    'sp_Generate_Exam': sp_generate_exam,
+    'sp_Bulk_Generate_Exams': sp_bulk_generate_exams,
+    'sp_Start_Exam': sp_start_exam,
+    'sp_Check_Exam_Eligibility': sp_check_exam_eligibility,
+    'sp_Get_Exam_Paper': sp_get_exam_paper,
+    'sp_Get_Student_Dashboard': sp_get_student_dashboard,
+    'sp_Submit_Exam': sp_submit_exam,
+    'sp_Save_Exam_Progress': sp_save_exam_progress,
+    'sp_Auto_Submit_Exam': sp_auto_submit_exam,
+    'sp_Correct_Exam': sp_correct_exam,
+    'sp_Get_Exam_Answer_Key': sp_get_exam_answer_key,
+    'sp_Apply_Exam_Grades': sp_apply_exam_grades,
+    'sp_Get_Exam_Results': sp_get_exam_results,
+    'sp_Apply_Exam_Regrade': sp_apply_exam_regrade,
+    'sp_Reconcile_Exam_Counters': sp_reconcile_exam_counters,
+    'sp_Add_Question_With_Choices': sp_add_question_with_choices,
+    'Get_Exam_By_ID': get_exam_by_id,
+    'Get_Exam_Questions_With_Student_Answers': get_exam_questions_with_student_answers,
+    'GetInstructorCoursesWithStudentCount': get_instructor_courses_with_student_count,
+}
@@ -0,0 +1,158 @@
+# submissions.py
+"""Writing a student's exam answers in one set-based call, once per submission token"""
+import threading
+import time
+
+from config import Config
+
+SUBMIT_EXAM_SQL = "EXEC sp_Submit_Exam ?, ?, ?"
+
+INSERT_STUDENT_EXAM_SQL = """
+    INSERT INTO Student_Exam (Exam_ID, Student_ID, Student_Score, Submission_Time, Exam_Status)
+    VALUES (?, ?, 0, GETDATE(), 'Submitted')
+"""
+
+# An autosaved attempt (autosave.py) already has its row: close it instead,
+# the submitted form replacing the autosaved answers
+CLOSE_ATTEMPT_SQL = """
+    UPDATE Student_Exam SET Submission_Time = GETDATE(), Exam_Status = 'Submitted'
+    WHERE Exam_ID = ? AND Student_ID = ? AND Exam_Status = 'In Progress'
+"""
+
+DELETE_SAVED_ANSWERS_SQL = """
+    DELETE FROM Student_Exam_Questions WHERE Exam_ID = ? AND Student_ID = ?
+"""
+
+INSERT_ANSWER_SQL = """
+    INSERT INTO Student_Exam_Questions (Student_ID, Exam_ID, Question_ID, Selected_Choice_ID, Ques_Mark)
+    VALUES (?, ?, ?, ?, 0)
+"""
+
+
+def parse_answers(form):
+    """question_<Question_ID>=<Choice_ID> form fields -> [(Question_ID, Choice_ID), ...]"""
+    answers = []
+    for field, value in form.items():
+        if field.startswith('question_'):
+            try:
+                answers.append((int(field[len('question_'):]), int(value)))
+            except (TypeError, ValueError):
+                continue
+    return answers
+
+
+def insert_submission(cursor, exam_id, student_id, answers, use_tvp=None):
+    """Write the Student_Exam row and all answers without committing.
+
+    With use_tvp the answers travel as a StudentAnswersTableType parameter
+    of sp_Submit_Exam - a single round trip.  Otherwise the fallback is an
+    UPDATE closing an autosaved attempt, else one INSERT, for Student_Exam
+    plus one executemany batch for the answers.
+    """
+    if use_tvp is None:
+        use_tvp = Config.DATABASE_CONFIG.get('submit_with_tvp', True)
+
+    if use_tvp:
+        cursor.execute(SUBMIT_EXAM_SQL, (exam_id, student_id, [tuple(answer) for answer in answers]))
+        return
+
+    cursor.execute(CLOSE_ATTEMPT_SQL, (exam_id, student_id))
+    if cursor.rowcount:
+        cursor.execute(DELETE_SAVED_ANSWERS_SQL, (exam_id, student_id))
+    else:
+        cursor.execute(INSERT_STUDENT_EXAM_SQL, (exam_id, student_id))
+    if answers:
+        cursor.fast_executemany = True
+        cursor.executemany(INSERT_ANSWER_SQL, [(student_id, exam_id, question_id, choice_id)
+                                               for question_id, choice_id in answers])
+
+
+def is_duplicate_submission(error):
+    """True when the database refused a submission because the attempt is already submitted"""
+    message = str(error)
+    return ('already submitted' in message or 'PRIMARY KEY' in message
+            or 'UNIQUE constraint failed: Student_Exam.' in message)
+
+
+class _Claim:
+    __slots__ = ('done', 'error', 'expires_at')
+
+    def __init__(self, expires_at):
+        self.done = threading.Event()
+        self.error = None
+        self.expires_at = expires_at
+
+
+class SubmissionLedger:
+    """Submission tokens seen recently, so a double click or a retry is answered without the database.
+
+    The exam page sends a token generated once per page in the browser.  The
+    first request carrying a token runs the submission; duplicates of it wait
+    for that request and return its outcome.  A failed submission is
+    forgotten after its waiters are answered, so a retry can run again.
+    Different tokens for the same attempt are settled by the database: the
+    Student_Exam primary key lets exactly one of them in.
+    """
+
+    def __init__(self, ttl=3600, wait_timeout=30):
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._claims = {}  # (Student_ID, Exam_ID, token) -> _Claim, oldest first
+        self.submissions = 0
+        self.replays = 0
+        self.failures = 0
+
+    def run_once(self, exam_id, student_id, token, submit):
+        """submit() -> None on success or an error message; runs once per token"""
+        if not token:
+            return submit()
+
+        key = (student_id, exam_id, token)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            claim = self._claims.get(key)
+            first = claim is None
+            if first:
+                claim = self._claims[key] = _Claim(now + self.ttl)
+                self.submissions += 1
+            else:
+                self.replays += 1
+
+        if not first:
+            if not claim.done.wait(self.wait_timeout):
+                return 'Your submission is still being processed. Please wait a moment and reload.'
+            return claim.error
+
+        try:
+            claim.error = submit()
+        except Exception:
+            claim.error = 'Error submitting exam'
+            raise
+        finally:
+            if claim.error is not None:
+                with self._lock:
+                    self.failures += 1
+                    self._claims.pop(key, None)
+            claim.done.set()
+        return claim.error
+
+    def _evict_expired(self, now):
+        while self._claims:
+            key, claim = next(iter(self._claims.items()))
+            if claim.expires_at > now or not claim.done.is_set():
+                break
+            del self._claims[key]
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'tokens': len(self._claims),
+                'submissions': self.submissions,
+                'replays': self.replays,
+                'failures': self.failures,
+            }
+
+
+submission_ledger = SubmissionLedger()